@@ -0,0 +1,62 @@
+"""
+measure the throughput of the batch environment: random reveals on intermediate boards, with automatic resets, and
+whole expert games played by the batch solver
+
+run it from the root of the repository:
+    python -m benchmarks.bench_batch
+"""
+import time
+
+import numpy as np
+
+from src.batchEnv import BatchEnv
+from src.batchSolver import BatchSolver
+from src.levels import LEVELS
+
+BATCHES = (64, 256, 1024, 4096)
+STEPS = 200
+SOLVER_BATCHES = (64, 256, 512)
+SOLVER_GAMES = 2000
+
+
+def bench(num_envs) -> tuple:
+    """
+    play random reveals on a batch of boards, the actions are drawn before the clock starts
+    :param num_envs: the number of boards
+    :return: the number of board steps per second and the number of games ended
+    """
+    width, height, num_of_mines = LEVELS["intermediate"]
+    env = BatchEnv(num_envs, width, height, num_of_mines, seed=num_envs)
+    env.reset()
+    actions = np.random.default_rng(num_envs).integers(width * height, size=(STEPS, num_envs))
+    ended = 0
+    start = time.perf_counter()
+    for step in range(STEPS):
+        _, _, dones = env.step(actions[step])
+        ended += int(dones.sum())
+    return STEPS * num_envs / (time.perf_counter() - start), ended
+
+
+def bench_solver(num_envs) -> tuple:
+    """
+    solve expert games with a batch of boards
+    :param num_envs: the number of boards
+    :return: the number of games per second and the win rate
+    """
+    solver = BatchSolver(*LEVELS["expert"], num_envs=num_envs, seed=num_envs, safe_zone=True)
+    start = time.perf_counter()
+    wins = sum(game[0] for game in solver.play(SOLVER_GAMES))
+    return SOLVER_GAMES / (time.perf_counter() - start), wins / SOLVER_GAMES
+
+
+def main():
+    for num_envs in BATCHES:
+        rate, ended = bench(num_envs)
+        print(f"{num_envs:5} boards: {rate:10.0f} board steps/s, {ended} games ended")
+    for num_envs in SOLVER_BATCHES:
+        rate, win_rate = bench_solver(num_envs)
+        print(f"{num_envs:5} boards: {rate:10.0f} expert games/s solved, win rate {win_rate:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+measure the game core on boards of different sizes and write the results as JSON, so that two builds can be compared:
+the mine generation, the flood fill of a first click, whole games played by the solver, and the construction of the
+game window (null without a display)
+
+run it from the root of the repository:
+    python -m benchmarks.bench_core -o after.json
+    python -m benchmarks.bench_core --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from simulate import engine_version
+from src.board import Board
+from src.solver import Solver
+
+# (name, width, height, mines) of the measured boards
+SIZES = (("beginner", 8, 8, 10), ("intermediate", 16, 16, 40), ("expert", 30, 16, 99),
+         ("100x100", 100, 100, 2000), ("500x500", 500, 500, 50000))
+FLOOD_DENSITY = 0.01  # a huge opening from the first click
+REPEATS = 7
+SOLVER_GAMES = {"beginner": 50, "intermediate": 20, "expert": 10, "100x100": 3, "500x500": 1}
+WINDOW_SIZES = ("beginner", "intermediate", "expert", "100x100")
+
+
+def timed(run, repeats) -> dict:
+    """
+    time a function several times, every run gets a fresh setup
+    :param run: called with the index of the run, returns the seconds to count (the setup is not counted)
+    :param repeats: the number of runs
+    :return: the median and the fastest run in milliseconds
+    """
+    times = [run(k) * 1000 for k in range(repeats)]
+    return {"repeats": repeats, "median_ms": round(statistics.median(times), 4), "min_ms": round(min(times), 4)}
+
+
+def bench_generate(width, height, num_of_mines) -> dict:
+    """
+    time Board.generate_mines with a first click at the center
+    :return: the timings
+    """
+    def run(k):
+        board = Board(width, height, num_of_mines)
+        start = time.perf_counter()
+        board.generate_mines(width // 2, height // 2, seed=k)
+        return time.perf_counter() - start
+    return timed(run, REPEATS)
+
+
+def bench_flood(width, height) -> dict:
+    """
+    time the first click at the center of a board with few mines, the flood fill opens most of the board
+    :return: the timings
+    """
+    def run(k):
+        mines = np.random.default_rng(k).random((width, height)) < FLOOD_DENSITY
+        mines[width // 2 - 1:width // 2 + 2, height // 2 - 1:height // 2 + 2] = False
+        board = Board(width, height, int(mines.sum()))
+        board.place_mines(mines)
+        start = time.perf_counter()
+        board.reveal(width // 2, height // 2)
+        return time.perf_counter() - start
+    return timed(run, REPEATS)
+
+
+def bench_solver(name, width, height, num_of_mines) -> dict:
+    """
+    time whole games played by the solver, from the mine generation to the end
+    :return: the timings of one game
+    """
+    def run(k):
+        start = time.perf_counter()
+        Solver(Board(width, height, num_of_mines), seed=k).solve(safe_zone=True)
+        return time.perf_counter() - start
+    return timed(run, SOLVER_GAMES[name])
+
+
+def bench_window(name, width, height, num_of_mines):
+    """
+    time the construction of the game window, in a temporary folder so that no file of the game is touched
+    :return: the timings, or None without a display
+    """
+    try:
+        import tkinter as tk
+    except ImportError:
+        return None
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        print(f"skipping the window: {error}", file=sys.stderr)
+        return None
+    root.withdraw()
+    from src.Minesweeper8UIdesign import MineSweeper
+
+    def run(k):
+        start = time.perf_counter()
+        game = MineSweeper(width, height, num_of_mines, name, lambda window: None, root=root, seed=k)
+        elapsed = time.perf_counter() - start
+        game.cancel_timer()
+        game.stop_recording(wait=True)
+        game.saver.close(wait=True)
+        game.screen.after_cancel(game.autosave_job)
+        game.screen.destroy()
+        return elapsed
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            return timed(run, 3)
+        finally:
+            os.chdir(cwd)
+            root.destroy()
+
+
+def run_all() -> dict:
+    """
+    run every benchmark
+    :return: the results with the versions they were measured with
+    """
+    results = []
+
+    def add(bench, name, width, height, num_of_mines, timings):
+        results.append({"name": bench, "size": name, "width": width, "height": height, "mines": num_of_mines,
+                        **(timings or {"repeats": 0, "median_ms": None, "min_ms": None})})
+        if timings is not None:
+            print(f"{bench:9} {name:13} {timings['median_ms']:10.3f} ms", file=sys.stderr)
+
+    for name, width, height, num_of_mines in SIZES:
+        add("generate", name, width, height, num_of_mines, bench_generate(width, height, num_of_mines))
+        add("flood", name, width, height, int(width * height * FLOOD_DENSITY), bench_flood(width, height))
+        add("solver", name, width, height, num_of_mines, bench_solver(name, width, height, num_of_mines))
+    for name, width, height, num_of_mines in SIZES:
+        if name in WINDOW_SIZES:
+            add("window", name, width, height, num_of_mines, bench_window(name, width, height, num_of_mines))
+    return {"engine": engine_version(), "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "results": results}
+
+
+def compare(before, after) -> None:
+    """
+    print the ratio of the median times of two result files
+    :param before: the path of the first results
+    :param after: the path of the second results
+    :return: None
+    """
+    with open(before) as file:
+        old = {(r["name"], r["size"]): r for r in json.load(file)["results"]}
+    with open(after) as file:
+        new = json.load(file)["results"]
+    print(f"{'bench':9} {'size':13} {'before':>10} {'after':>10} {'ratio':>7}")
+    for result in new:
+        previous = old.get((result["name"], result["size"]))
+        if previous is None or previous["median_ms"] is None or result["median_ms"] is None:
+            continue
+        ratio = result["median_ms"] / previous["median_ms"] if previous["median_ms"] else float("nan")
+        print(f"{result['name']:9} {result['size']:13} {previous['median_ms']:10.3f} {result['median_ms']:10.3f} "
+              f"{ratio:7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="measure the game core and write the results as JSON")
+    parser.add_argument("-o", "--output", help="the JSON file to write, stdout if not given")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = json.dumps(run_all(), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
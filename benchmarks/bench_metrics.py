@@ -0,0 +1,28 @@
+"""
+measure the throughput of the board metrics (3BV, openings, isolated numbers, islands) on random boards
+
+run it from the root of the repository:
+    python -m benchmarks.bench_metrics
+"""
+import time
+
+import numpy as np
+
+from src.levels import LEVELS
+from src.metrics import board_metrics, random_boards
+
+BOARDS = 50000
+
+
+def main():
+    for level, (width, height, num_of_mines) in LEVELS.items():
+        mines = random_boards(BOARDS, width, height, num_of_mines, np.random.default_rng(0))
+        start = time.perf_counter()
+        metrics = board_metrics(mines)
+        rate = BOARDS / (time.perf_counter() - start)
+        print(f"{level:12} {rate:8.0f} boards/s, mean 3BV {metrics['bbbv'].mean():.1f}, "
+              f"openings {metrics['openings'].mean():.1f}, islands {metrics['islands'].mean():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+measure the latency of Board.reveal on boards of different sizes and topologies
+
+run it from the root of the repository:
+    python -m benchmarks.bench_reveal
+"""
+import time
+
+import numpy as np
+
+from src.board import Board
+from src.topology import TOPOLOGIES
+
+SIZES = (24, 100, 500)
+DENSITIES = (0.01, 0.17)  # a huge opening, and the expert level density
+REPEATS = 5
+
+
+def make_board(size, density, rng, topology) -> Board:
+    """
+    create a board with random mines, keeping the center free
+    :param size: the width and the height of the board
+    :param density: the ratio of mines
+    :param rng: the random generator
+    :param topology: the topology of the board
+    :return: the board
+    """
+    mines = rng.random((size, size)) < density
+    mines[size // 2 - 2:size // 2 + 3, size // 2 - 2:size // 2 + 3] = False
+    board = Board(size, size, int(mines.sum()), topology)
+    board.place_mines(mines)
+    return board
+
+
+def bench(size, density, topology) -> tuple:
+    """
+    time the first click at the center of the board
+    :param size: the width and the height of the board
+    :param density: the ratio of mines
+    :param topology: the topology of the board
+    :return: the best latency in milliseconds and the number of revealed cells
+    """
+    rng = np.random.default_rng(size)
+    best, revealed = float("inf"), 0
+    for _ in range(REPEATS):
+        board = make_board(size, density, rng, topology)
+        start = time.perf_counter()
+        xs, _ = board.reveal(size // 2, size // 2)
+        best = min(best, time.perf_counter() - start)
+        revealed = len(xs)
+    return best * 1000, revealed
+
+
+def main():
+    print(f"{'board':>9} {'topology':>8} {'density':>8} {'revealed':>9} {'latency':>11}")
+    for size in SIZES:
+        for name, topology in TOPOLOGIES.items():
+            for density in DENSITIES:
+                latency, revealed = bench(size, density, topology)
+                print(f"{size:>4}x{size:<4} {name:>8} {density:>8.2f} {revealed:>9} {latency:>8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+measure the latency of the game server under load: many connections play many sessions at once
+
+run it from the root of the repository:
+    python -m benchmarks.bench_server
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from server import GameServer
+
+CONNECTIONS = 50
+SESSIONS_PER_CONNECTION = 40
+MOVES = 20
+
+
+async def client(path, latencies, seed) -> None:
+    """
+    open sessions on one connection and play random moves on them, one request at a time
+    :param path: the unix socket of the server
+    :param latencies: the list to append the round trip times to, in milliseconds
+    :param seed: the seed of the moves
+    :return: None
+    """
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_unix_connection(path)
+
+    async def call(request) -> dict:
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        answer = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - start) * 1000)
+        return answer
+
+    sessions = [(await call({"op": "new", "level": "expert", "safe_zone": True}))["session"]
+                for _ in range(SESSIONS_PER_CONNECTION)]
+    for _ in range(MOVES):
+        for sid in sessions:
+            i, j = rng.integers(24, size=2).tolist()
+            await call({"op": "reveal" if rng.random() < 0.8 else "flag", "session": sid, "i": i, "j": j})
+    writer.close()
+
+
+async def run(folder) -> tuple:
+    """
+    serve on a unix socket and run the clients against it
+    :param folder: a temporary folder
+    :return: the server side and the round trip latencies, in milliseconds
+    """
+    server = GameServer(os.path.join(folder, "sessions"))
+    handled = []
+    dispatch = server.dispatch
+
+    def timed(line):
+        start = time.perf_counter()
+        answer = dispatch(line)
+        handled.append((time.perf_counter() - start) * 1000)
+        return answer
+
+    server.dispatch = timed
+    path = os.path.join(folder, "server.sock")
+    task = asyncio.create_task(server.serve(unix=path))
+    while not os.path.exists(path):
+        await asyncio.sleep(0.01)
+    latencies: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(path, latencies, seed) for seed in range(CONNECTIONS)))
+    wall = time.perf_counter() - start
+    task.cancel()
+    print(f"{len(handled)} requests on {CONNECTIONS * SESSIONS_PER_CONNECTION} sessions "
+          f"in {wall:.2f} s: {len(handled) / wall:.0f} requests/s")
+    return handled, latencies
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        handled, latencies = asyncio.run(run(folder))
+    for name, values in (("server side", handled), ("round trip", latencies)):  # the clients share the process
+        p50, p99 = np.percentile(values, [50, 99])
+        print(f"{name:12} p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,29 @@
-from src.menu import Menu
+"""
+start Minesweeper: the Tk window by default, or the curses frontend in the terminal
 
+    python main.py
+    python main.py --terminal
+    python main.py --terminal --level expert --topology torus
+"""
+import argparse
 
-def main():
-    Menu().root.mainloop()
+from src.levels import LEVELS
+from src.topology import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="play Minesweeper")
+    parser.add_argument("--terminal", action="store_true", help="play in the terminal with curses, without Tk")
+    parser.add_argument("--level", choices=LEVELS, help="start this level at once in the terminal, without the menu")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="square", help="the neighbors of the cells")
+    args = parser.parse_args(argv)
+    # each frontend is imported only when chosen, so that the terminal one never loads tkinter
+    if args.terminal:
+        from src.terminalGame import main as play_in_terminal
+        play_in_terminal(args.level, TOPOLOGIES[args.topology])
+    else:
+        from src.menu import Menu
+        Menu().root.mainloop()
 
 
 if __name__ == '__main__':
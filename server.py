@@ -0,0 +1,353 @@
+"""
+serve headless Minesweeper games to bots over a local socket, one JSON object per line
+
+    python server.py --port 8765
+    python server.py --unix /tmp/minesweeper.sock
+
+requests and their answers (an "id" given in a request is sent back in its answer):
+    {"op": "new", "level": "expert"}                       -> {"ok": true, "session": "...", "width": 24, ...}
+    {"op": "new", "width": 30, "height": 16, "mines": 99, "seed": 1, "safe_zone": true}
+    {"op": "new", "level": "expert", "topology": "torus"}  square (default), torus, hex or knight neighbors
+    {"op": "reveal", "session": "...", "i": 3, "j": 4}     -> {"ok": true, "cells": [[i, j, count], ...], ...}
+    {"op": "flag", "session": "...", "i": 3, "j": 4}       -> {"ok": true, "flagged": true, "won": false}
+    {"op": "state", "session": "..."}                      -> {"ok": true, "rows": ["##12..", ...], ...}
+    {"op": "close", "session": "..."}                      -> {"ok": true}
+    {"op": "stats"}                                        -> {"ok": true, "active": 10, "evicted": 2000}
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+
+import numpy as np
+
+from src.board import Board
+from src.levels import LEVELS
+from src.snapshot import load_snapshot, pack_snapshot, save_snapshot, unpack_snapshot
+from src.topology import TOPOLOGIES, level_name, level_topology
+
+LOGGER = logging.getLogger(__name__)
+
+# the characters of the state rows: covered, flagged, mine (once lost), then the counts
+COVERED, FLAGGED, MINE = "#", "F", "*"
+
+
+class Session:
+    # a session only holds these attributes, so thousands of them stay small
+    __slots__ = ("board", "level", "seed", "safe_zone", "started_at", "last_used")
+
+    def __init__(self, board: Board, level, seed=None, safe_zone=False, elapsed_time=0.0) -> None:
+        """
+        a game played by a bot
+        :param board: the board of the game
+        :param level: the name of the level
+        :param seed: the seed of the mines, placed on the first reveal
+        :param safe_zone: keep the 3x3 area around the first reveal free of mines
+        :param elapsed_time: the time already played, for a restored session
+        """
+        self.board = board
+        self.level = level
+        self.seed = seed
+        self.safe_zone = safe_zone
+        self.started_at = time.time() - elapsed_time
+        self.last_used = time.monotonic()
+
+
+class GameServer:
+    def __init__(self, folder="sessions", idle_timeout=300.0, sweep_interval=10.0) -> None:
+        """
+        host the sessions, the idle ones are moved to snapshot files and restored on their next request
+        :param folder: the folder of the evicted sessions
+        :param idle_timeout: the number of seconds without a request after which a session is evicted
+        :param sweep_interval: the number of seconds between two searches for idle sessions
+        """
+        self.folder = folder
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        os.makedirs(folder, exist_ok=True)
+
+        self.sessions: dict = {}
+        # the sessions on the disk, the ones being written keep their snapshot here until the file is complete
+        self.evicted: set = {name[:-4] for name in os.listdir(folder) if name.endswith(".mss")}
+        self.writing: dict = {}
+        # the idle sessions without any reveal yet only need their parameters and their flags
+        self.parked: dict = {}
+
+        self.prefix = uuid.uuid4().hex[:8]
+        self.counter = itertools.count()
+        self.handlers = {"new": self.new, "reveal": self.reveal, "flag": self.flag, "state": self.state,
+                         "close": self.close, "stats": self.stats}
+
+    def path(self, sid) -> str:
+        """
+        get the snapshot file of a session
+        :param sid: the id of the session
+        :return: the path of the file
+        """
+        return os.path.join(self.folder, f"{sid}.mss")
+
+    def session(self, request) -> Session:
+        """
+        get the session of a request, restoring it if it was evicted
+        :param request: the request
+        :return: the session
+        """
+        sid = request["session"]
+        session = self.sessions.get(sid)
+        if session is None:
+            if sid in self.parked:
+                width, height, num_of_mines, level, seed, safe_zone, flags = self.parked.pop(sid)
+                board = Board(width, height, num_of_mines, level_topology(level))
+                for i, j in flags:
+                    board.toggle_flag(i, j)
+                session = Session(board, level, seed, safe_zone)
+            elif sid in self.writing:
+                snapshot = unpack_snapshot(self.writing[sid], sid)
+                session = Session(snapshot.board, snapshot.level, elapsed_time=snapshot.elapsed_time)
+                self.evicted.discard(sid)
+            elif sid in self.evicted:
+                # the session stays evicted until its file is read and removed, so a failed request can be retried
+                snapshot = load_snapshot(self.path(sid))
+                session = Session(snapshot.board, snapshot.level, elapsed_time=snapshot.elapsed_time)
+                os.remove(self.path(sid))
+                self.evicted.discard(sid)
+            else:
+                raise ValueError(f"unknown session {sid}")
+            self.sessions[sid] = session
+        session.last_used = time.monotonic()
+        return session
+
+    @staticmethod
+    def cell(request, board: Board) -> tuple:
+        """
+        get the cell of a request
+        :param request: the request
+        :param board: the board of the session
+        :return: the coordinates (i, j)
+        """
+        i, j = int(request["i"]), int(request["j"])
+        if not (0 <= i < board.width and 0 <= j < board.height):
+            raise ValueError(f"({i}, {j}) is outside of the {board.width}*{board.height} board")
+        return i, j
+
+    def new(self, request) -> dict:
+        """
+        start a session
+        :param request: the level name, or the width, height and mines, and optionally the seed, safe_zone and
+                        topology
+        :return: the answer
+        """
+        level = request.get("level", "custom")
+        if level in LEVELS:
+            width, height, num_of_mines = LEVELS[level]
+        else:
+            width, height, num_of_mines = int(request["width"]), int(request["height"]), int(request["mines"])
+            level = f"custom {width}*{height} {num_of_mines}"
+        if not (width > 0 and height > 0 and 0 <= num_of_mines < width * height):
+            raise ValueError(f"{num_of_mines} mines do not fit in a {width}*{height} board")
+        name = request.get("topology", "square")
+        if name not in TOPOLOGIES:
+            raise ValueError(f"unknown topology {name}")
+        # the level name carries the topology, so that an evicted session comes back on the same board
+        topology = TOPOLOGIES[name]
+        level = level_name(level, topology)
+        sid = f"{self.prefix}-{next(self.counter)}"
+        self.sessions[sid] = Session(Board(width, height, num_of_mines, topology), level, request.get("seed"),
+                                     bool(request.get("safe_zone", False)))
+        return {"session": sid, "level": level, "width": width, "height": height, "mines": num_of_mines}
+
+    def reveal(self, request) -> dict:
+        """
+        reveal a cell, the mines are placed on the first reveal
+        :param request: the session and the cell
+        :return: the newly revealed cells as [i, j, count], count being -1 for a mine
+        """
+        session = self.session(request)
+        board = session.board
+        i, j = self.cell(request, board)
+        if board.lost or board.won:
+            raise ValueError("the game is over")
+        if not board.placed:
+            board.generate_mines(i, j, session.seed, session.safe_zone)
+            session.started_at = time.time()
+        xs, ys = board.reveal(i, j)
+        counts = np.where(board.mines[xs, ys], -1, board.counts[xs, ys])
+        return {"cells": np.stack((xs, ys, counts), axis=1).tolist(), "lost": board.lost, "won": board.won}
+
+    def flag(self, request) -> dict:
+        """
+        place or remove a flag
+        :param request: the session and the cell
+        :return: whether the cell is now flagged
+        """
+        session = self.session(request)
+        board = session.board
+        i, j = self.cell(request, board)
+        if board.lost or board.won:
+            raise ValueError("the game is over")
+        return {"flagged": board.toggle_flag(i, j), "won": board.won}
+
+    def state(self, request) -> dict:
+        """
+        get the whole board as rows of characters, the mines are shown once the game is lost
+        :param request: the session
+        :return: the rows indexed by i, and the counters of the game
+        """
+        board = self.session(request).board
+        chars = np.full((board.width, board.height), COVERED, dtype="<U1")
+        chars[board.flagged] = FLAGGED
+        chars[board.revealed] = board.counts[board.revealed].astype(str)
+        if board.lost:
+            chars[board.mines & ~board.flagged] = MINE
+        return {"rows": ["".join(row) for row in chars.tolist()], "lost": board.lost, "won": board.won,
+                "flags": board.flags_count, "safe_left": board.safe_left}
+
+    def close(self, request) -> dict:
+        """
+        end a session
+        :param request: the session
+        :return: the answer
+        """
+        sid = request["session"]
+        self.session(request)
+        del self.sessions[sid]
+        return {}
+
+    def stats(self, request) -> dict:
+        """
+        count the sessions
+        :param request: the request
+        :return: the number of sessions in memory and on the disk
+        """
+        return {"active": len(self.sessions), "evicted": len(self.evicted) + len(self.parked)}
+
+    def dispatch(self, line) -> bytes:
+        """
+        answer a request
+        :param line: the JSON line of the request
+        :return: the JSON line of the answer
+        """
+        request = {}
+        try:
+            request = json.loads(line)
+            answer = {"ok": True, **self.handlers[request["op"]](request)}
+        except KeyError as error:
+            answer = {"ok": False, "error": f"missing or unknown {error}"}
+        except (ValueError, TypeError, AttributeError) as error:
+            answer = {"ok": False, "error": str(error)}
+        except OSError as error:
+            # the snapshot of an evicted session could not be read or removed
+            answer = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        if isinstance(request, dict) and "id" in request:
+            answer["id"] = request["id"]
+        return json.dumps(answer, separators=(",", ":")).encode() + b"\n"
+
+    async def handle_client(self, reader, writer) -> None:
+        """
+        answer the requests of a connection, in order
+        :param reader: the stream of the requests
+        :param writer: the stream of the answers
+        :return: None
+        """
+        try:
+            while line := await reader.readline():
+                writer.write(self.dispatch(line))
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def evict_loop(self) -> None:
+        """
+        move the idle sessions out of the memory, the files are written in a worker thread
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for sid in [sid for sid, session in self.sessions.items() if session.last_used < deadline]:
+                session = self.sessions.pop(sid)
+                board = session.board
+                if not board.placed:
+                    flags = list(zip(*np.nonzero(board.flagged)))
+                    self.parked[sid] = (board.width, board.height, board.num_of_mines, session.level,
+                                        session.seed, session.safe_zone, [(int(i), int(j)) for i, j in flags])
+                    continue
+                self.writing[sid] = pack_snapshot(board, session.level, time.time() - session.started_at)
+                self.evicted.add(sid)
+            for sid in list(self.writing):
+                data = self.writing[sid]
+                try:
+                    await asyncio.to_thread(save_snapshot, data, self.path(sid))
+                except OSError as error:
+                    # a full disk for example: the session stays in memory and is written again after its timeout
+                    LOGGER.error("could not write the snapshot of session %s: %s", sid, error)
+                    if self.writing.get(sid) is data:
+                        del self.writing[sid]
+                        if sid in self.evicted:
+                            self.evicted.discard(sid)
+                            snapshot = unpack_snapshot(data, sid)
+                            self.sessions[sid] = Session(snapshot.board, snapshot.level,
+                                                         elapsed_time=snapshot.elapsed_time)
+                    continue
+                # the session may have come back meanwhile, its file is then outdated
+                if self.writing.get(sid) is data:
+                    del self.writing[sid]
+                    if sid not in self.evicted:
+                        try:
+                            os.remove(self.path(sid))
+                        except OSError as error:
+                            LOGGER.error("could not remove the outdated snapshot of session %s: %s", sid, error)
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None) -> None:
+        """
+        serve until cancelled
+        :param host: the address to listen on
+        :param port: the port to listen on
+        :param unix: the path of a unix socket to listen on instead
+        :return: None
+        """
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle_client, unix)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        evictor = asyncio.create_task(self.evict_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+
+def parse_args(argv) -> argparse.Namespace:
+    """
+    parse the command line
+    :param argv: the arguments
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Serve headless Minesweeper games over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="the port to listen on")
+    parser.add_argument("--unix", help="listen on this unix socket instead of a port")
+    parser.add_argument("--folder", default="sessions", help="the folder of the evicted sessions")
+    parser.add_argument("--idle", type=float, default=300.0, help="the seconds after which a session is evicted")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = GameServer(args.folder, args.idle)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
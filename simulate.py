@@ -0,0 +1,147 @@
+"""
+play many headless games with the solver and report the results as JSON lines
+
+    python simulate.py expert -n 10000
+    python simulate.py custom --width 100 --height 100 --mines 2000 -n 200 -j 4 -o results.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from src.batchSolver import BatchSolver
+from src.levels import LEVELS
+
+PHASES = ("generate", "reveal", "observe", "deduce", "guess")
+
+# the number of boards a worker plays at once
+BATCH = 512
+
+
+def run_chunk(task) -> dict:
+    """
+    play a chunk of games in a worker process, all of them at once with the batch solver
+    :param task: (chunk index, seed sequence of the chunk, number of games, width, height, mines, safe zone)
+    :return: the aggregated results of the chunk
+    """
+    index, seed, games, width, height, num_of_mines, safe_zone = task
+    result = {"chunk": index, "games": games, "wins": 0, "guesses": 0, "moves": 0, "reveals": 0,
+              "cascade_cells": 0, "cascade_max": 0}
+    start = time.perf_counter()
+    solver = BatchSolver(width, height, num_of_mines, num_envs=min(games, BATCH), seed=seed, safe_zone=safe_zone)
+    for won, guesses, moves, reveals, cascade_cells, cascade_max in solver.play(games):
+        result["wins"] += won
+        result["guesses"] += guesses
+        result["moves"] += moves
+        result["reveals"] += reveals
+        result["cascade_cells"] += cascade_cells
+        result["cascade_max"] = max(result["cascade_max"], cascade_max)
+    result["seconds"] = {**solver.timings, "total": time.perf_counter() - start}
+    return result
+
+
+def summarize(total, games) -> dict:
+    """
+    turn summed counters into per game averages
+    :param total: the summed results
+    :param games: the number of games
+    :return: the averages
+    """
+    games = max(games, 1)
+    return {
+        "win_rate": round(total["wins"] / games, 4),
+        "moves_per_game": round(total["moves"] / games, 2),
+        "guesses_per_game": round(total["guesses"] / games, 3),
+        "mean_cascade": round(total["cascade_cells"] / max(total["reveals"], 1), 2),
+        "max_cascade": total["cascade_max"],
+        "ms_per_game": {phase: round(seconds * 1000 / games, 4) for phase, seconds in total["seconds"].items()},
+    }
+
+
+def engine_version() -> str:
+    """
+    get the commit of the engine, so that runs of different versions can be compared
+    :return: the git commit, or "unknown" outside of a git checkout
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_args(argv) -> argparse.Namespace:
+    """
+    parse the command line
+    :param argv: the arguments
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Play headless Minesweeper games with the solver.")
+    parser.add_argument("level", choices=[*LEVELS, "custom"])
+    parser.add_argument("--width", type=int, help="the width of a custom board")
+    parser.add_argument("--height", type=int, help="the height of a custom board")
+    parser.add_argument("--mines", type=int, help="the number of mines of a custom board")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="the number of games")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="the number of processes")
+    parser.add_argument("--chunk", type=int, default=1000, help="the number of games per task")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the whole run")
+    parser.add_argument("--safe-zone", action="store_true", help="keep the 3x3 area around the first click clear")
+    parser.add_argument("-o", "--output", help="append the JSON lines to this file instead of stdout")
+    args = parser.parse_args(argv)
+    if args.level == "custom":
+        if None in (args.width, args.height, args.mines):
+            parser.error("a custom level needs --width, --height and --mines")
+        if args.width <= 0 or args.height <= 0:
+            parser.error("--width and --height must be positive")
+        if not 0 <= args.mines < args.width * args.height:
+            parser.error(f"--mines must be between 0 and {args.width * args.height - 1}")
+    else:
+        args.width, args.height, args.mines = LEVELS[args.level]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = max(1, args.workers)
+    chunk = max(1, args.chunk)
+    sizes = [min(chunk, args.games - start) for start in range(0, args.games, chunk)]
+    # every chunk gets its own seed, so that the results do not depend on the number of workers
+    seeds = np.random.SeedSequence(args.seed).spawn(len(sizes))
+    tasks = [(index, seeds[index], size, args.width, args.height, args.mines, args.safe_zone)
+             for index, size in enumerate(sizes)]
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    run = {"level": args.level, "width": args.width, "height": args.height, "mines": args.mines,
+           "seed": args.seed, "safe_zone": args.safe_zone, "workers": workers, "engine": engine_version(),
+           "python": platform.python_version(), "numpy": np.__version__}
+    total = {"wins": 0, "guesses": 0, "moves": 0, "reveals": 0, "cascade_cells": 0, "cascade_max": 0,
+             "seconds": dict.fromkeys((*PHASES, "total"), 0.0)}
+    games = 0
+    start = time.perf_counter()
+    try:
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(run_chunk, tasks):
+                games += result["games"]
+                for key in ("wins", "guesses", "moves", "reveals", "cascade_cells"):
+                    total[key] += result[key]
+                total["cascade_max"] = max(total["cascade_max"], result["cascade_max"])
+                for phase, seconds in result["seconds"].items():
+                    total["seconds"][phase] += seconds
+                print(json.dumps({"type": "chunk", "chunk": result["chunk"], "games": result["games"],
+                                  **summarize(result, result["games"])}), file=out, flush=True)
+        wall = time.perf_counter() - start
+        print(json.dumps({"type": "summary", **run, "games": games, "wall_s": round(wall, 3),
+                          "games_per_s": round(games / wall, 1), **summarize(total, games)}), file=out, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
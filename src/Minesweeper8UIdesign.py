@@ -1,96 +1,242 @@
-import random
 import sys
 import tkinter as tk
 import tkinter.messagebox
 import time
-import sqlite3
+
+import numpy as np
 
 from src.baseInterface import BaseInterface
+from src.board import Board
+from src.boardPool import POOL, generate_no_guess
 from src.buttons import Buttons
+from src.canvasBoard import CanvasBoard
+from src.heatmap import HEAT_COLORS, SHADES, HeatmapWorker
+from src.history import History
+from src.metrics import bbbv_per_second, board_metrics
+from src.profiler import PROFILER
+from src.records import RecordStore
+from src.replay import FLAG, REVEAL, ReplayWriter, replay_path
+from src.scheduler import UIScheduler
+from src.snapshot import SnapshotWriter, pack_snapshot
+from src.topology import SQUARE, level_topology
+
+# boards with more cells than this are drawn on a canvas instead of with one button per cell
+CANVAS_THRESHOLD = 40 * 40
+
+# the unfinished game is saved every AUTOSAVE_INTERVAL milliseconds, when it changed
+AUTOSAVE_INTERVAL = 10000
+
+# the profiling overlay is refreshed every PROFILE_INTERVAL milliseconds while it is shown
+PROFILE_INTERVAL = 500
+
+# the heatmap is polled every frame, and at most HEAT_BATCH cells are shaded per frame
+HEAT_INTERVAL = 16
+HEAT_BATCH = 400
 
 
-class MineSweeper(BaseInterface, Buttons):
-    def __init__(self, width: int, height: int, num_of_mines: int, level: str, callback) -> None:
+class MineSweeper(BaseInterface):
+    def __init__(self, width: int, height: int, num_of_mines: int, level: str, callback, renderer=None,
+                 seed=None, safe_zone=False, no_guess=False, root=None, replay=None, snapshot=None,
+                 practice=False, topology=None) -> None:
         """
         initialize the MineSweeper game
         :param width: the width of the board
         :param height: the height of the board
         :param num_of_mines: the number of mines
+        :param level: the name of the level, used for the records
+        :param callback: called with the main window to go back to the level selection
+        :param renderer: Buttons or CanvasBoard, chosen from the size of the board if not given
+        :param seed: the seed of the mine positions, random if not given
+        :param safe_zone: keep the first click and its neighbors free of mines
+        :param no_guess: only play boards which can be cleared from the first click without guessing
+        :param root: the main window, created if not given
+        :param replay: a Replay to play back instead of letting the player play, the game is recorded otherwise
+        :param snapshot: a saved Snapshot to resume
+        :param practice: a practice game, where a mine hit can be undone; it is neither recorded nor saved
+        :param topology: the neighbors of the cells, taken from the end of the level name if not given
         """
         # initialize the game constants
-        self.mines = None
         self.width: int = width
         self.height: int = height
         self.num_of_mines: int = num_of_mines
         self.normal_color: str = "SystemButtonFace"
         self.level = level
+        self.topology = topology or level_topology(level)
         self.callback = callback
-        self.start_time = 0
-
-        # create the main window
-        BaseInterface.__init__(self)
-
-        # initialize the game state
-        self.over = False
-        self.is_show_answer = False
-        self.show_answer_done = False
-        self.first_click_done = False
+        self.seed = seed
+        self.safe_zone = safe_zone
+        self.no_guess = no_guess
+        self.replay = replay
+        self.practice = practice
+        self.recorder = None
+        self.replay_job = None
+        self.speed = 1.0
+        self.changed = False
+
+        # create the screen in the main window
+        BaseInterface.__init__(self, root)
 
         # create the timer
-        self.time_label = tk.Label(self.root, text="0 s")
+        self.timer_job = None
+        self.time_label = tk.Label(self.screen, text="0 s")
         self.time_label.pack()
 
         # create the game area
-        self.frame = BaseInterface.create_frame(self.root, width, height)
-
-        # make all rows and columns in the frame expand with the frame
-        for i in range(height):
-            self.frame.rowconfigure(i, weight=1)
-        for i in range(width):
-            self.frame.columnconfigure(i, weight=1)
+        if renderer is None:
+            renderer = CanvasBoard if width * height > CANVAS_THRESHOLD else Buttons
+        if renderer is CanvasBoard:
+            self.frame = BaseInterface.create_frame(self.screen, 1, 1)
+        else:
+            self.frame = BaseInterface.create_frame(self.screen, width, height)
 
         # create the number of mines label and the number of flags label
-        self.mines_label = tk.Label(self.root, text=f"{num_of_mines} mines")
+        self.mines_label = tk.Label(self.screen, text=f"{num_of_mines} mines")
         self.mines_label.pack(side=tk.RIGHT)
-        self.flags_label = tk.Label(self.root, text="0 flags")
+        self.flags_label = tk.Label(self.screen, text="0 flags")
         self.flags_label.pack(side=tk.RIGHT)
 
         # create the game label
-        self.game_label = tk.Label(self.root, text="")
+        self.game_label = tk.Label(self.screen, text="")
         self.game_label.pack()
 
         # create the game buttons
-        self.button_quit = tk.Button(self.root, text="quit", command=self.quit, width=10)
+        self.button_quit = tk.Button(self.screen, text="quit", command=self.quit, width=10)
         self.button_quit.pack(side=tk.LEFT)
-        self.button_restart = tk.Button(self.root, text="rechoose", command=self.rechoose, width=10)
+        self.button_restart = tk.Button(self.screen, text="rechoose", command=self.rechoose, width=10)
         self.button_restart.pack(side=tk.LEFT)
-        self.button_show_hide_answer = tk.Button(self.root, text="show answer",
+        self.button_new_game = tk.Button(self.screen, text="restart", command=self.restart, width=10)
+        self.button_new_game.pack(side=tk.LEFT)
+        self.button_show_hide_answer = tk.Button(self.screen, text="show answer",
                                                  command=lambda:
                                                  self.show_hide_answer(), width=15)
         self.button_show_hide_answer.pack(side=tk.LEFT)
-        self.button_show_records = tk.Button(self.root, text="show records", command=self.show_records, width=15)
+        self.button_show_records = tk.Button(self.screen, text="show records", command=self.show_records, width=15)
         self.button_show_records.pack(side=tk.LEFT)
+        tk.Button(self.screen, text="profile", command=self.toggle_profile, width=8).pack(side=tk.LEFT)
+        tk.Button(self.screen, text="heatmap", command=self.toggle_heatmap, width=8).pack(side=tk.LEFT)
+        if replay is None:
+            tk.Button(self.screen, text="undo", command=self.undo, width=6).pack(side=tk.LEFT)
+            tk.Button(self.screen, text="redo", command=self.redo, width=6).pack(side=tk.LEFT)
+            self.root.bind("<Control-z>", lambda event: self.undo())
+            self.root.bind("<Control-y>", lambda event: self.redo())
+
+        # the mine probability heatmap, computed by a worker thread while it is shown
+        self.heatmap = None
+        self.heat_job = None
+        self.heat_pending: list = []
+
+        # the bulk updates of the cells, such as the mines shown at the end of a game, are drawn a slice per frame
+        self.scheduler = UIScheduler(self.screen)
+
+        # create the profiling overlay, hidden until the profile button is clicked
+        self.profile_job = None
+        self.profile_frame = tk.Frame(self.screen)
+        self.profile_label = tk.Label(self.profile_frame, text="", font=("Courier", 10), justify=tk.LEFT)
+        self.profile_label.pack(side=tk.LEFT)
+        tk.Button(self.profile_frame, text="save JSON", command=self.dump_profile, width=10).pack(side=tk.RIGHT)
+
+        # create the playback buttons
+        if replay is not None:
+            self.replay_events = list(replay.events())
+            self.speed_label = tk.Label(self.screen, text="1x")
+            self.speed_label.pack(side=tk.RIGHT)
+            tk.Button(self.screen, text="slower", command=lambda: self.change_speed(0.5), width=8).pack(side=tk.LEFT)
+            tk.Button(self.screen, text="faster", command=lambda: self.change_speed(2), width=8).pack(side=tk.LEFT)
+            tk.Button(self.screen, text="skip to end", command=self.skip_to_end, width=10).pack(side=tk.LEFT)
 
         # initialize the game
-        self.correct_flags_count = 0
-        self.flags_count = 0
-        Buttons.__init__(self, self.frame, width, height)
-        self.buttons = self.place_buttons(self.width, self.height)
+        self.view = renderer(self.frame, width, height, topology=self.topology)
+        self.new_game()
+
+        # resume the saved game
+        if snapshot is not None:
+            self.resume(snapshot)
 
         # bind the button click event
         self.bind_buttons(self.width, self.height, self.game_label)
 
+        # save the unfinished game in the background, and when the window is closed
+        self.saver = SnapshotWriter()
+        self.autosave_job = self.screen.after(AUTOSAVE_INTERVAL, self.autosave)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
         # center the window
         self.root.update()
         BaseInterface.center_window(self.root)
 
-        # connect to the database
-        self.conn = sqlite3.connect("records.db")  # connect to the database.
-        self.cur = self.conn.cursor()  # create a cursor
-        self.cur.execute("CREATE TABLE IF NOT EXISTS records (level TEXT, time INTEGER)")  # create a table
-        self.conn.commit()  # commit the changes
+        # the records database is shared by every game
+        self.records = RecordStore.shared()
+
+    def new_game(self) -> None:
+        """
+        reset the game state and create a new headless board, the widgets are kept
+        :return: None
+        """
+        self.mines = None
+        self.board = Board(self.width, self.height, self.num_of_mines, self.topology)
+        self.start_time = 0
+        self.over = False
+        self.is_show_answer = False
+        self.show_answer_done = False
+        self.first_click_done = False
+        self.history = History(self.height)
+        self.undo_used = False
+        self.heat = np.full((self.width, self.height), -1, dtype=np.int8)  # the shade drawn on every cell
+        self.heat_pending = []
+        if self.heatmap is not None:
+            self.heatmap.cancel()
+        self.scheduler.cancel()
+        self.cancel_timer()
+        self.time_label.config(text="0 s")
+        self.flags_label.config(text="0 flags")
+        self.game_label.config(text="")
+        self.button_show_hide_answer.config(text="show answer")
+        self.stop_recording()
+        if self.replay is not None:
+            self.cancel_replay()
+            self.replay_index = 0
+            if self.replay_events:
+                self.replay_job = self.screen.after(int(self.replay_events[0][3] / self.speed), self.play_replay)
+        elif not self.practice:
+            self.recorder = ReplayWriter(replay_path(self.level))
+
+    def resume(self, snapshot) -> None:
+        """
+        show a saved game and start its timer where it stopped, a resumed game is not recorded as a replay
+        :param snapshot: the saved game
+        :return: None
+        """
+        self.stop_recording()
+        self.board = snapshot.board
+        self.mines = self.board.mine_cells()
+        self.first_click_done = True
+        xs, ys = np.nonzero(self.board.revealed)
+        counts = self.board.counts[xs, ys]
+        for x, y, count in zip(xs.tolist(), ys.tolist(), counts.tolist()):
+            self.view.update_cell(x, y, state="disabled", bg=self.normal_color, text=count or "")
+        for x, y in zip(*np.nonzero(self.board.flagged)):
+            self.view.update_cell(int(x), int(y), text="🚩", state="disabled", bg="#00FFFF")
+        self.flags_label.config(text=f"{self.board.flags_count} flags")
+        self.start_time = time.time() - snapshot.elapsed_time
+        self.update_timer(self.time_label)
+
+    def restart(self) -> None:
+        """
+        restart the same level, only the cells which changed during the game are reset
+        :return: None
+        """
+        if self.first_click_done and not self.over:
+            self.delete_save()
+        changed = self.board.revealed | self.board.flagged | (self.heat >= 0)
+        if self.first_click_done and (self.over or self.show_answer_done):
+            changed |= self.board.mines  # the answer may still be hiding when the cells are reset
+        self.scheduler.cancel()
+        xs, ys = np.nonzero(changed)
+        self.view.reset(xs.tolist(), ys.tolist())
+        self.new_game()
 
     # randomly generate the positions of mines
+    @PROFILER.profiled("random_mines")
     def random_mines(self, i_first_click, j_first_click, w, h) -> tuple:
         """
         randomly generate the positions of mines
@@ -100,14 +246,28 @@ class MineSweeper(BaseInterface, Buttons):
         :param h: the height of the board
         :return: the list of mines
         """
-        mines = []
-        while len(mines) < self.num_of_mines:
-            possible_mine = (random.randint(0, w - 1), random.randint(0, h - 1))
-            if possible_mine != (i_first_click, j_first_click) and possible_mine not in mines:
-                mines.append(possible_mine)
-        return tuple(mines)
+        if self.replay is not None:
+            self.board.place_mines(self.replay.mines)
+            return self.board.mine_cells()
+        if self.no_guess:
+            # a seeded game must not depend on what the pool holds, and the pool only holds square boards
+            mines = None
+            if self.seed is None and self.topology is SQUARE:
+                mines = POOL.take(w, h, self.num_of_mines, i_first_click, j_first_click)
+            if mines is None:
+                found = generate_no_guess(w, h, self.num_of_mines, i_first_click, j_first_click, self.seed, 200,
+                                          self.topology)
+                mines = None if found is None else found[0]
+            if mines is not None:
+                self.board.place_mines(mines)
+                return self.board.mine_cells()
+            # no board without guess was found in time, the player is told that this one may need a guess
+            self.game_label.config(text="May need a guess")
+        self.board.generate_mines(i_first_click, j_first_click, self.seed, self.safe_zone)
+        return self.board.mine_cells()
 
     # count the number of mines around (i, j)
+    @PROFILER.profiled("count_mines")
     def count_mines(self, i, j, w, h) -> int:
         """
         count the number of mines around (i, j)
@@ -117,12 +277,7 @@ class MineSweeper(BaseInterface, Buttons):
         :param h: the height of the board
         :return: the number of mines around (i, j)
         """
-        count = 0
-        for x in range(max(0, i - 1), min(w, i + 2)):
-            for y in range(max(0, j - 1), min(h, j + 2)):
-                if (x, y) in self.mines:
-                    count += 1
-        return count
+        return self.board.count_mines(i, j)
 
     def bind_buttons(self, w, h, label) -> None:
         """
@@ -132,14 +287,13 @@ class MineSweeper(BaseInterface, Buttons):
         :param label: the label to display the result
         :return: None
         """
-        for i0 in range(w):
-            for j0 in range(h):
-                self.buttons[i0][j0].config(command=lambda i=i0, j=j0: self.reveal(i, j, w, h, self.buttons, label))
-                self.buttons[i0][j0].bind("<Button-3>",
-                                          lambda event, i=i0, j=j0: self.place_remove_flag(i, j, label))
+        # the clicks are ignored while a replay is played
+        self.view.bind_cells(lambda i, j: self.replay is None and self.reveal(i, j, w, h, self.view, label),
+                             lambda i, j: self.replay is None and self.place_remove_flag(i, j, label))
 
     # define the left click event
-    def reveal(self, i, j, w, h, buttons, label) -> None:
+    @PROFILER.profiled("reveal")
+    def reveal(self, i, j, w, h, view, label) -> None:
         """
         the left click event -> reveal the button
         :param label: the label to display the result
@@ -147,38 +301,82 @@ class MineSweeper(BaseInterface, Buttons):
         :param j: the y coordinate
         :param w: the width of the board
         :param h: the height of the board
-        :param buttons: the list of buttons. Keep the parameter to accelerate the program
+        :param view: the board view. Keep the parameter to accelerate the program
         :return: None
         """
+        # a finished game whose buttons are being disabled, or a practice game waiting for the mine hit to be undone
+        if self.over or self.board.lost:
+            return None
         if not self.first_click_done:
             self.first_click_done = True
             self.mines = self.random_mines(i, j, self.width, self.height)
+            if self.recorder is not None:
+                self.recorder.start(self.board, self.level)
 
-            # start the timer
+            # start the timer, a replay shows the time of its events instead
             self.start_time = time.time()
-            self.update_timer(self.time_label)
+            if self.replay is None:
+                self.update_timer(self.time_label)
+
+        if self.recorder is not None:
+            self.recorder.record(i, j, REVEAL)
+        self.changed = True
+        # compute the whole set of revealed cells first, then update the buttons in one pass
+        xs, ys = self.board.reveal(i, j)
+        PROFILER.observe("reveal.cascade", xs.size, "cells")
+        if xs.size:
+            self.history.push(REVEAL, xs, ys)
+        if self.board.lost:
+            self.hit_mine(i, j, view, label)
+            return None
+        self.draw_revealed(xs, ys, view)
+        self.check_win(label)
+        self.request_heatmap()
 
-        if (i, j) in self.mines:
-            buttons[i][j].config(text="*", background="#FF8080", state="disabled")  # light red
-            self.turn_off_buttons(buttons)
+    def hit_mine(self, i, j, view, label) -> None:
+        """
+        show the mine at (i, j) which was just revealed, and end the game unless it is a practice game
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param view: the board view
+        :param label: the label to display the result
+        :return: None
+        """
+        view.update_cell(i, j, text="*", background="#FF8080", state="disabled")  # light red
+        if self.practice:
+            label.config(text="Mine hit, undo to go on")
+            self.stop_heatmap()
+        else:
             label.config(text="Game Over")
-            self.change_mine_color(buttons, self.mines)
+            self.change_mine_color(view, self.mines, self.board.flagged)
+            self.turn_off_buttons(view)
             self.over = True
-            return None
-        count = self.count_mines(i, j, w, h)
-        buttons[i][j].config(state="disabled", bg=self.normal_color)
-        if count != 0:
-            buttons[i][j].config(text=count)
-        else:
-            for x in range(max(0, i - 1), min(w, i + 2)):
-                for y in range(max(0, j - 1), min(h, j + 2)):
-                    if buttons[x][y]["state"] == "normal":
-                        self.reveal(x, y, w, h, buttons, label)
+            self.stop_recording()
+            self.delete_save()
+            self.stop_heatmap()
+
+    def draw_revealed(self, xs, ys, view) -> None:
+        """
+        show the count of revealed cells
+        :param xs: the x coordinates
+        :param ys: the y coordinates
+        :param view: the board view
+        :return: None
+        """
+        counts = self.board.counts[xs, ys]
+        for x, y, count in zip(xs.tolist(), ys.tolist(), counts.tolist()):
+            view.update_cell(x, y, state="disabled", bg=self.normal_color, text=count or "")
 
     def place_remove_flag(self, i, j, label) -> None:
-        if self.buttons[i][j].cget("state") == "normal":
+        if self.over or self.board.lost or self.board.revealed[i, j]:
+            return None
+        if self.recorder is not None:
+            self.recorder.record(i, j, FLAG)
+        self.changed = True
+        self.history.push(FLAG, [i], [j])
+        if self.board.toggle_flag(i, j):
             self.place_flag(i, j, label)
-        elif self.buttons[i][j].cget("state") == "disabled" and self.buttons[i][j].cget("text") == "🚩":
+        else:
             self.remove_flag(i, j, label)
         self.check_win(label)
 
@@ -190,7 +388,8 @@ class MineSweeper(BaseInterface, Buttons):
         :param label: the label to display the result
         :return: None
         """
-        self.buttons[i][j].config(text="🚩", state="disabled", bg="#00FFFF")
+        self.scheduler.update_now(self.view, i, j, text="🚩", state="disabled", bg="#00FFFF")
+        self.heat[i, j] = -1
         self.change_flags_label(i, j, label, 1)
 
     # define the middle click event
@@ -204,101 +403,108 @@ class MineSweeper(BaseInterface, Buttons):
         :param label: the label to display the result
         :return: None
         """
-        self.buttons[i][j].config(text="", state="normal", bg="light blue")
+        self.scheduler.update_now(self.view, i, j, text="", state="normal", bg="light blue")
+        self.heat[i, j] = -1
+        self.request_heatmap()
         self.change_flags_label(i, j, label, -1)
 
     # change the number of flags label
-    def check_flag(self, i, j, mines, num_of_change) -> None:
-        """
-        check if the flag is placed correctly
-        :param num_of_change: the number of change
-        :param i: the x coordinate
-        :param j: the y coordinate
-        :param mines: the list of mines
-        :return: None
-        """
-        if (i, j) in mines:
-            self.correct_flags_count += num_of_change
-
-    # check if the flag is placed correctly
     def change_flags_label(self, i, j, label, num_of_change) -> None:
         """
-        change the number of flags label
+        change the number of flags label, the board already counted the flag
         :param i: the x coordinate
         :param j: the y coordinate
         :param label: the label to display the result
         :param num_of_change: the number of change
         :return: None
         """
-        self.flags_count += num_of_change
-        self.check_flag(i, j, self.mines, num_of_change)
-        self.flags_label.config(text=f"{self.flags_count} flags")
-        self.check_win(label)
+        self.flags_label.config(text=f"{self.board.flags_count} flags")
 
     # check if the game is over
     def check_win(self, label) -> None:
         """
-        check if the game is over
+        check if the game is won, from the counters kept by the board
         :param label: the label to display the result
-        :return: the number of mines around (i, j)
+        :return: None
         """
-        if self.correct_flags_count == self.num_of_mines == self.flags_count:
-            self.turn_off_buttons(self.buttons)
+        if not self.over and self.board.won:
             label.config(text="You Win")
-            self.change_mine_color(self.buttons, self.mines)
+            self.change_mine_color(self.view, self.mines, self.board.flagged, won=True)
+            self.turn_off_buttons(self.view)
             self.over = True
-            self.check_record(int(time.time() - self.start_time))
+            self.stop_recording()
+            self.delete_save()
+            self.stop_heatmap()
+            self.check_record(time.time() - self.start_time)
 
     # check if it is a new record
     def check_record(self, elapsed_time) -> None:
         """
-        check if it is a new record
-        :param elapsed_time: the time elapsed
+        check if it is a new record, the game is recorded with the metrics of its board
+        :param elapsed_time: the time elapsed, in seconds
         :return: None
         """
-        self.cur.execute(f"SELECT * FROM records WHERE level = '{self.level}'")
-        records = self.cur.fetchall()
-        if (len(records) == 0 or elapsed_time < records[0][1]) and not self.show_answer_done:
-            self.cur.execute(f"DELETE FROM records WHERE level = '{self.level}'")
-            self.cur.execute(f"INSERT INTO records VALUES ('{self.level}', {elapsed_time})")
-            self.conn.commit()
-            tk.messagebox.showinfo("New Record", f"Congratulations! You set a new record: {elapsed_time} s")
+        if self.show_answer_done or self.replay is not None or self.practice or self.undo_used:
+            return None
+        metrics = board_metrics(self.board.mines, self.topology)
+        with PROFILER.timer("check_record.sqlite"):
+            # the games still queued count too, so that two quick wins are not both announced as records
+            self.records.flush()
+            best = self.records.best(self.level)
+            self.records.add(self.level, elapsed_time, metrics)
+        seconds = int(elapsed_time)
+        if best is None or seconds < best:
+            tk.messagebox.showinfo("New Record", f"Congratulations! You set a new record: {seconds} s\n"
+                                                 f"3BV {metrics['bbbv']}, "
+                                                 f"{bbbv_per_second(metrics['bbbv'], elapsed_time):.2f} 3BV/s")
 
     def show_records(self) -> None:
         """
         show the records
         :return: None
         """
-        self.cur.execute(f"SELECT * FROM records WHERE level = '{self.level}'")
-        records = self.cur.fetchall()
-        if len(records) == 0:
+        top = self.records.top(self.level, 5)
+        if len(top) == 0:
             tk.messagebox.showinfo("No Record", "No record yet")
         else:
-            tk.messagebox.showinfo("Record", f"Current record: {records[0][1]} s")
+            ranking = "\n".join(f"{rank}. {elapsed_time} s" for rank, (elapsed_time, _) in enumerate(top, 1))
+            median = self.records.time_at_percentile(self.level, 50)
+            efficiency = self.records.best_efficiency(self.level)
+            if efficiency is not None:
+                ranking += f"\n\nBest 3BV/s: {efficiency[0]:.2f} (3BV {efficiency[1]} in {efficiency[2]} s)"
+            tk.messagebox.showinfo("Record", f"Current record: {top[0][0]} s\n\n{ranking}\n\n"
+                                             f"{self.records.count(self.level)} games, median {median} s")
 
     # change the color of the mine when the game is over
-    @staticmethod
-    def change_mine_color(buttons, mines) -> None:
+    def change_mine_color(self, view, mines, flagged, won=False) -> None:
         """
-        change the color of the mine when the game is over
-        :param buttons: the list of buttons
+        change the color of the mine when the game is over, the mines are drawn a slice per frame and the time of
+        every slice is profiled
+        :param view: the board view
         :param mines: the list of mines
+        :param flagged: the boolean grid of flags
+        :param won: the game is won, so every mine is shown as found
         :return: None
         """
         for mine in mines:
-            if buttons[mine[0]][mine[1]]["text"] != "🚩":
-                buttons[mine[0]][mine[1]].config(text="*", background="#FF8080")  # light red
+            if won:
+                self.scheduler.update_cell(view, mine[0], mine[1], "change_mine_color", text="🚩",
+                                           background="light green")
+            elif not flagged[mine]:
+                self.scheduler.update_cell(view, mine[0], mine[1], "change_mine_color", text="*",
+                                           background="#FF8080")  # light red
             else:
-                buttons[mine[0]][mine[1]].config(background="light green")
+                self.scheduler.update_cell(view, mine[0], mine[1], "change_mine_color", background="light green")
 
     def show_answer(self) -> None:
         """
-        show the answer
+        show the answer, the mines are drawn a slice per frame; hiding it before they are all drawn only draws the
+        remaining ones once
         :return: None
         """
         for mine in self.mines:
-            if self.buttons[mine[0]][mine[1]].cget("text") != "🚩":
-                self.buttons[mine[0]][mine[1]].config(text="*")
+            if not self.board.flagged[mine]:
+                self.scheduler.update_cell(self.view, mine[0], mine[1], text="*")
         self.button_show_hide_answer.config(text="hide answer")
 
     def hide_answer(self) -> None:
@@ -307,8 +513,8 @@ class MineSweeper(BaseInterface, Buttons):
         :return: None
         """
         for mine in self.mines:
-            if self.buttons[mine[0]][mine[1]].cget("text") != "🚩":
-                self.buttons[mine[0]][mine[1]].config(text="")
+            if not self.board.flagged[mine]:
+                self.scheduler.update_cell(self.view, mine[0], mine[1], text="")
         self.button_show_hide_answer.config(text="show answer")
 
     def show_hide_answer(self) -> None:
@@ -328,16 +534,20 @@ class MineSweeper(BaseInterface, Buttons):
             self.is_show_answer = True
 
     # disable all buttons
-    @staticmethod
-    def turn_off_buttons(buttons) -> None:
+    def turn_off_buttons(self, view) -> None:
         """
-        disable all buttons
-        :param buttons: the list of buttons, keep the parameter to accelerate the program
+        disable all buttons, the buttons of a board of buttons are disabled a few rows per frame and the time of
+        every slice is profiled
+        :param view: the board view, keep the parameter to accelerate the program
         :return: None
         """
-        for row in buttons:
-            for button in row:
-                button.config(state="disabled")
+        if isinstance(view, Buttons):
+            view.disabled = True  # a restart enables every button again, even the rows not disabled yet
+            for i in range(self.width):
+                self.scheduler.submit(("disable", i), view.disable_row, i, profile="turn_off_buttons")
+        else:
+            with PROFILER.timer("turn_off_buttons"):
+                view.disable_all()
 
     def update_timer(self, label) -> None:
         """
@@ -345,7 +555,7 @@ class MineSweeper(BaseInterface, Buttons):
         :param label: the label to display the timer
         :return: None
         """
-        if self.root.winfo_exists():
+        if self.screen.winfo_exists():
             if self.over:
                 return
             # calculate the time elapsed (in seconds), and update the label text
@@ -353,20 +563,288 @@ class MineSweeper(BaseInterface, Buttons):
             label.config(text=f"{elapsed_time: >3} s")
 
             # call itself again after 1000ms to implement the timer
-            label.after(1000, self.update_timer, label)
+            self.timer_job = label.after(1000, self.update_timer, label)
+
+    def cancel_timer(self) -> None:
+        """
+        stop the timer of the current game
+        :return: None
+        """
+        if self.timer_job is not None:
+            self.time_label.after_cancel(self.timer_job)
+            self.timer_job = None
+
+    def toggle_profile(self) -> None:
+        """
+        show or hide the profiling overlay, the profiler collects while the overlay is shown
+        :return: None
+        """
+        if self.profile_job is None:
+            PROFILER.enabled = True
+            self.profile_frame.pack(side=tk.BOTTOM, fill=tk.X)
+            self.refresh_profile()
+        else:
+            PROFILER.enabled = False
+            self.profile_frame.pack_forget()
+            self.screen.after_cancel(self.profile_job)
+            self.profile_job = None
+
+    def refresh_profile(self) -> None:
+        """
+        show the p50 and p99 of every profiled hot path, and call itself again after PROFILE_INTERVAL
+        :return: None
+        """
+        lines = [f"{name:20}{summary['count']:>7}  p50 {summary['p50']:8.3g}  p99 {summary['p99']:8.3g} "
+                 f"{summary['unit']}" for name, summary in PROFILER.summary().items()]
+        self.profile_label.config(text="\n".join(lines) or "no call yet")
+        self.profile_job = self.screen.after(PROFILE_INTERVAL, self.refresh_profile)
+
+    def dump_profile(self) -> None:
+        """
+        save the histograms as JSON
+        :return: None
+        """
+        path = PROFILER.dump()
+        tk.messagebox.showinfo("Profile", f"The profile was saved in {path}")
+
+    def toggle_heatmap(self) -> None:
+        """
+        show or hide the mine probability of every covered cell
+        :return: None
+        """
+        if self.heatmap is None:
+            self.heatmap = HeatmapWorker()
+            self.request_heatmap()
+            if self.heat_job is None:
+                self.heat_job = self.screen.after(HEAT_INTERVAL, self.update_heatmap)
+        else:
+            self.heatmap.close()
+            self.heatmap = None
+            xs, ys = np.nonzero(self.heat >= 0)
+            self.heat_pending = [(x, y, -1) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def request_heatmap(self) -> None:
+        """
+        ask the worker for the probabilities of the current board, the previous request is abandoned
+        :return: None
+        """
+        if self.heatmap is not None and self.first_click_done and not self.over:
+            self.heatmap.submit(self.board.revealed, self.board.counts, self.num_of_mines, self.topology)
+
+    def stop_heatmap(self) -> None:
+        """
+        stop shading once the game is over, the mines are shown instead
+        :return: None
+        """
+        if self.heatmap is not None:
+            self.heatmap.cancel()
+        self.heat_pending = []
+
+    def update_heatmap(self) -> None:
+        """
+        take the latest probabilities from the worker and shade the cells whose shade changed
+        at most HEAT_BATCH cells are shaded per call, so that the window never waits more than a frame
+        :return: None
+        """
+        probabilities = self.heatmap.take() if self.heatmap is not None else None
+        if probabilities is not None and not self.over:
+            shades = np.rint(np.nan_to_num(probabilities) * (SHADES - 1)).astype(np.int8)
+            xs, ys = np.nonzero(~self.board.revealed & ~self.board.flagged & (shades != self.heat))
+            self.heat_pending = list(zip(xs.tolist(), ys.tolist(), shades[xs, ys].tolist()))
+        batch, self.heat_pending = self.heat_pending[:HEAT_BATCH], self.heat_pending[HEAT_BATCH:]
+        for x, y, shade in batch:
+            if self.board.revealed[x, y] or self.board.flagged[x, y]:
+                continue
+            self.view.update_cell(x, y, bg=HEAT_COLORS[shade] if shade >= 0 else "light blue")
+            self.heat[x, y] = shade
+        if self.heatmap is not None or self.heat_pending:
+            self.heat_job = self.screen.after(HEAT_INTERVAL, self.update_heatmap)
+        else:
+            self.heat_job = None
+
+    def undo(self) -> None:
+        """
+        take the last move back, only the cells it changed are drawn again
+        a game with an undo is not recorded, and its replay stops at the undo
+        :return: None
+        """
+        if self.replay is not None or self.over:
+            return None
+        move = self.history.undo()
+        if move is None:
+            return None
+        kind, xs, ys = move
+        self.undo_used = True
+        self.stop_recording()
+        self.changed = True
+        if kind == REVEAL:
+            self.board.set_revealed(xs, ys, False)
+            self.view.reset(xs.tolist(), ys.tolist())
+            self.heat[xs, ys] = -1
+            self.game_label.config(text="")
+            self.request_heatmap()
+        else:
+            self.toggle_flag(int(xs[0]), int(ys[0]))
+
+    def redo(self) -> None:
+        """
+        play the last undone move again, from the cells it changed rather than with a new flood fill
+        :return: None
+        """
+        if self.replay is not None or self.over or self.board.lost:
+            return None
+        move = self.history.redo()
+        if move is None:
+            return None
+        kind, xs, ys = move
+        self.changed = True
+        if kind == REVEAL:
+            self.board.set_revealed(xs, ys, True)
+            if self.board.lost:
+                self.hit_mine(int(xs[0]), int(ys[0]), self.view, self.game_label)
+                return None
+            self.draw_revealed(xs, ys, self.view)
+            self.request_heatmap()
+        else:
+            self.toggle_flag(int(xs[0]), int(ys[0]))
+        self.check_win(self.game_label)
+
+    def toggle_flag(self, i, j) -> None:
+        """
+        place or remove the flag at (i, j) for undo and redo
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: None
+        """
+        if self.board.toggle_flag(i, j):
+            self.place_flag(i, j, self.game_label)
+        else:
+            self.remove_flag(i, j, self.game_label)
+
+    def stop_recording(self, wait=False) -> None:
+        """
+        finish the replay file of the current game
+        :param wait: wait until the file is written
+        :return: None
+        """
+        if self.recorder is not None:
+            self.recorder.close(wait)
+            self.recorder = None
+
+    def play_replay(self) -> None:
+        """
+        play the next event of the replay, and schedule the one after it at the playback speed
+        :return: None
+        """
+        self.replay_job = None
+        if self.replay_index >= len(self.replay_events):
+            return None
+        at = self.play_event()
+        if self.replay_index < len(self.replay_events):
+            delay = (self.replay_events[self.replay_index][3] - at) / self.speed
+            self.replay_job = self.screen.after(int(delay), self.play_replay)
+
+    def play_event(self) -> int:
+        """
+        play the next event of the replay
+        :return: the time of the event in milliseconds
+        """
+        i, j, action, at = self.replay_events[self.replay_index]
+        self.replay_index += 1
+        if action == REVEAL:
+            self.reveal(i, j, self.width, self.height, self.view, self.game_label)
+        else:
+            self.place_remove_flag(i, j, self.game_label)
+        self.time_label.config(text=f"{(at - self.replay_events[0][3]) // 1000: >3} s")
+        return at
+
+    def skip_to_end(self) -> None:
+        """
+        play the remaining events of the replay at once
+        :return: None
+        """
+        self.cancel_replay()
+        while self.replay_index < len(self.replay_events):
+            self.play_event()
+
+    def change_speed(self, factor) -> None:
+        """
+        change the playback speed, the next event keeps its scheduled time
+        :param factor: the factor to multiply the speed by
+        :return: None
+        """
+        self.speed = min(64.0, max(1 / 8, self.speed * factor))
+        self.speed_label.config(text=f"{self.speed:g}x")
+
+    def cancel_replay(self) -> None:
+        """
+        stop the playback of the replay
+        :return: None
+        """
+        if self.replay_job is not None:
+            self.screen.after_cancel(self.replay_job)
+            self.replay_job = None
+
+    def save(self) -> None:
+        """
+        save the game in the background if it is unfinished and changed since the last save
+        only the bitmaps are packed here, the file is written by the saver thread
+        :return: None
+        """
+        if self.changed and self.first_click_done and not self.over and self.replay is None and not self.practice:
+            self.saver.save(pack_snapshot(self.board, self.level, time.time() - self.start_time))
+            self.changed = False
+
+    def delete_save(self) -> None:
+        """
+        delete the saved game once this game is won, lost or restarted, a replay or a practice game never had it
+        :return: None
+        """
+        if self.replay is None and not self.practice:
+            self.saver.delete()
+
+    def autosave(self) -> None:
+        """
+        save the game, and call itself again after AUTOSAVE_INTERVAL
+        :return: None
+        """
+        self.save()
+        self.autosave_job = self.screen.after(AUTOSAVE_INTERVAL, self.autosave)
 
     def quit(self) -> None:
         """
-        quit the game
+        save the unfinished game and quit
         :return: None
         """
+        self.stop_recording(wait=True)
+        self.save()
+        self.saver.close(wait=True)
         self.root.destroy()
         sys.exit()
 
     def rechoose(self) -> None:
         """
-        restart the game
+        go back to the level selection, in the same main window, an unfinished game stays saved
         :return: None
         """
-        self.root.destroy()
-        self.callback()
+        self.cancel_timer()
+        self.cancel_replay()
+        self.stop_recording()
+        self.scheduler.cancel()
+        self.screen.after_cancel(self.autosave_job)
+        if self.profile_job is not None:
+            PROFILER.enabled = False
+            self.screen.after_cancel(self.profile_job)
+            self.profile_job = None
+        if self.heat_job is not None:
+            self.screen.after_cancel(self.heat_job)
+        if self.heatmap is not None:
+            self.heatmap.close()
+        self.save()
+        # the next game writes the same file, the last snapshot of this one must not land after its first one
+        self.saver.close(wait=True)
+        self.root.unbind("<Control-z>")
+        self.root.unbind("<Control-y>")
+        self.root.protocol("WM_DELETE_WINDOW", self.root.destroy)
+        self.close()
+        self.callback(self.root)
@@ -2,12 +2,23 @@ import tkinter as tk
 
 
 class BaseInterface:
-    def __init__(self):
+    def __init__(self, root=None):
         """
-        initialize the main window
+        initialize a screen of the main window
+        every screen lives in its own frame, so that the main window is created once and only the screens change
+        :param root: the main window, created if not given
         """
-        self.root = tk.Tk()
+        self.root = root if root is not None else tk.Tk()
         self.root.title("Minesweeper")
+        self.screen = tk.Frame(self.root)
+        self.screen.pack(fill='both', expand=True)
+
+    def close(self) -> None:
+        """
+        remove the screen from the main window, the main window stays
+        :return: None
+        """
+        self.screen.destroy()
 
     @staticmethod
     def center_window(root) -> None:
@@ -0,0 +1,259 @@
+import numpy as np
+
+from src.topology import SQUARE
+
+# the observation of a cell: its count once revealed, otherwise one of these
+COVERED, FLAGGED, MINE = -1, -2, -3
+
+
+class BatchEnv:
+    def __init__(self, num_envs, width, height, num_of_mines, seed=None, safe_zone=False, auto_reset=True,
+                 topology=SQUARE) -> None:
+        """
+        play a batch of independent boards at once, for training agents
+        the grids of every board are stacked with a border, like the grids of Board, so that a single flood fill
+        runs over the whole batch without ever leaving a board
+        an action is a flat cell index i * height + j to reveal it, or height * width more to toggle its flag
+        :param num_envs: the number of boards
+        :param width: the width of the boards
+        :param height: the height of the boards
+        :param num_of_mines: the number of mines of every board
+        :param seed: the seed of the random generator
+        :param safe_zone: keep the neighbors of the first click free of mines, when there is room for it
+        :param auto_reset: start a new board as soon as a board is won or lost
+        :param topology: the neighbors of the cells, the same for every board
+        """
+        n = width * height
+        if not 0 <= num_of_mines < n:
+            raise ValueError(f"{num_of_mines} mines do not fit in a {width}*{height} board")
+        self.num_envs: int = num_envs
+        self.width: int = width
+        self.height: int = height
+        self.num_of_mines: int = num_of_mines
+        self.safe_zone = safe_zone
+        self.auto_reset = auto_reset
+        self.topology = topology
+        self.rng = np.random.default_rng(seed)
+
+        # the stacked grids, the public grids are views of their inside
+        pad = self._pad = topology.reach if topology.uniform else 1
+        self._stride = height + 2 * pad
+        self._size = (width + 2 * pad) * self._stride
+        shape = (num_envs, width + 2 * pad, height + 2 * pad)
+        inside = (slice(pad, -pad), slice(pad, -pad))
+        self._empty = np.ones(shape[1:], dtype=bool)
+        self._empty[inside] = False
+        self._mines = np.zeros(shape, dtype=bool)
+        self._counts = np.zeros(shape, dtype=np.int8)
+        self._revealed = np.broadcast_to(self._empty, shape).copy()
+        self._flagged = np.zeros(shape, dtype=bool)
+        self.mines = self._mines[(slice(None), *inside)]
+        self.counts = self._counts[(slice(None), *inside)]
+        self.revealed = self._revealed[(slice(None), *inside)]
+        self.flagged = self._flagged[(slice(None), *inside)]
+
+        # the flat offsets of the neighbors, or the padded table of a topology whose neighbors depend on the cell,
+        # the index of every bordered cell in the observations, and the start of every board in the flattened
+        # grids and in the observations
+        self._offsets = topology.stencil(self._stride) if topology.uniform else None
+        self._table = None if topology.uniform else topology.padded_table(width, height, pad)
+        self._to_obs = np.zeros(shape[1:], dtype=np.intp)
+        self._to_obs[inside] = np.arange(n).reshape(width, height)
+        self._to_obs = self._to_obs.reshape(-1)
+        self._base = np.arange(num_envs, dtype=np.intp) * self._size
+        self._obs_base = np.arange(num_envs, dtype=np.intp) * n
+        self._scratch = np.empty(num_envs * self._size, dtype=np.intp)
+
+        # the state of every board
+        self.placed = np.zeros(num_envs, dtype=bool)
+        self.lost = np.zeros(num_envs, dtype=bool)
+        self.over = np.zeros(num_envs, dtype=bool)
+        self.safe_left = np.full(num_envs, n - num_of_mines, dtype=np.int32)
+        self.flags_count = np.zeros(num_envs, dtype=np.int32)
+        self.correct_flags = np.zeros(num_envs, dtype=np.int32)
+
+        # the buffers returned by step, they are overwritten by the next step
+        self.observations = np.full((num_envs, width, height), COVERED, dtype=np.int8)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.wins = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, boards=None) -> np.ndarray:
+        """
+        start new boards, their mines are placed on their first reveal
+        :param boards: the indices or the boolean mask of the boards to reset, every board if not given
+        :return: the observations of the whole batch
+        """
+        if boards is None:
+            boards = np.arange(self.num_envs)
+        elif np.asarray(boards).dtype == bool:
+            boards = np.flatnonzero(boards)
+        self._mines[boards] = False
+        self._counts[boards] = 0
+        self._revealed[boards] = self._empty
+        self._flagged[boards] = False
+        self.observations[boards] = COVERED
+        self.placed[boards] = False
+        self.lost[boards] = False
+        self.over[boards] = False
+        self.safe_left[boards] = self.width * self.height - self.num_of_mines
+        self.flags_count[boards] = 0
+        self.correct_flags[boards] = 0
+        return self.observations
+
+    # randomly generate the mines of several boards at once
+    def generate_mines(self, boards, cells) -> None:
+        """
+        place the mines of boards on their first click, the first click is never a mine
+        every board draws a random key per cell and takes the cells of the smallest keys, the excluded cells get
+        a key out of reach
+        :param boards: the indices of the boards
+        :param cells: the flat cell index i * height + j of the first click of every board
+        :return: None
+        """
+        w, h, k = self.width, self.height, boards.size
+        keys = self.rng.random((k, w * h))
+        rows = np.arange(k)
+        keys[rows, cells] = 2.0
+        if self.safe_zone:
+            i, j = np.divmod(cells, h)
+            odd = (i % 2).astype(bool)
+            zone = [(i + np.where(odd, odd_di, di), j + np.where(odd, odd_dj, dj))
+                    for (di, dj), (odd_di, odd_dj) in zip(self.topology.offsets, self.topology.odd_offsets)]
+            if self.topology.wrap:
+                zone = [(x % w, y % h) for x, y in zone]
+            inside = np.array([(0 <= x) & (x < w) & (0 <= y) & (y < h) for x, y in zone])
+            flat = np.array([x * h + y for x, y in zone])
+            # on a small wrapped board several offsets can reach the same cell, or the click itself
+            repeated = (flat[:, None] == flat[None]) & inside[None] & np.tri(len(zone), k=-1, dtype=bool)[:, :, None]
+            distinct = inside & ~repeated.any(axis=1) & (flat != cells)
+            room = w * h - 1 - distinct.sum(axis=0) >= self.num_of_mines
+            for neighbor, valid in zip(flat, inside & room):
+                keys[rows[valid], neighbor[valid]] = 2.0
+        mines = np.zeros((k, w * h), dtype=bool)
+        if self.num_of_mines:
+            picks = np.argpartition(keys, self.num_of_mines - 1, axis=1)[:, :self.num_of_mines]
+            mines[rows[:, None], picks] = True
+        mines = mines.reshape(k, w, h)
+        self.mines[boards] = mines
+        self.counts[boards] = self.topology.counts(mines)
+        self.placed[boards] = True
+        self.correct_flags[boards] = (mines & self.flagged[boards]).sum(axis=(1, 2))
+
+    # play one action on every board
+    def step(self, actions) -> tuple:
+        """
+        play one action on every board: reveal a cell, with the flood fill of the empty areas, or toggle a flag
+        an action on a revealed cell, or a reveal on a flagged cell, does nothing
+        the reward is the share of the safe cells revealed by the action, so that a won game sums to 1, and -1
+        for a mine; a board won by its flags gets the share of the safe cells left
+        :param actions: the action of every board, an array of shape (num_envs,)
+        :return: the observations, the rewards and whether each board just ended, all of them buffers which are
+                 overwritten by the next step; with auto_reset the observation of an ended board is its new board
+        """
+        n = self.width * self.height
+        actions = np.asarray(actions, dtype=np.intp)
+        if actions.shape != (self.num_envs,) or actions.min() < 0 or actions.max() >= 2 * n:
+            raise ValueError(f"expected {self.num_envs} actions in [0, {2 * n})")
+        revealed = self._revealed.reshape(-1)
+        flagged = self._flagged.reshape(-1)
+        mines = self._mines.reshape(-1)
+        obs = self.observations.reshape(-1)
+        self.rewards[:] = 0.0
+
+        is_flag = actions >= n
+        cells = actions - n * is_flag
+        x, y = np.divmod(cells, self.height)
+        flat = self._base + (x + self._pad) * self._stride + y + self._pad
+        playable = ~self.over & ~revealed[flat]
+
+        # toggle the flags
+        toggled = np.flatnonzero(playable & is_flag)
+        if toggled.size:
+            targets = flat[toggled]
+            flagged[targets] ^= True
+            now = flagged[targets]
+            change = np.where(now, 1, -1).astype(np.int32)
+            self.flags_count[toggled] += change
+            self.correct_flags[toggled] += change * mines[targets]
+            obs[self._obs_index(targets)] = np.where(now, FLAGGED, COVERED)
+
+        # reveal the cells, the boards without mines yet get them first
+        clicked = np.flatnonzero(playable & ~is_flag & ~flagged[flat])
+        if clicked.size:
+            first = clicked[~self.placed[clicked]]
+            if first.size:
+                self.generate_mines(first, cells[first])
+            opened, hit, _ = self._open(flat[clicked])
+            self.rewards += opened / (n - self.num_of_mines)
+            self.rewards[clicked[hit]] = -1.0
+
+        # the boards which just ended
+        won = self.placed & ~self.lost & ((self.safe_left == 0) | (
+            (self.correct_flags == self.num_of_mines) & (self.flags_count == self.num_of_mines)))
+        np.logical_and(won, ~self.over, out=self.wins)
+        np.logical_and(won | self.lost, ~self.over, out=self.dones)
+        self.rewards[self.wins] += self.safe_left[self.wins] / (n - self.num_of_mines)
+        self.over |= self.dones
+        if self.auto_reset and self.dones.any():
+            self.reset(np.flatnonzero(self.dones))
+        return self.observations, self.rewards, self.dones
+
+    def _open(self, starts) -> tuple:
+        """
+        reveal cells of boards whose mines are placed, with the flood fill of the empty areas
+        :param starts: the distinct flat indices of the cells in the bordered grids, none of them revealed or flagged
+        :return: the number of safe cells revealed on every board, which starts are mines, and the flat indices of
+                 the safe cells revealed
+        """
+        revealed = self._revealed.reshape(-1)
+        obs = self.observations.reshape(-1)
+        revealed[starts] = True
+        hit = self._mines.reshape(-1)[starts]
+        cascade = self._flood(starts[~hit])
+        obs[self._obs_index(cascade)] = self._counts.reshape(-1)[cascade]
+        opened = np.bincount(cascade // self._size, minlength=self.num_envs)
+        self.safe_left -= opened.astype(np.int32)
+        if hit.any():
+            self.lost[starts[hit] // self._size] = True
+            obs[self._obs_index(starts[hit])] = MINE
+        return opened, hit, cascade
+
+    def _flood(self, starts) -> np.ndarray:
+        """
+        expand the revealed areas of every board from cells which were just revealed, the borders stop the flood
+        fill at the edge of each board
+        :param starts: the flat indices of the revealed cells, none of them is a mine
+        :return: the flat indices of the starts and of every cell revealed by the flood fill
+        """
+        revealed = self._revealed.reshape(-1)
+        flagged = self._flagged.reshape(-1)
+        counts = self._counts.reshape(-1)
+        scratch = self._scratch
+        cascade = [starts]
+        frontier = starts[counts[starts] == 0]
+        while frontier.size:
+            if self._table is None:
+                neighbors = (frontier[:, None] + self._offsets).reshape(-1)
+            else:
+                # the table is shared by the boards: look up the cell within its board, then move back to the board
+                local = frontier % self._size
+                neighbors = (np.take(self._table, local, axis=0) + (frontier - local)[:, None]).reshape(-1)
+            neighbors = neighbors[~(revealed[neighbors] | flagged[neighbors])]
+            # drop the duplicates without sorting: only the last write of each index survives
+            order = np.arange(neighbors.size, dtype=np.intp)
+            scratch[neighbors] = order
+            neighbors = neighbors[scratch[neighbors] == order]
+            revealed[neighbors] = True
+            cascade.append(neighbors)
+            frontier = neighbors[counts[neighbors] == 0]
+        return np.concatenate(cascade)
+
+    def _obs_index(self, flat) -> np.ndarray:
+        """
+        convert indices of the flattened bordered grids to indices of the flattened observations
+        :param flat: the flat indices
+        :return: the indices in the observations
+        """
+        boards = flat // self._size
+        return self._obs_base[boards] + self._to_obs[flat - boards * self._size]
@@ -0,0 +1,299 @@
+import time
+
+import numpy as np
+
+from src.batchEnv import BatchEnv
+from src.topology import SQUARE
+
+# the number of set bits of every byte
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+class BatchSolver(BatchEnv):
+    def __init__(self, width, height, num_of_mines, num_envs=256, seed=None, safe_zone=False, topology=SQUARE) -> None:
+        """
+        solve a batch of boards at once with the rules of Solver, for runs of many games
+        the constraints are kept as two counters per cell of the stacked grids, the unknown cells and the missing
+        mines around it, which every reveal and every mine found update for the whole batch at once; like Solver,
+        only the numbers whose counters changed are checked again, and the pairwise rule only runs on the boards
+        where the single cell rule found nothing, with the unknown neighbors of a number kept in the bits of a byte
+        :param width: the width of the boards
+        :param height: the height of the boards
+        :param num_of_mines: the number of mines of every board
+        :param num_envs: the number of boards played at once
+        :param seed: the seed of the random generator
+        :param safe_zone: keep the first click and its neighbors free of mines
+        :param topology: the neighbors of the cells, at most 8 per cell
+        """
+        if len(topology.offsets) > 8:
+            raise ValueError("the batch solver keeps the neighbors of a cell in a byte, a cell has at most 8")
+        super().__init__(num_envs, width, height, num_of_mines, seed=seed, safe_zone=safe_zone, auto_reset=False,
+                         topology=topology)
+        # the neighbors of every bordered cell, each of them once and 0 (a border cell) when missing
+        neighbors = np.sort(topology.padded_table(width, height, self._pad), axis=1)
+        neighbors[:, 1:][neighbors[:, 1:] == neighbors[:, :-1]] = 0
+        neighbors[neighbors == np.arange(self._size)[:, None]] = 0
+        self._neighbors = neighbors
+        self._degrees = (neighbors > 0).sum(axis=1).astype(np.uint8)
+        self._pairs, self._common = self._compile_pairs()
+
+        # what the solver knows: the mines it found, and the unknown cells and the missing mines around every cell
+        self.known = np.zeros(num_envs * self._size, dtype=bool)
+        self.left = np.zeros(num_envs * self._size, dtype=np.uint8)
+        self.need = np.zeros(num_envs * self._size, dtype=np.int8)
+        # the cells whose counters changed since they were last checked, and the numbers whose counters changed since
+        # the pairwise rule last ran on their board
+        self.touched: list = []
+        self.changed = np.zeros(num_envs * self._size, dtype=bool)
+
+        # what the solver did on every board, and the time of every phase for the whole batch
+        self.guesses = np.zeros(num_envs, dtype=np.int32)
+        self.moves = np.zeros(num_envs, dtype=np.int32)
+        self.reveals = np.zeros(num_envs, dtype=np.int32)
+        self.cascade_cells = np.zeros(num_envs, dtype=np.int32)
+        self.cascade_max = np.zeros(num_envs, dtype=np.int32)
+        self.timings = dict.fromkeys(("generate", "reveal", "observe", "deduce", "guess"), 0.0)
+
+    def _compile_pairs(self) -> tuple:
+        """
+        find the cells which can share a neighbor with every cell: the neighbors of its neighbors
+        :return: the pairs of every cell, of shape (cells, pairs per cell) with 0 when missing, and for every pair the
+                 bits of the neighbors of the cell which are neighbors of the other cell too
+        """
+        table = self._neighbors
+        second = table[table].reshape(len(table), -1)
+        second = np.sort(np.where(second == np.arange(len(table))[:, None], 0, second), axis=1)
+        second[:, 1:][second[:, 1:] == second[:, :-1]] = 0
+        # the pairs first, then the missing ones
+        second = -np.sort(-second, axis=1)
+        pairs = second[:, :max(1, int((second > 0).sum(axis=1).max()))]
+        common = (table[:, None, :, None] == table[pairs][:, :, None, :]).any(axis=-1) & (table[:, None, :] > 0)
+        return pairs, np.packbits(common, axis=-1, bitorder="little")[..., 0]
+
+    def around(self, flat) -> np.ndarray:
+        """
+        get the neighbors of cells of the stacked grids
+        :param flat: the flat indices of the cells in the bordered grids
+        :return: the flat indices of their neighbors, of shape (cells, neighbors per cell), the border cell of the
+                 board when a neighbor is missing
+        """
+        if self._table is None:
+            return flat[:, None] + self._offsets
+        local = flat % self._size
+        return self._neighbors[local] + (flat - local)[:, None]
+
+    def start(self, boards) -> None:
+        """
+        start new games on boards, with a first click at the center
+        :param boards: the indices of the boards
+        :return: None
+        """
+        self.reset(boards)
+        for counter in (self.guesses, self.moves, self.reveals, self.cascade_cells, self.cascade_max):
+            counter[boards] = 0
+        start = time.perf_counter()
+        self.generate_mines(boards, np.full(boards.size, self.width // 2 * self.height + self.height // 2))
+        self.timings["generate"] += time.perf_counter() - start
+        size = self._size
+        rows = (boards[:, None] * size + np.arange(size)).reshape(-1)
+        self.known[rows] = False
+        self.changed[rows] = False
+        self.left[rows] = np.tile(self._degrees, boards.size)
+        self.need[rows] = self._counts.reshape(-1)[rows]
+        self.open(boards * size + (self.width // 2 + self._pad) * self._stride + self.height // 2 + self._pad)
+
+    def open(self, flat) -> None:
+        """
+        reveal cells, count them in the moves of their boards, and update the counters around the revealed cells
+        :param flat: the distinct flat indices of the cells in the bordered grids
+        :return: None
+        """
+        start = time.perf_counter()
+        opened, _, cascade = self._open(flat)
+        revealed = time.perf_counter()
+        self.timings["reveal"] += revealed - start
+        clicks = np.bincount(flat // self._size, minlength=self.num_envs).astype(np.int32)
+        self.moves += clicks
+        self.reveals += clicks > 0
+        self.cascade_cells += opened.astype(np.int32)
+        np.maximum(self.cascade_max, opened, out=self.cascade_max, casting="unsafe")
+        around = self.around(cascade).reshape(-1)
+        np.subtract.at(self.left, around, np.uint8(1))
+        self.touched += [cascade, around]
+        self.timings["observe"] += time.perf_counter() - revealed
+
+    def mark(self, mines) -> None:
+        """
+        remember that cells are mines and update the counters around them
+        :param mines: the distinct flat indices of the cells in the bordered grids
+        :return: None
+        """
+        self.known[mines] = True
+        around = self.around(mines).reshape(-1)
+        np.subtract.at(self.left, around, np.uint8(1))
+        np.subtract.at(self.need, around, np.int8(1))
+        self.touched.append(around)
+
+    def distinct(self, cells) -> np.ndarray:
+        """
+        drop the duplicates without sorting: only the last write of each index survives
+        :param cells: the flat indices of the cells in the bordered grids
+        :return: every cell once
+        """
+        order = np.arange(cells.size, dtype=np.intp)
+        self._scratch[cells] = order
+        return cells[self._scratch[cells] == order]
+
+    def unknown(self, cells) -> np.ndarray:
+        """
+        keep the distinct cells which are neither revealed nor known mines
+        :param cells: the flat indices of the cells in the bordered grids
+        :return: the unknown ones
+        """
+        return self.distinct(cells[~(self._revealed.reshape(-1)[cells] | self.known[cells])])
+
+    def play_round(self, playing) -> None:
+        """
+        play one round on every board: flag the mines found and reveal the safe cells found by the single cell rule,
+        or by the pairwise rule when it finds nothing, or else guess the least risky cell
+        :param playing: which boards are playing, the ended ones among them are skipped
+        :return: None
+        """
+        start = time.perf_counter()
+        size = self._size
+        playing = playing & ~self.lost & (self.safe_left > 0)
+        revealed = self._revealed.reshape(-1)
+        counts = self._counts.reshape(-1)
+        cells = np.concatenate(self.touched) if self.touched else np.zeros(0, dtype=np.intp)
+        self.touched = []
+        cells = cells[revealed[cells] & (counts[cells] > 0) & (self.left[cells] > 0)]
+        cells = self.distinct(cells if playing.all() else cells[playing[cells // size]])
+        self.changed[cells] = True
+
+        # single cell rule: the numbers whose mines are all known, and the numbers whose unknown cells are all mines
+        need, left = self.need[cells], self.left[cells]
+        safe = self.unknown(self.around(cells[need == 0]).reshape(-1))
+        mines = self.unknown(self.around(cells[need == left]).reshape(-1))
+        stuck = playing.copy()
+        stuck[safe // size] = False
+        stuck[mines // size] = False
+        if stuck.any():
+            more_safe, more_mines = self.compare(np.flatnonzero(stuck))
+            safe, mines = np.concatenate((safe, more_safe)), np.concatenate((mines, more_mines))
+            stuck[more_safe // size] = False
+            stuck[more_mines // size] = False
+        stuck = np.flatnonzero(stuck)
+        if mines.size:
+            self.mark(mines)
+        guessed = time.perf_counter()
+        self.timings["deduce"] += guessed - start
+
+        if stuck.size:
+            guesses = self.guess(stuck)
+            safe = np.concatenate((safe, guesses))
+            self.guesses[guesses // size] += 1
+            self.timings["guess"] += time.perf_counter() - guessed
+        if safe.size:
+            self.open(safe)
+
+    def compare(self, boards) -> tuple:
+        """
+        apply the pairwise rule between every two numbers sharing an unknown cell, on boards where the single cell
+        rule found nothing: if the difference of their missing mines equals the number of cells only the larger one
+        sees, those cells are mines and the cells only the smaller one sees are safe
+        :param boards: the indices of the boards
+        :return: the flat indices of the safe cells and of the mines found
+        """
+        size = self._size
+        revealed = self._revealed.reshape(-1)
+        left = self.left.reshape(-1, size)[boards]
+        frontier = revealed.reshape(-1, size)[boards] & (self._counts.reshape(-1, size)[boards] > 0) & (left > 0)
+        # the safe unknown cells around every number, a value which no other cell can match
+        spare = np.where(frontier, left - self.need.reshape(-1, size)[boards].astype(np.int16), -size).reshape(-1)
+        # a pair whose numbers did not change since the last time found nothing then, and still finds nothing
+        changed = self.changed.reshape(-1, size)
+        indices = np.flatnonzero(changed[boards] & frontier)
+        changed[boards] = False
+        rows, local = np.divmod(indices, size)
+        cells = boards[rows] * size + local
+        # the unknown neighbors of the numbers, in the order of the table which is the order of the bits of the pairs
+        around = self._neighbors[local] + (cells - local)[:, None]
+        unknown = np.packbits(~(revealed[around] | self.known[around]), axis=-1, bitorder="little")[:, 0]
+        shared = POPCOUNT[self._common[local] & unknown[:, None]].astype(np.int16)
+        # for the numbers c and d, the rule holds when need[d] - need[c] = left[d] - shared, that is when
+        # shared - need[c] = spare[d]; it is checked both ways, and a pair with no cell of its own finds nothing
+        pairs = self._pairs[local] + (indices - local)[:, None]
+        need = self.need[cells].astype(np.int16)
+        forward = shared - need[:, None] == spare[pairs]
+        backward = (shared - self.need[pairs - indices[:, None] + cells[:, None]] == spare[indices][:, None]) & \
+            (spare[pairs] >= 0)
+        found, slot = np.nonzero(forward | backward)
+        smaller = around[found]
+        larger = self.around(cells[found] - local[found] + self._pairs[local[found], slot])
+        swap = backward[found, slot]
+        smaller[swap], larger[swap] = larger[swap], smaller[swap]
+        # the cells only the smaller number sees are safe, the cells only the larger one sees are mines
+        safe = self.unknown(smaller[~(smaller[:, :, None] == larger[:, None, :]).any(axis=-1)])
+        mines = self.unknown(larger[~(larger[:, :, None] == smaller[:, None, :]).any(axis=-1)])
+        return safe, mines
+
+    def guess(self, boards) -> np.ndarray:
+        """
+        choose the unknown cell with the lowest estimated chance of being a mine on every board
+        a frontier cell is as risky as its riskiest number, any other cell as risky as the remaining mine density
+        :param boards: the indices of the boards
+        :return: the flat index of the chosen cell of every board with unknown cells left, in the bordered grids
+        """
+        size = self._size
+        boards = boards[(~self._revealed.reshape(-1, size)[boards] & ~self.known.reshape(-1, size)[boards]).any(axis=1)]
+        revealed = self._revealed.reshape(-1, size)[boards]
+        known = self.known.reshape(-1, size)[boards]
+        left = self.left.reshape(-1, size)[boards]
+        rows, local = np.nonzero(revealed & (self._counts.reshape(-1, size)[boards] > 0) & (left > 0))
+        chance = self.need[boards[rows] * size + local] / left[rows, local].astype(np.float32)
+        # the riskiest number around every cell
+        risk = np.full(revealed.size, -1.0, dtype=np.float32)
+        np.maximum.at(risk, (rows[:, None] * size + self._neighbors[local]).reshape(-1),
+                      np.repeat(chance, self._neighbors.shape[1]))
+        risk = risk.reshape(revealed.shape)
+        unknown = ~revealed & ~known
+        frontier = unknown & (risk >= 0)
+        outside = unknown & ~frontier
+        risk[~frontier] = np.inf
+        best = np.argmin(risk, axis=1)
+        lowest = risk[np.arange(boards.size), best]
+        spread = outside.sum(axis=1)
+        risk[~frontier] = 0
+        remaining = self.num_of_mines - known.sum(axis=1) - risk.sum(axis=1)
+        density = np.maximum(0.0, remaining) / np.maximum(spread, 1)
+        return boards * size + np.where((spread > 0) & (density < lowest), np.argmax(outside, axis=1), best)
+
+    def play(self, games):
+        """
+        solve games, every board which ends starts the next game until all the games are started
+        :param games: the number of games
+        :return: a generator of (won, guesses, moves, reveals, revealed cells, largest reveal) for every game, in the
+                 order the games end
+        """
+        playing = np.zeros(self.num_envs, dtype=bool)
+        playing[:games] = True
+        started = int(playing.sum())
+        if started:
+            self.start(np.flatnonzero(playing))
+        ended = np.flatnonzero(playing & (self.lost | (self.safe_left == 0)))
+        while playing.any():
+            for b in ended.tolist():
+                yield (not self.lost[b], int(self.guesses[b]), int(self.moves[b]), int(self.reveals[b]),
+                       int(self.cascade_cells[b]), int(self.cascade_max[b]))
+            again = ended[:games - started]
+            started += again.size
+            playing[ended[again.size:]] = False
+            if again.size:
+                # the first click may end a game, such a board is looked at again before the next round
+                self.start(again)
+                ended = again[self.lost[again] | (self.safe_left[again] == 0)]
+                if ended.size:
+                    continue
+            if playing.any():
+                self.play_round(playing)
+                ended = np.flatnonzero(playing & (self.lost | (self.safe_left == 0)))
@@ -0,0 +1,285 @@
+import numpy as np
+
+from src.topology import SQUARE, Topology
+
+
+class Board:
+    def __init__(self, width: int, height: int, num_of_mines: int, topology: Topology = SQUARE) -> None:
+        """
+        initialize the headless game board
+        all grids are indexed as grid[i, j] with 0 <= i < width and 0 <= j < height
+        :param width: the width of the board
+        :param height: the height of the board
+        :param num_of_mines: the number of mines
+        :param topology: the rule which decides the neighbors of a cell, the 8 cells around it by default
+        """
+        self.width: int = width
+        self.height: int = height
+        self.num_of_mines: int = num_of_mines
+        self.topology: Topology = topology
+
+        # the game grids are stored with a border as wide as the reach of a uniform topology, the public grids are
+        # views of their inside; the border counts as revealed, so that the flood fill never leaves the board
+        pad = self._pad = topology.reach if topology.uniform else 1
+        self._stride = height + 2 * pad
+        shape = (width + 2 * pad, height + 2 * pad)
+        self._mines = np.zeros(shape, dtype=bool)
+        self._counts = np.zeros(shape, dtype=np.int8)
+        self._revealed = np.ones(shape, dtype=bool)
+        self._revealed[pad:-pad, pad:-pad] = False
+        self._flagged = np.zeros(shape, dtype=bool)
+        self.mines = self._mines[pad:-pad, pad:-pad]
+        self.counts = self._counts[pad:-pad, pad:-pad]
+        self.revealed = self._revealed[pad:-pad, pad:-pad]
+        self.flagged = self._flagged[pad:-pad, pad:-pad]
+
+        # the neighbors in the flattened bordered grids: the flat offsets of a uniform topology, otherwise a row of
+        # the compiled table per cell, whose missing neighbors point at the border
+        self._offsets = topology.stencil(self._stride) if topology.uniform else None
+        self._table = None if topology.uniform else topology.padded_table(width, height, pad)
+        self._scratch = None
+
+        # the game state
+        self.placed = False
+        self.lost = False
+
+        # the counters are kept up to date by every move, so that the game never has to scan the grids
+        self.safe_left: int = width * height - num_of_mines
+        self.flags_count: int = 0
+        self.correct_flags: int = 0
+
+    # randomly generate the positions of mines
+    def generate_mines(self, i_first_click, j_first_click, seed=None, safe_zone=False) -> None:
+        """
+        randomly generate the positions of mines and place them, the first click is never a mine
+        the mines are sampled without replacement from the flat indices of the allowed cells
+        :param i_first_click: the x coordinate of the first click
+        :param j_first_click: the y coordinate of the first click
+        :param seed: the seed of the random generator, the same seed always gives the same board
+        :param safe_zone: keep the first click and its neighbors free of mines, when there is room for them
+        :return: None
+        """
+        n = self.width * self.height
+        if not 0 <= self.num_of_mines < n:
+            raise ValueError(f"{self.num_of_mines} mines do not fit in a {self.width}*{self.height} board")
+        first = i_first_click * self.height + j_first_click
+        excluded = np.array([first], dtype=np.intp)
+        if safe_zone:
+            zone = np.append(self.topology.cell_neighbors(i_first_click, j_first_click, self.width, self.height), first)
+            if n - zone.size >= self.num_of_mines:
+                excluded = np.sort(zone).astype(np.intp)
+
+        # sample among the allowed cells, then shift every pick past the excluded cells before it
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(n - excluded.size, size=self.num_of_mines, replace=False, shuffle=False)
+        picks += np.searchsorted(excluded - np.arange(excluded.size), picks, side="right")
+        mines = np.zeros(n, dtype=bool)
+        mines[picks] = True
+        self.place_mines(mines.reshape(self.width, self.height))
+
+    # place the mines and compute every adjacency count in one pass
+    def place_mines(self, mines, counts=None) -> None:
+        """
+        place the mines and compute the number of mines around every cell
+        :param mines: a boolean grid of shape (width, height) or an iterable of (i, j) pairs
+        :param counts: the grid of adjacency counts, computed from the mines if not given
+                       (a chunk of an endless board also counts the mines of the chunks around it)
+        :return: None
+        """
+        if isinstance(mines, np.ndarray) and mines.dtype == bool:
+            self.mines[:] = mines
+        else:
+            self.mines[:] = False
+            cells = np.array(list(mines), dtype=np.intp).reshape(-1, 2)
+            self.mines[cells[:, 0], cells[:, 1]] = True
+        self.counts[:] = self.topology.counts(self.mines) if counts is None else counts
+        self.placed = True
+        self.safe_left = int((~self.mines & ~self.revealed).sum())
+        self.correct_flags = int((self.mines & self.flagged).sum())
+
+    def restore(self, revealed, flagged) -> None:
+        """
+        restore the revealed cells and the flags of a saved game, the mines must be placed first
+        :param revealed: the boolean grid of revealed cells
+        :param flagged: the boolean grid of flags
+        :return: None
+        """
+        self.revealed[:] = revealed
+        self.flagged[:] = flagged
+        self.lost = bool((self.mines & self.revealed).any())
+        self.safe_left = int((~self.mines & ~self.revealed).sum())
+        self.flags_count = int(self.flagged.sum())
+        self.correct_flags = int((self.mines & self.flagged).sum())
+
+    @property
+    def neighbors(self):
+        """
+        get the neighbor table of the board, compiled on first use and shared by every board of the same size
+        :return: the NeighborTable of the topology
+        """
+        return self.topology.table(self.width, self.height)
+
+    @staticmethod
+    def neighbor_counts(mines) -> np.ndarray:
+        """
+        count the mines among the 8 cells around every cell of the grid (the cell itself excluded)
+        :param mines: the boolean grid of mines, or a stack of grids of shape (..., width, height)
+        :return: the grid of adjacency counts, of the same shape
+        """
+        return SQUARE.counts(mines)
+
+    def mine_cells(self) -> tuple:
+        """
+        get the positions of the mines
+        :return: the tuple of (i, j) pairs
+        """
+        return tuple(zip(*(axis.tolist() for axis in np.nonzero(self.mines))))
+
+    def is_mine(self, i, j) -> bool:
+        """
+        check if there is a mine at (i, j)
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: True if (i, j) is a mine
+        """
+        return bool(self.mines[i, j])
+
+    def count_mines(self, i, j) -> int:
+        """
+        get the number of mines around (i, j)
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: the number of mines around (i, j)
+        """
+        return int(self.counts[i, j])
+
+    def is_covered(self, i, j) -> bool:
+        """
+        check if (i, j) can still be revealed
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: True if (i, j) is neither revealed nor flagged
+        """
+        return not (self.revealed[i, j] or self.flagged[i, j])
+
+    # reveal (i, j) and flood fill the empty area around it
+    def reveal(self, i, j) -> tuple:
+        """
+        reveal (i, j); if it has no mine around, keep revealing the area around it
+        the flood fill expands a whole frontier at a time, so it neither recurses nor visits a cell twice
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: the x coordinates and the y coordinates of the newly revealed cells
+        """
+        revealed = self._revealed.reshape(-1)
+        start = (i + self._pad) * self._stride + j + self._pad
+        if revealed[start] or self._flagged.reshape(-1)[start]:
+            return self.cells(np.empty(0, dtype=np.intp))
+        revealed[start] = True
+        if self._mines.reshape(-1)[start]:
+            self.lost = True
+            return self.cells(np.array([start], dtype=np.intp))
+
+        return self.cells(self._flood(np.array([start], dtype=np.intp)))
+
+    def reveal_many(self, xs, ys) -> tuple:
+        """
+        reveal several cells at once, and flood fill the empty areas around them together
+        if some of them are mines, only the mines are revealed, as a click on a mine reveals nothing else
+        :param xs: the x coordinates
+        :param ys: the y coordinates
+        :return: the x coordinates and the y coordinates of the newly revealed cells
+        """
+        revealed = self._revealed.reshape(-1)
+        pad = self._pad
+        starts = (np.asarray(xs, dtype=np.intp) + pad) * self._stride + np.asarray(ys, dtype=np.intp) + pad
+        starts = np.unique(starts[~(revealed[starts] | self._flagged.reshape(-1)[starts])])
+        hit = starts[self._mines.reshape(-1)[starts]]
+        if hit.size:
+            revealed[hit] = True
+            self.lost = True
+            return self.cells(hit)
+        revealed[starts] = True
+        return self.cells(self._flood(starts))
+
+    def _flood(self, starts) -> np.ndarray:
+        """
+        expand the revealed area from cells which were just revealed
+        :param starts: the flat indices of the revealed cells, none of them is a mine
+        :return: the flat indices of the starts and of every cell revealed by the flood fill
+        """
+        revealed = self._revealed.reshape(-1)
+        flagged = self._flagged.reshape(-1)
+        counts = self._counts.reshape(-1)
+        if self._scratch is None:
+            self._scratch = np.empty(revealed.size, dtype=np.intp)
+        scratch = self._scratch
+        cascade = [starts]
+        frontier = starts[counts[starts] == 0]
+        while frontier.size:
+            if self._table is None:
+                neighbors = (frontier[:, None] + self._offsets).reshape(-1)
+            else:
+                neighbors = np.take(self._table, frontier, axis=0).reshape(-1)
+            neighbors = neighbors[~(revealed[neighbors] | flagged[neighbors])]
+            # drop the duplicates without sorting: only the last write of each index survives
+            order = np.arange(neighbors.size, dtype=np.intp)
+            scratch[neighbors] = order
+            neighbors = neighbors[scratch[neighbors] == order]
+            revealed[neighbors] = True
+            cascade.append(neighbors)
+            frontier = neighbors[counts[neighbors] == 0]
+        cascade = np.concatenate(cascade)
+        self.safe_left -= cascade.size
+        return cascade
+
+    def cells(self, flat) -> tuple:
+        """
+        convert indices of the flattened bordered grids to board coordinates
+        :param flat: the flat indices
+        :return: the x coordinates and the y coordinates
+        """
+        xs, ys = np.divmod(flat, self._stride)
+        return xs - self._pad, ys - self._pad
+
+    def set_revealed(self, xs, ys, revealed) -> None:
+        """
+        reveal or cover cells again without any flood fill, for undo and redo; the cost only depends on the cells
+        :param xs: the x coordinates
+        :param ys: the y coordinates
+        :param revealed: True to reveal the cells, False to cover them
+        :return: None
+        """
+        self.revealed[xs, ys] = revealed
+        mines = self.mines[xs, ys]
+        safe = int(mines.size - mines.sum())
+        self.safe_left += -safe if revealed else safe
+        if mines.any():
+            self.lost = revealed
+
+    def toggle_flag(self, i, j) -> bool:
+        """
+        place or remove the flag at (i, j)
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: True if a flag is now placed at (i, j)
+        """
+        if self.revealed[i, j]:
+            return False
+        flagged = not self.flagged[i, j]
+        self.flagged[i, j] = flagged
+        change = 1 if flagged else -1
+        self.flags_count += change
+        if self.mines[i, j]:
+            self.correct_flags += change
+        return flagged
+
+    @property
+    def won(self) -> bool:
+        """
+        check if the game is won: every safe cell is revealed, or every mine and only the mines are flagged
+        :return: True if the game is won
+        """
+        if not self.placed or self.lost:
+            return False
+        return self.safe_left == 0 or self.correct_flags == self.num_of_mines == self.flags_count
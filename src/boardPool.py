@@ -0,0 +1,198 @@
+import atexit
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.board import Board
+from src.solver import Solver
+from src.topology import SQUARE
+
+# the first click regions: the board is split in REGIONS * REGIONS areas
+REGIONS = 3
+
+
+def region_of(i, j, w, h) -> tuple:
+    """
+    get the region of a click
+    :param i: the x coordinate
+    :param j: the y coordinate
+    :param w: the width of the board
+    :param h: the height of the board
+    :return: the region (x, y)
+    """
+    return i * REGIONS // w, j * REGIONS // h
+
+
+def region_center(region, w, h) -> tuple:
+    """
+    get the click used to generate the boards of a region
+    :param region: the region (x, y)
+    :param w: the width of the board
+    :param h: the height of the board
+    :return: the coordinates of the click
+    """
+    return (2 * region[0] + 1) * w // (2 * REGIONS), (2 * region[1] + 1) * h // (2 * REGIONS)
+
+
+def generate_no_guess(w, h, num_of_mines, i, j, seed=None, attempts=1000, topology=SQUARE):
+    """
+    generate boards until the solver clears one from (i, j) without guessing
+    :param w: the width of the board
+    :param h: the height of the board
+    :param num_of_mines: the number of mines
+    :param i: the x coordinate of the first click
+    :param j: the y coordinate of the first click
+    :param seed: the seed of the search
+    :param attempts: the number of boards to try
+    :param topology: the topology of the board
+    :return: (mines, opening) boolean grids, the opening being the cells which start the same first cascade,
+             or None if no board was found
+    """
+    for board_seed in np.random.SeedSequence(seed).spawn(attempts):
+        board = Board(w, h, num_of_mines, topology)
+        solver = Solver(board, board_seed)
+        solver.first_click(i, j, safe_zone=True)
+        opening = board.revealed & (board.counts == 0)
+        if solver.solve(allow_guess=False):
+            return board.mines.copy(), opening
+    return None
+
+
+def fill(folder, w, h, num_of_mines, region, seed) -> bool:
+    """
+    generate one no-guess board for a region and store it in the folder, this runs in a worker process
+    :param folder: the folder of the region
+    :param w: the width of the board
+    :param h: the height of the board
+    :param num_of_mines: the number of mines
+    :param region: the region (x, y)
+    :param seed: the seed of the search
+    :return: True if a board was stored
+    """
+    found = generate_no_guess(w, h, num_of_mines, *region_center(region, w, h), seed)
+    if found is None:
+        return False
+    mines, opening = found
+    name = os.path.join(folder, uuid.uuid4().hex)
+    with open(name + ".tmp", "wb") as file:
+        np.savez(file, mines=np.packbits(mines), opening=np.packbits(opening))
+    os.replace(name + ".tmp", name + ".npz")  # readers never see a half written board
+    return True
+
+
+class BoardPool:
+    def __init__(self, folder="board_pool", capacity=8, workers=None) -> None:
+        """
+        keep a bounded on-disk cache of no-guess boards for every level and first click region
+        :param folder: the folder of the cache
+        :param capacity: the number of boards to keep per level and region
+        :param workers: the number of worker processes, half of the cores if not given
+        """
+        self.folder = folder
+        self.capacity = capacity
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.levels: set = set()
+        self.pending: dict = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def region_folder(self, w, h, num_of_mines, region) -> str:
+        """
+        get the folder of a level and region, and create it if needed
+        :param w: the width of the board
+        :param h: the height of the board
+        :param num_of_mines: the number of mines
+        :param region: the region (x, y)
+        :return: the path of the folder
+        """
+        folder = os.path.join(self.folder, f"{w}x{h}x{num_of_mines}", f"{region[0]}{region[1]}")
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def start(self, levels) -> None:
+        """
+        start filling the cache in the background
+        :param levels: the (width, height, number of mines) of the levels to keep boards for
+        :return: None
+        """
+        with self.lock:
+            self.levels.update(levels)
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.workers)
+                atexit.register(self.stop)
+        self.refill()
+
+    def stop(self) -> None:
+        """
+        stop the worker processes, the boards already stored stay on the disk
+        :return: None
+        """
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    def refill(self) -> None:
+        """
+        ask the workers for the boards missing in the cache
+        :return: None
+        """
+        with self.lock:
+            if self.executor is None:
+                return None
+            for w, h, num_of_mines in self.levels:
+                for region in np.ndindex(REGIONS, REGIONS):
+                    folder = self.region_folder(w, h, num_of_mines, region)
+                    stored = sum(name.endswith(".npz") for name in os.listdir(folder))
+                    for _ in range(self.capacity - stored - self.pending.get(folder, 0)):
+                        self.pending[folder] = self.pending.get(folder, 0) + 1
+                        future = self.executor.submit(fill, folder, w, h, num_of_mines, region,
+                                                      uuid.uuid4().int)
+                        future.add_done_callback(lambda _, f=folder: self.done(f))
+
+    def done(self, folder) -> None:
+        """
+        called when a worker finished a board
+        :param folder: the folder the board was stored in
+        :return: None
+        """
+        with self.lock:
+            self.pending[folder] -= 1
+        self.refill()
+
+    def take(self, w, h, num_of_mines, i, j):
+        """
+        take a stored no-guess board whose first cascade starts from (i, j)
+        :param w: the width of the board
+        :param h: the height of the board
+        :param num_of_mines: the number of mines
+        :param i: the x coordinate of the first click
+        :param j: the y coordinate of the first click
+        :return: the boolean grid of mines, or None if the pool is not running or no stored board fits the click
+        """
+        if self.executor is None:
+            return None  # the disk is never touched when no game uses the pool
+        folder = self.region_folder(w, h, num_of_mines, region_of(i, j, w, h))
+        for name in os.listdir(folder):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(folder, name)
+            try:
+                with np.load(path) as data:
+                    opening = np.unpackbits(data["opening"], count=w * h).reshape(w, h)
+                    if not opening[i, j]:
+                        continue
+                    mines = np.unpackbits(data["mines"], count=w * h).reshape(w, h).astype(bool)
+                os.remove(path)
+            except (OSError, ValueError):
+                continue  # taken meanwhile, or unreadable
+            self.refill()
+            return mines
+        return None
+
+
+# the pool shared by every game of the process
+POOL = BoardPool()
@@ -1,17 +1,48 @@
 import tkinter as tk
 
+from src.profiler import PROFILER
+from src.topology import HEX, SQUARE
+
+# the gray drawn for a color the platform does not know
+FALLBACK_COLOR = "#D9D9D9"
+
+
+def drawable_color(widget, name, known) -> str:
+    """
+    get a color a widget can draw, platform colors such as SystemButtonFace only exist on Windows
+    :param widget: the widget drawing the color
+    :param name: the color name
+    :param known: the colors already checked by the caller, {name: color drawn}, updated in place
+    :return: the color name, or a neutral gray if the platform does not know it
+    """
+    if name not in known:
+        try:
+            widget.winfo_rgb(name)
+            known[name] = name
+        except tk.TclError:
+            known[name] = FALLBACK_COLOR
+    return known[name]
+
 
 class Buttons:
-    def __init__(self, frame, w, h):
+    def __init__(self, frame, w, h, topology=SQUARE):
         self.frame = frame
+        # the rows of a hexagonal board are shifted by half a button: every button spans two grid columns, and the
+        # odd rows start one grid column later
+        self.shifted = topology is HEX
+        if self.shifted:
+            for column in range(2 * h + 1):
+                frame.columnconfigure(column, weight=1)
         self.buttons = self.place_buttons(w, h)
+        self.disabled = False
 
     # create a 2D list to store the buttons
-    def place_buttons(self, h, w) -> list:
+    @PROFILER.profiled("place_buttons")
+    def place_buttons(self, w, h) -> list:
         """
         create a 2D list to store the buttons
-        :param h: the height of the board
         :param w: the width of the board
+        :param h: the height of the board
         :return: the 2D list of buttons
         """
         return [[self.create_button(i, j) for j in range(h)] for i in range(w)]
@@ -25,5 +56,64 @@ class Buttons:
         :return: the button
         """
         button = tk.Button(self.frame, width=2, height=1, bg="light blue", relief=tk.GROOVE)
-        button.grid(row=i, column=j, sticky=tk.NSEW)
+        if self.shifted:
+            button.grid(row=i, column=2 * j + i % 2, columnspan=2, sticky=tk.NSEW)
+        else:
+            button.grid(row=i, column=j, sticky=tk.NSEW)
         return button
+
+    def bind_cells(self, on_left, on_right) -> None:
+        """
+        bind the click events of every button
+        :param on_left: called with (i, j) on a left click
+        :param on_right: called with (i, j) on a right click
+        :return: None
+        """
+        for i0, row in enumerate(self.buttons):
+            for j0, button in enumerate(row):
+                button.config(command=lambda i=i0, j=j0: on_left(i, j))
+                button.bind("<Button-3>", lambda event, i=i0, j=j0: on_right(i, j))
+
+    def update_cell(self, i, j, **options) -> None:
+        """
+        change how the cell (i, j) looks
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param options: the button options, such as text, bg and state
+        :return: None
+        """
+        self.buttons[i][j].config(**options)
+
+    # disable all buttons
+    def disable_all(self) -> None:
+        """
+        disable all buttons
+        :return: None
+        """
+        for i in range(len(self.buttons)):
+            self.disable_row(i)
+        self.disabled = True
+
+    def disable_row(self, i) -> None:
+        """
+        disable the buttons of a row, so that a large board can be disabled a few rows at a time
+        :param i: the x coordinate of the row
+        :return: None
+        """
+        for button in self.buttons[i]:
+            button.config(state="disabled")
+
+    def reset(self, xs, ys) -> None:
+        """
+        cover the given cells again and enable the buttons, the other buttons are left as they are
+        :param xs: the x coordinates of the cells which changed
+        :param ys: the y coordinates of the cells which changed
+        :return: None
+        """
+        for i, j in zip(xs, ys):
+            self.buttons[i][j].config(text="", bg="light blue", state="normal")
+        if self.disabled:
+            for row in self.buttons:
+                for button in row:
+                    button.config(state="normal")
+            self.disabled = False
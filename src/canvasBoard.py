@@ -0,0 +1,163 @@
+import tkinter as tk
+
+from src.buttons import drawable_color
+from src.topology import HEX, SQUARE
+
+
+class CanvasBoard:
+    def __init__(self, frame, w, h, cell_size=None, topology=SQUARE):
+        """
+        draw the board on a single canvas instead of one button per cell
+        only the cells which do not look covered own canvas items, and they are redrawn only when they change
+        :param frame: the frame to place the canvas in
+        :param w: the width of the board
+        :param h: the height of the board
+        :param cell_size: the size of a cell in pixels, fitted to the screen if not given
+        :param topology: the topology of the board, the rows of a hexagonal board are shifted by half a cell
+        """
+        self.frame = frame
+        self.w: int = w
+        self.h: int = h
+        self.cell_size: int = cell_size or self.fit_cell_size(frame, w, h)
+        self.shift: int = self.cell_size // 2 if topology is HEX else 0
+        self.covered_color: str = "light blue"
+        self.disabled = False
+
+        # the look of every cell which differs from a covered cell, and the canvas items drawing it
+        self.looks: dict = {}
+        self.items: dict = {}
+        self.dirty: set = set()
+        self.flush_pending = False
+        self.colors: dict = {}
+
+        # create the canvas with scrollbars, the board may be larger than the screen
+        size = self.cell_size
+        view_width = min(h * size + self.shift, frame.winfo_screenwidth() * 4 // 5)
+        view_height = min(w * size, frame.winfo_screenheight() * 3 // 4)
+        self.canvas = tk.Canvas(frame, width=view_width, height=view_height, highlightthickness=0,
+                                scrollregion=(0, 0, h * size + self.shift, w * size), bg=self.covered_color)
+        x_scroll = tk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        y_scroll = tk.Scrollbar(frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        self.canvas.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scroll.grid(row=0, column=1, sticky=tk.NS)
+        x_scroll.grid(row=1, column=0, sticky=tk.EW)
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+        self.font = ("Helvetica", -max(6, size * 3 // 5), "bold")
+        self.draw_grid()
+
+    @staticmethod
+    def fit_cell_size(frame, w, h) -> int:
+        """
+        choose a cell size so that the board fits the screen when possible
+        :param frame: any widget of the window
+        :param w: the width of the board
+        :param h: the height of the board
+        :return: the size of a cell in pixels
+        """
+        fit = min(frame.winfo_screenwidth() * 4 // 5 // h, frame.winfo_screenheight() * 3 // 4 // w)
+        return max(8, min(24, fit))
+
+    def draw_grid(self) -> None:
+        """
+        draw the lines between the cells
+        :return: None
+        """
+        size = self.cell_size
+        for i in range(self.w + 1):
+            self.canvas.create_line(0, i * size, self.h * size + self.shift, i * size, fill="gray60")
+        if not self.shift:
+            for j in range(self.h + 1):
+                self.canvas.create_line(j * size, 0, j * size, self.w * size, fill="gray60")
+            return None
+        # the rows are shifted like bricks: every column line zigzags down the rows, its steps follow the row lines
+        for j in range(self.h + 1):
+            points = []
+            for i in range(self.w):
+                x = j * size + self.shift * (i % 2)
+                points += [x, i * size, x, (i + 1) * size]
+            self.canvas.create_line(*points, fill="gray60")
+
+    def bind_cells(self, on_left, on_right) -> None:
+        """
+        bind the click events, the clicked cell is found from the click position
+        :param on_left: called with (i, j) on a left click
+        :param on_right: called with (i, j) on a right click
+        :return: None
+        """
+        self.canvas.bind("<Button-1>", lambda event: self.dispatch(event, on_left))
+        self.canvas.bind("<Button-3>", lambda event: self.dispatch(event, on_right))
+
+    def dispatch(self, event, handler) -> None:
+        """
+        call the handler with the cell under the mouse
+        :param event: the click event
+        :param handler: the click handler
+        :return: None
+        """
+        if self.disabled:
+            return None
+        i = int(self.canvas.canvasy(event.y)) // self.cell_size
+        j = (int(self.canvas.canvasx(event.x)) - self.shift * (i % 2)) // self.cell_size
+        if 0 <= i < self.w and 0 <= j < self.h:
+            handler(i, j)
+
+    def update_cell(self, i, j, **options) -> None:
+        """
+        change how the cell (i, j) looks, the canvas is redrawn once the pending events are handled
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param options: the button like options, text and bg (or background) are drawn, state is ignored
+        :return: None
+        """
+        text, bg = self.looks.get((i, j), ("", self.covered_color))
+        text = str(options.get("text", text))
+        bg = options.get("bg", options.get("background", bg))
+        self.looks[(i, j)] = (text, bg)
+        self.dirty.add((i, j))
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.canvas.after_idle(self.flush)
+
+    def flush(self) -> None:
+        """
+        redraw the cells which changed since the last redraw
+        :return: None
+        """
+        self.flush_pending = False
+        size = self.cell_size
+        for i, j in self.dirty:
+            text, bg = self.looks[(i, j)]
+            fill = drawable_color(self.canvas, bg, self.colors)
+            if (i, j) in self.items:
+                rect, label = self.items[(i, j)]
+                self.canvas.itemconfig(rect, fill=fill)
+                self.canvas.itemconfig(label, text=text)
+            else:
+                x, y = j * size + self.shift * (i % 2), i * size
+                rect = self.canvas.create_rectangle(x, y, x + size, y + size, fill=fill, outline="gray60")
+                label = self.canvas.create_text(x + size // 2, y + size // 2, text=text, font=self.font)
+                self.items[(i, j)] = (rect, label)
+        self.dirty.clear()
+
+    def reset(self, xs, ys) -> None:
+        """
+        cover the given cells again and accept clicks
+        :param xs: the x coordinates of the cells which changed
+        :param ys: the y coordinates of the cells which changed
+        :return: None
+        """
+        for cell in zip(xs, ys):
+            self.looks.pop(cell, None)
+            self.dirty.discard(cell)
+            for item in self.items.pop(cell, ()):
+                self.canvas.delete(item)
+        self.disabled = False
+
+    def disable_all(self) -> None:
+        """
+        ignore every click from now on
+        :return: None
+        """
+        self.disabled = True
@@ -0,0 +1,289 @@
+import functools
+from collections import OrderedDict
+
+import numpy as np
+
+from src.board import Board
+from src.topology import SQUARE
+
+# the mines of a chunk are random, below this density the empty areas could grow without end
+MIN_DENSITY = 0.15
+
+# the grids of the resolved chunks drawn last are kept, so that drawing them does not derive their counts again
+CACHED_VIEWS = 256
+
+
+def zigzag(value) -> int:
+    """
+    map an integer to a non negative one, 0, -1, 1, -2, 2... become 0, 1, 2, 3, 4...
+    :param value: the integer
+    :return: the non negative integer
+    """
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+@functools.lru_cache(maxsize=1024)
+def chunk_mines(seed, density, size, cx, cy) -> np.ndarray:
+    """
+    derive the mines of a chunk from the seed of the board and the coordinates of the chunk
+    the result is cached, so it must not be modified
+    :param seed: the seed of the board
+    :param density: the probability of a cell to be a mine
+    :param size: the size of a chunk
+    :param cx: the x coordinate of the chunk
+    :param cy: the y coordinate of the chunk
+    :return: the boolean grid of mines of the chunk
+    """
+    rng = np.random.default_rng([seed, zigzag(cx), zigzag(cy)])
+    mines = rng.random((size, size)) < density
+    mines.flags.writeable = False
+    return mines
+
+
+class EndlessBoard:
+    def __init__(self, seed=None, density=0.16, chunk_size=32, topology=SQUARE) -> None:
+        """
+        initialize an endless board, split in square chunks which are created when they are first played
+        cells have global coordinates (i, j), which may be negative; the chunk (cx, cy) holds the cells with
+        i // chunk_size == cx and j // chunk_size == cy
+        :param seed: the seed of the board, random if not given
+        :param density: the probability of a cell to be a mine
+        :param chunk_size: the size of a chunk
+        :param topology: the neighbors of the cells, the same offsets everywhere: an endless board has no edge to
+                         wrap around, and its chunks do not know the parity of the global rows
+        """
+        if not MIN_DENSITY <= density < 1:
+            raise ValueError(f"the density of mines must be between {MIN_DENSITY} and 1")
+        if not topology.uniform:
+            raise ValueError(f"an endless board can not be played with the {topology.name} topology")
+        if chunk_size < topology.reach:
+            raise ValueError(f"the chunks must be at least {topology.reach} cells wide")
+        self.seed: int = seed if seed is not None else int(np.random.SeedSequence().entropy % 2 ** 63)
+        self.density: float = density
+        self.size: int = chunk_size
+        self.topology = topology
+        self.offsets: np.ndarray = np.array(topology.offsets, dtype=np.int64)
+
+        # the chunks being played, each of them is a small board
+        self.chunks: dict = {}
+        # the chunks whose safe cells are all revealed, only their packed flags are kept (None without flags)
+        self.resolved: dict = {}
+        # the revealed, flagged and counts grids of the resolved chunks drawn last, in the order they were drawn
+        self.views: OrderedDict = OrderedDict()
+
+        self.lost = False
+        self.revealed_count: int = 0
+        self.flags_count: int = 0
+
+    def mines_of(self, cx, cy) -> np.ndarray:
+        """
+        get the mines of a chunk
+        :param cx: the x coordinate of the chunk
+        :param cy: the y coordinate of the chunk
+        :return: the boolean grid of mines, which must not be modified
+        """
+        return chunk_mines(self.seed, self.density, self.size, cx, cy)
+
+    def build(self, cx, cy) -> Board:
+        """
+        create the board of a chunk, its counts include the mines of the chunks around it
+        :param cx: the x coordinate of the chunk
+        :param cy: the y coordinate of the chunk
+        :return: the board of the chunk
+        """
+        size, r = self.size, self.topology.reach
+        grid = np.block([[self.mines_of(cx + dx, cy + dy) for dy in (-1, 0, 1)] for dx in (-1, 0, 1)])
+        around = grid[size - r:2 * size + r, size - r:2 * size + r]
+        mines = around[r:-r, r:-r]
+        board = Board(size, size, int(mines.sum()), self.topology)
+        board.place_mines(mines, self.topology.counts(around)[r:-r, r:-r])
+        return board
+
+    def expand(self, cx, cy) -> Board:
+        """
+        create the board of a resolved chunk again: every safe cell is revealed, and the flags are unpacked
+        :param cx: the x coordinate of the chunk
+        :param cy: the y coordinate of the chunk
+        :return: the board of the chunk
+        """
+        board = self.build(cx, cy)
+        flags = self.resolved[(cx, cy)]
+        flagged = np.zeros(board.mines.shape, dtype=bool) if flags is None else \
+            np.unpackbits(flags, count=board.mines.size).reshape(board.mines.shape).view(bool)
+        board.restore(~board.mines, flagged)
+        return board
+
+    def chunk(self, cx, cy) -> Board:
+        """
+        get the board of a chunk to play it, a new chunk is created and a resolved chunk is expanded again
+        :param cx: the x coordinate of the chunk
+        :param cy: the y coordinate of the chunk
+        :return: the board of the chunk
+        """
+        board = self.chunks.get((cx, cy))
+        if board is None:
+            if (cx, cy) in self.resolved:
+                board = self.expand(cx, cy)
+                del self.resolved[(cx, cy)]
+                self.views.pop((cx, cy), None)  # the chunk is played again, its grids will change
+            else:
+                board = self.build(cx, cy)
+            self.chunks[(cx, cy)] = board
+        return board
+
+    def compact(self, keys) -> None:
+        """
+        drop the boards of the resolved chunks, the mines can be derived again from the seed
+        :param keys: the coordinates of the chunks which changed
+        :return: None
+        """
+        for key in keys:
+            board = self.chunks.get(key)
+            if board is not None and board.safe_left == 0 and not board.lost:
+                self.resolved[key] = np.packbits(board.flagged) if board.flags_count else None
+                self.keep_view(key, (board.revealed, board.flagged, board.counts))
+                del self.chunks[key]
+
+    def keep_view(self, key, grids) -> None:
+        """
+        keep the grids of a resolved chunk for drawing, and forget the ones drawn longest ago
+        :param key: the coordinates of the chunk
+        :param grids: its revealed, flagged and counts grids
+        :return: None
+        """
+        self.views[key] = grids
+        self.views.move_to_end(key)
+        while len(self.views) > CACHED_VIEWS:
+            self.views.popitem(last=False)
+
+    def view(self, cx, cy) -> tuple:
+        """
+        get the grids of a resolved chunk for drawing, its board is created again only if they are not kept
+        :param cx: the x coordinate of the chunk
+        :param cy: the y coordinate of the chunk
+        :return: the revealed, flagged and counts grids of the chunk, which must not be modified
+        """
+        grids = self.views.get((cx, cy))
+        if grids is None:
+            board = self.expand(cx, cy)
+            grids = (board.revealed, board.flagged, board.counts)
+        self.keep_view((cx, cy), grids)
+        return grids
+
+    def reveal(self, i, j) -> tuple:
+        """
+        reveal (i, j); if it has no mine around, keep revealing the area around it, across the chunks
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: the x coordinates and the y coordinates of the newly revealed cells
+        """
+        size = self.size
+        cx, cy = i // size, j // size
+        board = self.chunk(cx, cy)
+        xs, ys = board.reveal(i - cx * size, j - cy * size)
+        if board.lost:
+            self.lost = True
+            return xs + cx * size, ys + cy * size
+
+        # an empty cell closer to the edge of a chunk than the reach of the topology spills the flood fill into the
+        # chunks around it
+        r = self.topology.reach
+        pending = {(cx, cy): (xs, ys)}
+        all_xs, all_ys, changed = [], [], set()
+        while pending:
+            (cx, cy), (xs, ys) = pending.popitem()
+            changed.add((cx, cy))
+            xs, ys = xs + cx * size, ys + cy * size
+            all_xs.append(xs)
+            all_ys.append(ys)
+            empty = self.chunks[(cx, cy)].counts[xs - cx * size, ys - cy * size] == 0
+            edge = empty & ((xs % size < r) | (xs % size >= size - r) | (ys % size < r) | (ys % size >= size - r))
+            if not edge.any():
+                continue
+            nxs = (xs[edge, None] + self.offsets[:, 0]).reshape(-1)
+            nys = (ys[edge, None] + self.offsets[:, 1]).reshape(-1)
+            outside = (nxs // size != cx) | (nys // size != cy)
+            nxs, nys = nxs[outside], nys[outside]
+            for key in set(zip((nxs // size).tolist(), (nys // size).tolist())):
+                inside = (nxs // size == key[0]) & (nys // size == key[1])
+                new_xs, new_ys = self.chunk(*key).reveal_many(nxs[inside] - key[0] * size,
+                                                              nys[inside] - key[1] * size)
+                if new_xs.size:
+                    if key in pending:
+                        new_xs = np.concatenate((pending[key][0], new_xs))
+                        new_ys = np.concatenate((pending[key][1], new_ys))
+                    pending[key] = (new_xs, new_ys)
+        xs, ys = np.concatenate(all_xs), np.concatenate(all_ys)
+        self.revealed_count += xs.size
+        self.compact(changed)
+        return xs, ys
+
+    def toggle_flag(self, i, j) -> bool:
+        """
+        place or remove the flag at (i, j)
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: True if a flag is now placed at (i, j)
+        """
+        size = self.size
+        cx, cy = i // size, j // size
+        board = self.chunk(cx, cy)
+        before = board.flags_count
+        flagged = board.toggle_flag(i - cx * size, j - cy * size)
+        self.flags_count += board.flags_count - before
+        self.compact([(cx, cy)])
+        return flagged
+
+    def start(self) -> tuple:
+        """
+        reveal the empty cell nearest to (0, 0), so that the game starts with an opening
+        :return: the x coordinates and the y coordinates of the newly revealed cells
+        """
+        radius = 0
+        while True:
+            for cx in range(-radius, radius + 1):
+                for cy in range(-radius, radius + 1):
+                    if max(abs(cx), abs(cy)) != radius:
+                        continue
+                    board = self.chunk(cx, cy)
+                    xs, ys = np.nonzero(~board.mines & (board.counts == 0))
+                    if xs.size:
+                        nearest = np.argmin(np.abs(xs + cx * self.size) + np.abs(ys + cy * self.size))
+                        return self.reveal(int(xs[nearest]) + cx * self.size, int(ys[nearest]) + cy * self.size)
+            radius += 1
+
+    def window(self, i0, j0, w, h, with_mines=False) -> tuple:
+        """
+        get the state of a rectangle of cells, the chunks which were never played are covered
+        :param i0: the x coordinate of the first cell
+        :param j0: the y coordinate of the first cell
+        :param w: the number of cells along x
+        :param h: the number of cells along y
+        :param with_mines: also get the mines, which derives the mines of every chunk of the rectangle
+        :return: the revealed, flagged, counts and mines grids of shape (w, h), mines is None if not asked
+        """
+        size = self.size
+        revealed = np.zeros((w, h), dtype=bool)
+        flagged = np.zeros((w, h), dtype=bool)
+        counts = np.zeros((w, h), dtype=np.int8)
+        mines = np.zeros((w, h), dtype=bool) if with_mines else None
+        for cx in range(i0 // size, (i0 + w - 1) // size + 1):
+            for cy in range(j0 // size, (j0 + h - 1) // size + 1):
+                # the part of the rectangle in this chunk, in rectangle and in chunk coordinates
+                x0, x1 = max(i0, cx * size), min(i0 + w, (cx + 1) * size)
+                y0, y1 = max(j0, cy * size), min(j0 + h, (cy + 1) * size)
+                target = (slice(x0 - i0, x1 - i0), slice(y0 - j0, y1 - j0))
+                source = (slice(x0 - cx * size, x1 - cx * size), slice(y0 - cy * size, y1 - cy * size))
+                board = self.chunks.get((cx, cy))
+                if board is not None:
+                    revealed[target] = board.revealed[source]
+                    flagged[target] = board.flagged[source]
+                    counts[target] = board.counts[source]
+                elif (cx, cy) in self.resolved:
+                    chunk_revealed, chunk_flagged, chunk_counts = self.view(cx, cy)
+                    revealed[target] = chunk_revealed[source]
+                    flagged[target] = chunk_flagged[source]
+                    counts[target] = chunk_counts[source]
+                if with_mines:
+                    mines[target] = self.mines_of(cx, cy)[source]
+        return revealed, flagged, counts, mines
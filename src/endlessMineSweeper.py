@@ -0,0 +1,164 @@
+import sys
+import tkinter as tk
+
+from src.baseInterface import BaseInterface
+from src.endlessBoard import EndlessBoard
+from src.viewportBoard import ViewportBoard
+
+
+class EndlessMineSweeper(BaseInterface):
+    def __init__(self, callback, seed=None, density=0.16, root=None, rows=20, columns=32) -> None:
+        """
+        initialize the endless MineSweeper game: the board has no border, the arrow keys move the window
+        :param callback: called with the main window to go back to the level selection
+        :param seed: the seed of the board, random if not given
+        :param density: the probability of a cell to be a mine
+        :param root: the main window, created if not given
+        :param rows: the number of rows shown
+        :param columns: the number of columns shown
+        """
+        self.callback = callback
+        self.seed = seed
+        self.density = density
+        self.rows: int = rows
+        self.columns: int = columns
+        self.normal_color: str = "SystemButtonFace"
+
+        # create the screen in the main window
+        BaseInterface.__init__(self, root)
+
+        # create the score label and the game area
+        self.score_label = tk.Label(self.screen, text="0 cells")
+        self.score_label.pack()
+        self.frame = BaseInterface.create_frame(self.screen, 1, 1)
+
+        # create the number of flags label and the game label
+        self.flags_label = tk.Label(self.screen, text="0 flags")
+        self.flags_label.pack(side=tk.RIGHT)
+        self.game_label = tk.Label(self.screen, text="Use the arrow keys to move")
+        self.game_label.pack()
+
+        # create the game buttons
+        tk.Button(self.screen, text="quit", command=self.quit, width=10).pack(side=tk.LEFT)
+        tk.Button(self.screen, text="rechoose", command=self.rechoose, width=10).pack(side=tk.LEFT)
+        tk.Button(self.screen, text="restart", command=self.restart, width=10).pack(side=tk.LEFT)
+
+        # initialize the game
+        self.view = ViewportBoard(self.frame, rows, columns)
+        self.new_game()
+        self.view.bind_cells(self.reveal, self.place_remove_flag, self.move)
+
+        # center the window
+        self.root.update()
+        BaseInterface.center_window(self.root)
+
+    def new_game(self) -> None:
+        """
+        create a new endless board and reveal its first opening in the middle of the window
+        :return: None
+        """
+        self.board = EndlessBoard(self.seed, self.density)
+        self.over = False
+        self.view.disabled = False
+        xs, ys = self.board.start()
+        self.view.i0 = int(xs[0]) - self.rows // 2
+        self.view.j0 = int(ys[0]) - self.columns // 2
+        self.draw()
+        self.score_label.config(text=f"{self.board.revealed_count} cells")
+        self.flags_label.config(text="0 flags")
+        self.game_label.config(text="Use the arrow keys to move")
+
+    def restart(self) -> None:
+        """
+        start a new endless game, on a new board unless the seed was given
+        :return: None
+        """
+        self.new_game()
+
+    def look(self, revealed, flagged, count, mine) -> tuple:
+        """
+        get how a cell looks
+        :param revealed: the cell is revealed
+        :param flagged: the cell is flagged
+        :param count: the number of mines around the cell
+        :param mine: the cell is a mine, only known once the game is over
+        :return: the text and the color of the cell
+        """
+        if mine and (revealed or self.over and not flagged):
+            return "*", "#FF8080"  # light red
+        if flagged:
+            return "🚩", "light green" if mine else "#00FFFF"
+        if revealed:
+            return str(count or ""), self.normal_color
+        return "", "light blue"
+
+    def draw(self) -> None:
+        """
+        draw every cell of the window, the mines are shown once the game is over
+        :return: None
+        """
+        i0, j0 = self.view.i0, self.view.j0
+        revealed, flagged, counts, mines = self.board.window(i0, j0, self.rows, self.columns, with_mines=self.over)
+        for i in range(self.rows):
+            for j in range(self.columns):
+                mine = mines is not None and mines[i, j]
+                self.view.update_cell(i0 + i, j0 + j, *self.look(revealed[i, j], flagged[i, j], counts[i, j], mine))
+
+    def move(self, di, dj) -> None:
+        """
+        move the window, the chunks it reaches are not created until they are played
+        :param di: the number of rows to move by
+        :param dj: the number of columns to move by
+        :return: None
+        """
+        self.view.move(di, dj)
+        self.draw()
+
+    def reveal(self, i, j) -> None:
+        """
+        the left click event -> reveal the cell
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: None
+        """
+        xs, ys = self.board.reveal(i, j)
+        if self.board.lost:
+            self.over = True
+            self.view.disable_all()
+            self.game_label.config(text="Game Over")
+            self.draw()
+            return None
+        # only the cells whose look changed are drawn again
+        inside = (xs >= self.view.i0) & (xs < self.view.i0 + self.rows) & \
+                 (ys >= self.view.j0) & (ys < self.view.j0 + self.columns)
+        if inside.any():
+            self.draw()
+        self.score_label.config(text=f"{self.board.revealed_count} cells")
+
+    def place_remove_flag(self, i, j) -> None:
+        """
+        the right click event -> place or remove the flag
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: None
+        """
+        self.board.toggle_flag(i, j)
+        revealed, flagged, counts, _ = self.board.window(i, j, 1, 1)
+        self.view.update_cell(i, j, *self.look(revealed[0, 0], flagged[0, 0], counts[0, 0], False))
+        self.flags_label.config(text=f"{self.board.flags_count} flags")
+
+    def quit(self) -> None:
+        """
+        quit the game
+        :return: None
+        """
+        self.root.destroy()
+        sys.exit()
+
+    def rechoose(self) -> None:
+        """
+        go back to the level selection, in the same main window
+        :return: None
+        """
+        self.close()
+        self.callback(self.root)
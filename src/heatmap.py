@@ -0,0 +1,90 @@
+import threading
+
+from src.probability import COMPONENT_POOL, Cancelled, ProbabilityCache, mine_probabilities
+from src.topology import SQUARE
+
+# the shades of the covered cells, from light blue (no chance of a mine) to red (a sure mine)
+SHADES = 11
+HEAT_COLORS = [f"#{173 + (255 - 173) * k // (SHADES - 1):02X}{216 + (96 - 216) * k // (SHADES - 1):02X}"
+               f"{230 + (96 - 230) * k // (SHADES - 1):02X}" for k in range(SHADES)]
+
+
+class HeatmapWorker:
+    def __init__(self) -> None:
+        """
+        compute the mine probabilities in a background thread
+        only the latest request matters: a new request cancels the one being computed
+        """
+        self.condition = threading.Condition()
+        self.generation: int = 0
+        self.job = None
+        self.result = None
+        self.closed = False
+        self.cache = ProbabilityCache()
+        self.thread = threading.Thread(target=self.work_loop, name="heatmap-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, revealed, counts, num_of_mines, topology=SQUARE) -> None:
+        """
+        ask for the probabilities of a board, the grids are copied so that the game can go on
+        :param revealed: the boolean grid of revealed cells
+        :param counts: the grid of adjacency counts
+        :param num_of_mines: the number of mines
+        :param topology: the topology of the board
+        :return: None
+        """
+        with self.condition:
+            self.generation += 1
+            self.job = (self.generation, revealed.copy(), counts.copy(), num_of_mines, topology)
+            self.condition.notify()
+
+    def cancel(self) -> None:
+        """
+        drop the pending request and the result which was not taken yet
+        :return: None
+        """
+        with self.condition:
+            self.generation += 1
+            self.job = None
+            self.result = None
+
+    def take(self):
+        """
+        take the result of the latest request, called from the Tk thread
+        :return: the grid of probabilities, or None if it is not ready
+        """
+        with self.condition:
+            result, self.result = self.result, None
+        return result
+
+    def close(self) -> None:
+        """
+        stop the worker
+        :return: None
+        """
+        with self.condition:
+            self.closed = True
+            self.generation += 1
+            self.condition.notify()
+
+    def work_loop(self) -> None:
+        """
+        compute the requests one after another, a request is abandoned as soon as a newer one arrives
+        :return: None
+        """
+        while True:
+            with self.condition:
+                while self.job is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return None
+                generation, revealed, counts, num_of_mines, topology = self.job
+                self.job = None
+            try:
+                probabilities = mine_probabilities(revealed, counts, num_of_mines, self.cache,
+                                                   lambda: self.generation != generation, topology, COMPONENT_POOL)
+            except Cancelled:
+                continue
+            with self.condition:
+                if self.generation == generation:
+                    self.result = probabilities
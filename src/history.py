@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class History:
+    def __init__(self, height) -> None:
+        """
+        keep the moves of a game for undo and redo
+        every board state is the current grids plus the moves done since it, so the states share everything but
+        the cells of each move: a move only keeps the cells it changed, for a reveal the whole cascade
+        :param height: the height of the board, the cells are kept as flat indices i * height + j
+        """
+        self.height = height
+        self.done: list = []
+        self.undone: list = []
+
+    def push(self, kind, xs, ys) -> None:
+        """
+        add a move, the moves undone before it can no longer be redone
+        :param kind: REVEAL or FLAG, the actions of src/replay.py
+        :param xs: the x coordinates of the changed cells
+        :param ys: the y coordinates of the changed cells
+        :return: None
+        """
+        cells = np.asarray(xs, dtype=np.int32) * self.height + np.asarray(ys, dtype=np.int32)
+        self.done.append((kind, cells))
+        self.undone.clear()
+
+    def undo(self):
+        """
+        take the last move back
+        :return: (kind, xs, ys) of the move, or None if there is nothing to undo
+        """
+        if not self.done:
+            return None
+        move = self.done.pop()
+        self.undone.append(move)
+        return (move[0], *np.divmod(move[1], self.height))
+
+    def redo(self):
+        """
+        play the last undone move again
+        :return: (kind, xs, ys) of the move, or None if there is nothing to redo
+        """
+        if not self.undone:
+            return None
+        move = self.undone.pop()
+        self.done.append(move)
+        return (move[0], *np.divmod(move[1], self.height))
+
+    def clear(self) -> None:
+        """
+        forget every move
+        :return: None
+        """
+        self.done.clear()
+        self.undone.clear()
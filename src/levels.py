@@ -0,0 +1,6 @@
+# the preset levels: the width of the board, the height of the board and the number of mines
+LEVELS = {
+    "beginner": (8, 8, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (24, 24, 99),
+}
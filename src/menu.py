@@ -1,31 +1,37 @@
+import os
 import tkinter as tk
+import tkinter.filedialog
+import tkinter.messagebox
 from src.baseInterface import BaseInterface
+from src.Minesweeper8UIdesign import MineSweeper
+from src.replay import REPLAY_FOLDER, read_replay
 from src.selectLevel import SelectLevel
+from src.snapshot import SAVE_PATH, load_snapshot
 
 
 class Menu(BaseInterface):
-    def __init__(self):
+    def __init__(self, root=None):
         """
-        initialize the main window
+        initialize the menu screen
+        :param root: the main window, created if not given
         """
-        super().__init__()
-        self.root.title("Minesweeper")
+        super().__init__(root)
 
         # Define colors for different categories of labels
         colors = {'instructions': '#D5F5E3', 'click_actions': '#F5B041'}
 
         # Frame for Instructions
-        self.instructions_frame = super().create_frame(self.root, 1, 1)
+        self.instructions_frame = super().create_frame(self.screen, 1, 1)
         self.instructions_frame.configure(bg=colors['instructions'])
         self.instructions_frame.pack(pady=10)
 
         # Frame for Click Actions
-        self.clicks_frame = super().create_frame(self.root, 1, 1)
+        self.clicks_frame = super().create_frame(self.screen, 1, 1)
         self.clicks_frame.configure(bg=colors['click_actions'])
         self.clicks_frame.pack(pady=10)
 
         # Frame for Button
-        self.button_frame = tk.Frame(self.root)
+        self.button_frame = tk.Frame(self.screen)
         self.button_frame.pack(pady=10)
 
         instructions = [
@@ -64,6 +70,21 @@ class Menu(BaseInterface):
             command=lambda: self.start()
         ).pack()
 
+        if os.path.exists(SAVE_PATH):
+            tk.Button(
+                self.button_frame,
+                text="Resume",
+                font=("Helvetica", 20),
+                command=lambda: self.resume()
+            ).pack(pady=10)
+
+        tk.Button(
+            self.button_frame,
+            text="Replay",
+            font=("Helvetica", 20),
+            command=lambda: self.replay()
+        ).pack(pady=10)
+
         # center the window
         self.root.update()
         super().center_window(self.root)
@@ -73,6 +94,37 @@ class Menu(BaseInterface):
         start the game
         :return: None
         """
-        self.root.destroy()
-        from src.selectLevel import SelectLevel
-        SelectLevel().root.mainloop()
+        self.close()
+        SelectLevel(self.root)
+
+    def resume(self):
+        """
+        resume the saved game
+        :return: None
+        """
+        try:
+            snapshot = load_snapshot(SAVE_PATH)
+        except (OSError, ValueError) as error:
+            tk.messagebox.showinfo("Error", f"Can not read the saved game: {error}")
+            return None
+        self.close()
+        MineSweeper(snapshot.width, snapshot.height, snapshot.num_of_mines, snapshot.level, SelectLevel.call,
+                    root=self.root, snapshot=snapshot)
+
+    def replay(self):
+        """
+        choose a recorded game and play it back
+        :return: None
+        """
+        path = tk.filedialog.askopenfilename(title="Replay", initialdir=REPLAY_FOLDER if os.path.isdir(REPLAY_FOLDER)
+                                             else ".", filetypes=[("Replays", "*.msr")])
+        if not path:
+            return None
+        try:
+            replay = read_replay(path)
+        except (OSError, ValueError) as error:
+            tk.messagebox.showinfo("Error", f"Can not read the replay: {error}")
+            return None
+        self.close()
+        MineSweeper(replay.width, replay.height, replay.num_of_mines, replay.level, SelectLevel.call,
+                    root=self.root, replay=replay)
@@ -0,0 +1,176 @@
+from multiprocessing import Pool
+
+import numpy as np
+
+from src.topology import SQUARE
+
+# the names of the metrics returned by board_metrics
+METRICS = ("bbbv", "openings", "isolated", "islands")
+
+# the number of boards computed together
+CHUNK = 4096
+
+
+def count_components(masks, topology=SQUARE) -> np.ndarray:
+    """
+    count the connected groups of cells of every grid of a stack, the cells being connected through the neighbors
+    of the topology, with a union-find run on all the grids at once: every round links the root of each pair of
+    touching cells to the smaller of the two roots, then points every cell straight at its root, so a handful of
+    rounds is enough whatever the shape of the groups
+    :param masks: the boolean grids, of shape (boards, width, height)
+    :param topology: the neighbors of the cells, the 8 cells around by default
+    :return: the number of groups of every grid
+    """
+    boards, w, h = masks.shape
+    if topology.uniform:
+        # the border is as wide as the reach, it keeps every pair inside its own grid
+        r = topology.reach
+        padded = np.zeros((boards, w + 2 * r, h + 2 * r), dtype=bool)
+        padded[:, r:r + w, r:r + h] = masks
+        size = (w + 2 * r) * (h + 2 * r)
+        flat = padded.reshape(-1)
+        cells = np.flatnonzero(flat)
+        # each pair of touching cells once: the neighbors further in the flat grid
+        stencil = topology.stencil(h + 2 * r)
+        starts = [(cells[flat[cells + offset]], offset) for offset in stencil[stencil > 0].tolist()]
+        first = np.concatenate([start for start, _ in starts])
+        second = np.concatenate([start + offset for start, offset in starts])
+    else:
+        # the pairs of the neighbor table, each once, repeated in every grid where both cells are set
+        size = w * h
+        flat = masks.reshape(-1)
+        cells = np.flatnonzero(flat)
+        table = topology.table(w, h)
+        source = np.repeat(np.arange(size, dtype=np.int32), table.degrees)
+        forward = table.indices > source
+        source, target = source[forward], table.indices[forward]
+        grids = masks.reshape(boards, size)
+        grid, pair = np.nonzero(grids[:, source] & grids[:, target])
+        first = grid * size + source[pair]
+        second = grid * size + target[pair]
+    # the cells are numbered in the order of the grids
+    index = np.cumsum(flat, dtype=np.int32) - 1
+    first, second = index[first], index[second]
+
+    parent = np.arange(cells.size, dtype=np.int32)
+    while first.size:
+        root_first, root_second = parent[first], parent[second]
+        apart = root_first != root_second
+        if not apart.any():
+            break
+        first, second = first[apart], second[apart]
+        root_first, root_second = root_first[apart], root_second[apart]
+        parent[np.maximum(root_first, root_second)] = np.minimum(root_first, root_second)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    roots = cells[parent == np.arange(cells.size)]
+    return np.bincount(roots // size, minlength=boards)
+
+
+def board_metrics(mines, topology=SQUARE) -> dict:
+    """
+    compute the difficulty of boards from their mines
+    the 3BV is the smallest number of clicks which clears a board: one per opening (a group of cells without any
+    mine around, revealed by a single click with their border) and one per number outside of every opening
+    :param mines: the boolean grid of mines, or a stack of grids of shape (boards, width, height)
+    :param topology: the neighbors of the cells, which decide the numbers and how the openings spread
+    :return: the 3BV, the openings, the isolated numbers and the islands (the groups of isolated numbers) of every
+             board, as arrays for a stack and as ints for a single grid
+    """
+    mines = np.asarray(mines, dtype=bool)
+    if mines.ndim == 2:
+        return {name: int(value[0]) for name, value in chunk_metrics(mines[None], topology).items()}
+    # the stack is handled in chunks, so that the working arrays stay small whatever the number of boards
+    chunks = [chunk_metrics(mines[start:start + CHUNK], topology) for start in range(0, len(mines), CHUNK)]
+    return merge_chunks(chunks)
+
+
+def chunk_metrics(mines, topology=SQUARE) -> dict:
+    """
+    compute the metrics of a stack of boards at once
+    :param mines: the boolean grids of mines, of shape (boards, width, height)
+    :param topology: the neighbors of the cells
+    :return: the arrays of metrics
+    """
+    empty = ~mines & (topology.counts(mines) == 0)
+    # the numbers revealed by an opening are the safe cells next to an empty cell: counting the empty cells around
+    # every cell finds them the same way as the mines
+    isolated = ~mines & ~empty & (topology.counts(empty) == 0)
+
+    result = {"openings": count_components(empty, topology), "isolated": isolated.sum(axis=(1, 2))}
+    result["bbbv"] = result["openings"] + result["isolated"]
+    result["islands"] = count_components(isolated, topology)
+    return result
+
+
+def merge_chunks(chunks) -> dict:
+    """
+    join the metrics of several chunks of boards
+    :param chunks: the list of arrays of metrics
+    :return: the arrays of metrics of every board
+    """
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.zeros(0, dtype=np.int64)
+            for name in METRICS}
+
+
+def bbbv_per_second(bbbv, elapsed_time) -> float:
+    """
+    get the efficiency of a game
+    :param bbbv: the 3BV of the board
+    :param elapsed_time: the time of the game in seconds
+    :return: the 3BV per second, the time being at least one second
+    """
+    return bbbv / max(elapsed_time, 1.0)
+
+
+def random_boards(count, width, height, num_of_mines, rng) -> np.ndarray:
+    """
+    generate boards at once, every board takes the cells of its smallest random keys
+    :param count: the number of boards
+    :param width: the width of the boards
+    :param height: the height of the boards
+    :param num_of_mines: the number of mines
+    :param rng: the random generator
+    :return: the boolean grids of mines, of shape (count, width, height)
+    """
+    mines = np.zeros((count, width * height), dtype=bool)
+    if num_of_mines:
+        picks = np.argpartition(rng.random((count, width * height)), num_of_mines - 1, axis=1)[:, :num_of_mines]
+        mines[np.arange(count)[:, None], picks] = True
+    return mines.reshape(count, width, height)
+
+
+def run_chunk(task) -> dict:
+    """
+    generate a chunk of boards and compute their metrics in a worker process
+    :param task: (seed sequence of the chunk, number of boards, width, height, mines)
+    :return: the arrays of metrics
+    """
+    seed, count, width, height, num_of_mines = task
+    return chunk_metrics(random_boards(count, width, height, num_of_mines, np.random.default_rng(seed)))
+
+
+def level_metrics(width, height, num_of_mines, boards, seed=None, workers=1) -> dict:
+    """
+    compute the metrics of many random boards of a level, for example the distribution of the 3BV
+    every worker generates its own boards, so that no board is sent between the processes
+    :param width: the width of the boards
+    :param height: the height of the boards
+    :param num_of_mines: the number of mines
+    :param boards: the number of boards
+    :param seed: the seed, the same seed gives the same boards whatever the number of workers
+    :param workers: the number of worker processes
+    :return: the arrays of metrics
+    """
+    sizes = [min(CHUNK, boards - start) for start in range(0, boards, CHUNK)]
+    tasks = [(chunk_seed, size, width, height, num_of_mines)
+             for chunk_seed, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)]
+    if workers > 1:
+        with Pool(workers) as pool:
+            chunks = pool.map(run_chunk, tasks)
+    else:
+        chunks = [run_chunk(task) for task in tasks]
+    return merge_chunks(chunks)
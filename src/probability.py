@@ -0,0 +1,468 @@
+import atexit
+import math
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+
+import numpy as np
+
+from src.topology import SQUARE
+
+# the number of states after which a component is estimated instead of enumerated,
+# and the largest component which is enumerated at all
+STATE_BUDGET = 200000
+MAX_CELLS = 400
+
+# the components of at least PARALLEL_CELLS cells go to the worker processes, which allow them more states,
+# and a computation waiting for a worker checks every POLL_INTERVAL seconds whether it was cancelled
+PARALLEL_CELLS = 60
+PARALLEL_BUDGET = 2000000
+POLL_INTERVAL = 0.05
+
+# returned by a cache lookup for a signature never enumerated (None is a result: a component over the budget)
+MISSING = object()
+
+
+class Cancelled(Exception):
+    # raised inside a computation which was superseded by a newer one
+    pass
+
+
+def frontier_constraints(revealed, counts, topology=SQUARE) -> list:
+    """
+    get the constraints given by the revealed numbers: the covered cells around a number hold that many mines
+    the flags are not trusted, a flagged cell is a covered cell like any other
+    :param revealed: the boolean grid of revealed cells
+    :param counts: the grid of adjacency counts
+    :param topology: the topology of the board
+    :return: the list of (cells, mines) with cells the sorted tuple of flat indices of the covered neighbors
+    """
+    w, h = revealed.shape
+    table = topology.table(w, h)
+    covered = ~revealed.reshape(-1)
+    numbers = np.flatnonzero(~covered & (table.sums(covered) > 0)).tolist()
+    neighbors, is_covered = table.lists(), covered.tolist()
+    return [(tuple(v for v in neighbors[c] if is_covered[v]), mines)
+            for c, mines in zip(numbers, counts.reshape(-1)[numbers].tolist())]
+
+
+def split_components(constraints) -> list:
+    """
+    group the constraints which share cells, directly or through other constraints
+    :param constraints: the list of (cells, mines)
+    :return: the list of components, each of them a sorted tuple of constraints
+    """
+    parent: dict = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+    groups: dict = {}
+    for constraint in constraints:
+        groups.setdefault(find(constraint[0][0]), set()).add(constraint)
+    return [tuple(sorted(group)) for group in groups.values()]
+
+
+def order_cells(component) -> list:
+    """
+    order the cells of a component breadth first, so that a constraint is closed soon after it is opened and few
+    constraints are open at once
+    :param component: the constraints of the component
+    :return: the cells, in the order they are decided
+    """
+    of_cell: dict = {}
+    for index, (constraint_cells, _) in enumerate(component):
+        for cell in constraint_cells:
+            of_cell.setdefault(cell, []).append(index)
+    cells, seen = [], {component[0][0][0]}
+    queue = deque(seen)
+    while queue:
+        cell = queue.popleft()
+        cells.append(cell)
+        for index in of_cell[cell]:
+            for other in component[index][0]:
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+    return cells
+
+
+def enumerate_component(component, cancelled=None, budget=STATE_BUDGET):
+    """
+    count every placement of mines on the cells of a component which satisfies its constraints
+    the cells are decided one after another; the placements of the decided cells only matter to the rest through
+    the mines still needed by the open constraints, so the placements leading to the same needs are merged into one
+    state holding how many of them there are per number of mines (a polynomial); a forward pass counts the ways to
+    reach every state, a backward pass the ways to finish from it, and their product gives every cell
+    :param component: the constraints of the component
+    :param cancelled: called from time to time, the enumeration raises Cancelled when it returns True
+    :param budget: the number of states allowed
+    :return: (cells, solutions, mines) with solutions[k] the number of placements of k mines and mines[k][c]
+             the number of those placements with a mine on cells[c], as float arrays, or None if the budget is
+             exceeded
+    """
+    cells = order_cells(component)
+    n = len(cells)
+    if n > MAX_CELLS:
+        return None
+    position = {cell: p for p, cell in enumerate(cells)}
+    members = [sorted(position[cell] for cell in constraint_cells) for constraint_cells, _ in component]
+
+    # the plan of every step: the constraints open while the cell p is decided, where their need comes from in the
+    # state (or their number of mines when they open), whether p is one of their cells, and how many of their
+    # cells are left after p; the constraints whose last cell is p are closed and leave the state
+    opening = [[] for _ in range(n)]
+    for index, positions in enumerate(members):
+        opening[positions[0]].append(index)
+    plans, state_of = [], []
+    for p in range(n):
+        involved = sorted(state_of + opening[p])
+        plan = []
+        for index in involved:
+            positions = members[index]
+            source = state_of.index(index) if index in state_of else -1
+            after = len(positions) - bisect_right(positions, p)
+            plan.append((source, component[index][1], p in positions, after))
+        plans.append(plan)
+        state_of = [index for index in involved if members[index][-1] > p]
+
+    def step(state, plan, mine):
+        values = []
+        for source, mines, hit, after in plan:
+            value = (state[source] if source >= 0 else mines) - (mine and hit)
+            if value < 0 or value > after:
+                return None
+            if after:
+                values.append(value)
+        return tuple(values)
+
+    # forward: the number of placements of the decided cells reaching every state, per number of mines
+    forward = [{(): np.ones(1)}]
+    states = 0
+    for p in range(n):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        layer: dict = {}
+        for state, ways in forward[p].items():
+            for mine in (0, 1):
+                following = step(state, plans[p], mine)
+                if following is None:
+                    continue
+                shifted = np.concatenate(([0.0], ways)) if mine else np.append(ways, 0.0)
+                if following in layer:
+                    layer[following] += shifted
+                else:
+                    layer[following] = shifted
+        states += len(layer)
+        if states > budget:
+            return None
+        forward.append(layer)
+
+    # backward: the number of placements of the cells left finishing from every state, and the cells on the way
+    solutions = forward[n].get((), np.zeros(n + 1))
+    mines = np.zeros((n + 1, n))
+    backward = {(): np.ones(1)}
+    for p in range(n - 1, -1, -1):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        layer = {}
+        for state, ways in forward[p].items():
+            finish = np.zeros(n - p + 1)
+            for mine in (0, 1):
+                following = step(state, plans[p], mine)
+                if following is None or following not in backward:
+                    continue
+                rest = backward[following]
+                finish[mine:mine + rest.size] += rest
+                if mine:
+                    mines[1:, p] += np.convolve(ways, rest)
+            if finish.any():
+                layer[state] = finish
+        backward = layer
+        forward[p + 1] = None
+    return tuple(cells), solutions, mines
+
+
+def estimate_component(component) -> tuple:
+    """
+    estimate the probabilities of a component too large to enumerate: every cell takes the mean density of
+    the constraints around it
+    :param component: the constraints of the component
+    :return: (cells, probabilities)
+    """
+    total: dict = {}
+    for cells, mines in component:
+        for cell in cells:
+            sums = total.setdefault(cell, [0.0, 0])
+            sums[0] += mines / len(cells)
+            sums[1] += 1
+    cells = tuple(sorted(total))
+    return cells, [min(1.0, total[cell][0] / total[cell][1]) for cell in cells]
+
+
+def log_comb(n, k) -> float:
+    """
+    get the logarithm of the binomial coefficient C(n, k)
+    :param n: n
+    :param k: k
+    :return: the logarithm, -inf if k is out of range
+    """
+    if k < 0 or k > n:
+        return -math.inf
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def convolve(a, b) -> list:
+    """
+    convolve two distributions of numbers of mines
+    :param a: the first distribution
+    :param b: the second distribution
+    :return: the distribution of the sum
+    """
+    return np.convolve(a, b).tolist()
+
+
+def component_signature(component) -> tuple:
+    """
+    describe a component without its position: every cell is replaced by its rank among the cells of the
+    component, so that the same pattern of numbers anywhere on the board, or on another board, has the same
+    signature and is enumerated once
+    :param component: the constraints of the component
+    :return: (signature, cells) with the signature a component of ranks, and cells the sorted cells the ranks
+             stand for
+    """
+    cells = sorted({cell for constraint_cells, _ in component for cell in constraint_cells})
+    rank = {cell: r for r, cell in enumerate(cells)}
+    signature = tuple(sorted((tuple(rank[cell] for cell in constraint_cells), mines)
+                             for constraint_cells, mines in component))
+    return signature, tuple(cells)
+
+
+class ProbabilityCache:
+    def __init__(self, capacity=4096) -> None:
+        """
+        keep the enumeration of the recent component signatures; a component only depends on its own constraints,
+        so the parts of the frontier which did not change between two clicks are not enumerated again
+        the cache is filled by the worker processes too, so it is guarded by a lock
+        :param capacity: the number of signatures to keep
+        """
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, signature):
+        """
+        get the enumeration of a signature
+        :param signature: the signature of the component
+        :return: the result of enumerate_component on the signature, MISSING if it is not in the cache
+        """
+        with self.lock:
+            if signature not in self.entries:
+                return MISSING
+            self.entries.move_to_end(signature)
+            return self.entries[signature]
+
+    def store(self, signature, result) -> None:
+        """
+        keep the enumeration of a signature, the oldest one is dropped when the cache is full
+        :param signature: the signature of the component
+        :param result: the result of enumerate_component on the signature
+        :return: None
+        """
+        with self.lock:
+            self.entries[signature] = result
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def get(self, signature, cancelled=None):
+        """
+        get the enumeration of a signature, from the cache when it is there
+        :param signature: the signature of the component
+        :param cancelled: passed to enumerate_component
+        :return: the result of enumerate_component on the signature
+        """
+        result = self.lookup(signature)
+        if result is MISSING:
+            result = enumerate_component(signature, cancelled)
+            self.store(signature, result)
+        return result
+
+
+class ComponentPool:
+    def __init__(self, workers=None, min_cells=PARALLEL_CELLS) -> None:
+        """
+        enumerate the large components in worker processes, so that they run beside each other and beside the
+        small ones; a result is stored in the cache as soon as it is ready, even when nobody waits for it any more
+        :param workers: the number of worker processes, half of the cores if not given
+        :param min_cells: the smallest number of cells of a component sent to the workers
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.min_cells = min_cells
+        self.running: dict = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def submit(self, signature, cache) -> Future:
+        """
+        start the enumeration of a signature, or join the one already running
+        :param signature: the signature of the component
+        :param cache: the ProbabilityCache the result is stored in
+        :return: the future of the result
+        """
+        with self.lock:
+            if signature in self.running:
+                return self.running[signature]
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.workers)
+                atexit.register(self.stop)
+            future = self.executor.submit(enumerate_component, signature, None, PARALLEL_BUDGET)
+            self.running[signature] = future
+        future.add_done_callback(lambda done: self.done(signature, done, cache))
+        return future
+
+    def done(self, signature, future, cache) -> None:
+        """
+        called when a worker finished a signature, or when it was cancelled before it started
+        :param signature: the signature of the component
+        :param future: the future of the result
+        :param cache: the ProbabilityCache to store the result in
+        :return: None
+        """
+        with self.lock:
+            self.running.pop(signature, None)
+        if not future.cancelled() and future.exception() is None:
+            cache.store(signature, future.result())
+
+    @staticmethod
+    def wait(future, cancelled=None):
+        """
+        wait for the result of a worker, the job is dropped if it did not start when the computation is cancelled
+        :param future: the future of the result
+        :param cancelled: called while waiting, Cancelled is raised when it returns True
+        :return: the result of enumerate_component
+        """
+        while True:
+            try:
+                return future.result(timeout=POLL_INTERVAL)
+            except TimeoutError:
+                if cancelled is not None and cancelled():
+                    future.cancel()
+                    raise Cancelled()
+
+    def stop(self) -> None:
+        """
+        stop the worker processes
+        :return: None
+        """
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+def mine_probabilities(revealed, counts, num_of_mines, cache=None, cancelled=None, topology=SQUARE,
+                       pool=None) -> np.ndarray:
+    """
+    compute the probability of every covered cell to be a mine, given the revealed numbers and the number of
+    mines; the components of the frontier are enumerated exactly, then weighted together with the cells
+    outside of the frontier, the components too large to enumerate are estimated
+    :param revealed: the boolean grid of revealed cells
+    :param counts: the grid of adjacency counts
+    :param num_of_mines: the number of mines of the board
+    :param cache: a ProbabilityCache, to reuse the components which did not change
+    :param cancelled: called from time to time, the computation raises Cancelled when it returns True
+    :param topology: the topology of the board
+    :param pool: a ComponentPool for the large components, they are enumerated in this thread if not given
+    :return: the grid of probabilities, NaN on the revealed cells
+    """
+    w, h = revealed.shape
+    cache = cache or ProbabilityCache()
+    probabilities = np.full(w * h, np.nan)
+    exact, fixed_mines = [], 0.0
+    frontier = np.zeros(w * h, dtype=bool)
+    components = []
+    for component in split_components(frontier_constraints(revealed, counts, topology)):
+        signature, cells = component_signature(component)
+        frontier[list(cells)] = True
+        result = cache.lookup(signature)
+        if result is MISSING:
+            if pool is not None and len(cells) >= pool.min_cells:
+                result = pool.submit(signature, cache)  # the workers start at once, the result is taken below
+            else:
+                result = cache.get(signature, cancelled)
+        components.append((component, cells, result))
+
+    for component, cells, result in components:
+        if isinstance(result, Future):
+            result = pool.wait(result, cancelled)
+        if result is None:
+            estimated_cells, estimate = estimate_component(component)
+            probabilities[list(estimated_cells)] = estimate
+            fixed_mines += sum(estimate)
+        else:
+            ranks, solutions, mines = result
+            exact.append((tuple(cells[r] for r in ranks), solutions, mines))
+
+    # the cells outside of the frontier share the mines left by the components
+    outside = ~revealed.reshape(-1) & ~frontier
+    n_outside = int(outside.sum())
+    remaining = num_of_mines - int(round(fixed_mines))
+
+    # the weight of a total of K mines in the exact components: C(n_outside, remaining - K)
+    distributions = [np.array(solutions, dtype=float) for _, solutions, _ in exact]
+    distributions = [d / d.max() if d.max() > 0 else d for d in distributions]
+    max_total = sum(d.size - 1 for d in distributions)
+    log_weights = np.array([log_comb(n_outside, remaining - k) for k in range(max_total + 1)])
+    if not np.isfinite(log_weights).any():
+        log_weights = np.zeros(max_total + 1)  # the numbers do not fit the count of mines, ignore the count
+    weights = np.exp(log_weights - log_weights.max())
+
+    # the distribution of every component but one, from prefix and suffix products
+    prefix = [[1.0]]
+    for d in distributions:
+        prefix.append(convolve(prefix[-1], d))
+    suffix = [[1.0]]
+    for d in reversed(distributions):
+        suffix.append(convolve(suffix[-1], d))
+    suffix.reverse()
+
+    for index, (cells, solutions, mines) in enumerate(exact):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        others = np.array(convolve(prefix[index], suffix[index + 1]))
+        # the weight of every number of mines k in this component, summed over the other components
+        weight_k = np.array([np.dot(others, weights[k:k + others.size]) for k in range(len(solutions))])
+        weighted = np.array(solutions, dtype=float) * weight_k
+        total = weighted.sum()
+        if total <= 0:
+            cells_p = np.array(mines, dtype=float).sum(axis=0) / max(1, sum(solutions))
+        else:
+            cells_p = (np.array(mines, dtype=float) * weight_k[:, None]).sum(axis=0) / total
+        probabilities[list(cells)] = cells_p
+
+    if n_outside:
+        everything = np.array(prefix[-1])
+        total_weight = everything * weights[:everything.size]
+        if total_weight.sum() > 0:
+            expected = np.dot(total_weight, remaining - np.arange(everything.size)) / total_weight.sum()
+        else:
+            expected = remaining - sum(float(np.dot(np.arange(d.size), d) / d.sum()) for d in distributions)
+        probabilities[outside] = min(1.0, max(0.0, expected / n_outside))
+    return probabilities.reshape(w, h)
+
+
+# the worker processes shared by every heatmap of the process, started on the first large component
+COMPONENT_POOL = ComponentPool()
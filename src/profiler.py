@@ -0,0 +1,207 @@
+import functools
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+# the latencies are kept in logarithmic buckets, BUCKETS_PER_OCTAVE per doubling of the value
+BUCKETS_PER_OCTAVE = 8
+
+
+class Histogram:
+    def __init__(self, unit) -> None:
+        """
+        a histogram of positive values in logarithmic buckets, its memory does not grow with the number of values
+        :param unit: the unit of the values, such as "ms" or "cells"
+        """
+        self.unit = unit
+        self.buckets: dict = {}
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, value) -> None:
+        """
+        add a value
+        :param value: the value
+        :return: None
+        """
+        bucket = math.floor(math.log2(value) * BUCKETS_PER_OCTAVE) if value > 0 else None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent) -> float:
+        """
+        get a percentile, as the upper bound of its bucket
+        :param percent: the percentage, between 0 and 100
+        :return: the value, 0 if the histogram is empty
+        """
+        rank = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets, key=lambda b: -math.inf if b is None else b):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return 0.0 if bucket is None else min(self.max, 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE))
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        summarize the histogram
+        :return: the summary, with the buckets as {lower bound: count}
+        """
+        return {"unit": self.unit, "count": self.count, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99), "max": self.max,
+                "buckets": {("0" if bucket is None else f"{2 ** (bucket / BUCKETS_PER_OCTAVE):.6g}"): count
+                            for bucket, count in self.buckets.items()}}
+
+
+class Timer:
+    def __init__(self, histogram) -> None:
+        """
+        measure the time of a block into a histogram, in milliseconds
+        :param histogram: the histogram
+        """
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.add((time.perf_counter() - self.start) * 1000)
+
+
+class NoTimer:
+    # the timer used while the profiler is disabled, it measures nothing
+    def __enter__(self) -> "NoTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+NO_TIMER = NoTimer()
+
+
+class Profiler:
+    def __init__(self, enabled=False) -> None:
+        """
+        collect the latency histograms of the hot paths of the game
+        while disabled, a profiled call only costs one attribute check
+        :param enabled: collect from the start
+        """
+        self.enabled: bool = enabled
+        self.histograms: dict = {}
+
+    def histogram(self, name, unit="ms") -> Histogram:
+        """
+        get a histogram, it is created on the first use
+        :param name: the name of the histogram
+        :param unit: the unit of its values
+        :return: the histogram
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(unit)
+        return histogram
+
+    def observe(self, name, value, unit="ms") -> None:
+        """
+        add a value to a histogram, if the profiler is enabled
+        :param name: the name of the histogram
+        :param value: the value
+        :param unit: the unit of the values
+        :return: None
+        """
+        if self.enabled:
+            self.histogram(name, unit).add(value)
+
+    def timer(self, name):
+        """
+        measure the time of a with block
+        :param name: the name of the histogram
+        :return: the context manager
+        """
+        return Timer(self.histogram(name)) if self.enabled else NO_TIMER
+
+    def profiled(self, name):
+        """
+        decorate a function to measure the time of its calls
+        :param name: the name of the histogram
+        :return: the decorator
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.histogram(name).add((time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        """
+        forget every value
+        :return: None
+        """
+        self.histograms.clear()
+
+    def summary(self) -> dict:
+        """
+        summarize every histogram
+        :return: {name: summary}
+        """
+        return {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path=None) -> str:
+        """
+        save the histograms as JSON, to compare builds offline
+        :param path: the path of the file, named after the current time if not given
+        :return: the path of the file
+        """
+        path = path or time.strftime("profile-%Y%m%d-%H%M%S.json")
+        data = {"created_at": time.time(), "python": sys.version.split()[0], "platform": platform.platform(),
+                "histograms": self.summary()}
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+        return path
+
+
+# the profiler shared by the whole game, set MINESWEEPER_PROFILE=1 to collect from the start
+PROFILER = Profiler(os.environ.get("MINESWEEPER_PROFILE", "") not in ("", "0"))
+
+
+def compare(before, after) -> None:
+    """
+    print the p50 and p99 of two profile dumps side by side
+    :param before: the path of the first dump
+    :param after: the path of the second dump
+    :return: None
+    """
+    with open(before) as file:
+        old = json.load(file)["histograms"]
+    with open(after) as file:
+        new = json.load(file)["histograms"]
+    print(f"{'':28}{'p50 before':>12}{'p50 after':>12}{'p99 before':>12}{'p99 after':>12}")
+    for name in sorted(set(old) | set(new)):
+        a, b = old.get(name, {}), new.get(name, {})
+        unit = (a or b)["unit"]
+        cells = [f"{h[key]:.3g} {unit}" if h else "-" for key in ("p50",) for h in (a, b)] + \
+                [f"{h[key]:.3g} {unit}" if h else "-" for key in ("p99",) for h in (a, b)]
+        print(f"{name:28}" + "".join(f"{cell:>12}" for cell in cells))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m src.profiler BEFORE.json AFTER.json")
+    compare(sys.argv[1], sys.argv[2])
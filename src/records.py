@@ -0,0 +1,223 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+from src.metrics import bbbv_per_second
+
+# the statements are constant strings, so sqlite3 prepares each of them once and reuses it from its cache
+CREATE_GAMES = "CREATE TABLE IF NOT EXISTS games (" \
+               "id INTEGER PRIMARY KEY, level TEXT NOT NULL, time INTEGER NOT NULL, played_at REAL NOT NULL)"
+CREATE_INDEX = "CREATE INDEX IF NOT EXISTS games_level_time ON games (level, time)"
+INSERT_GAME = "INSERT INTO games (level, time, played_at, bbbv, openings, isolated, islands, bbbv_per_s) " \
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+SELECT_BEST = "SELECT MIN(time) FROM games WHERE level = ?"
+SELECT_TOP = "SELECT time, played_at FROM games WHERE level = ? ORDER BY time LIMIT ?"
+
+# the difficulty of the board of every game (see src/metrics.py), empty for the games recorded before them;
+# the efficiency index answers the rankings by 3BV per second like the time index answers the rankings by time
+METRIC_COLUMNS = (("bbbv", "INTEGER"), ("openings", "INTEGER"), ("isolated", "INTEGER"), ("islands", "INTEGER"),
+                  ("bbbv_per_s", "REAL"))
+CREATE_EFFICIENCY_INDEX = "CREATE INDEX IF NOT EXISTS games_level_efficiency ON games (level, bbbv_per_s)"
+SELECT_BEST_EFFICIENCY = "SELECT bbbv_per_s, bbbv, time FROM games " \
+                         "WHERE level = ? AND bbbv_per_s IS NOT NULL ORDER BY bbbv_per_s DESC LIMIT 1"
+SELECT_TOP_EFFICIENCY = "SELECT bbbv_per_s, bbbv, time, played_at FROM games " \
+                        "WHERE level = ? AND bbbv_per_s IS NOT NULL ORDER BY bbbv_per_s DESC LIMIT ?"
+
+# times are whole seconds, so the number of games per level and time stays small whatever the number of games,
+# and the percentile queries read this table instead of counting the games
+CREATE_COUNTS = "CREATE TABLE IF NOT EXISTS time_counts (" \
+                "level TEXT NOT NULL, time INTEGER NOT NULL, games INTEGER NOT NULL, PRIMARY KEY (level, time))"
+FILL_COUNTS = "INSERT INTO time_counts (level, time, games) SELECT level, time, COUNT(*) FROM games " \
+              "WHERE NOT EXISTS (SELECT 1 FROM time_counts) GROUP BY level, time"
+COUNT_GAME = "INSERT INTO time_counts (level, time, games) VALUES (?, ?, 1) " \
+             "ON CONFLICT (level, time) DO UPDATE SET games = games + 1"
+COUNT_GAMES = "SELECT COALESCE(SUM(games), 0) FROM time_counts WHERE level = ?"
+COUNT_FASTER = "SELECT COALESCE(SUM(games), 0) FROM time_counts WHERE level = ? AND time < ?"
+SELECT_COUNTS = "SELECT time, games FROM time_counts WHERE level = ? ORDER BY time"
+
+
+class RecordStore:
+    # the store shared by every game of the process
+    _shared = None
+
+    def __init__(self, path="records.db") -> None:
+        """
+        open the records database, every finished game is kept in the games table
+        :param path: the path of the database
+        """
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(CREATE_GAMES)
+            self.conn.execute(CREATE_INDEX)
+            self.conn.execute(CREATE_COUNTS)
+            self.migrate()
+            self.conn.execute(CREATE_EFFICIENCY_INDEX)
+            self.conn.execute(FILL_COUNTS)
+            self.conn.commit()
+
+        # the games are written by a background thread, so that the Tk thread never waits for the disk
+        self.queue: queue.Queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="records-writer", daemon=True)
+        self.writer.start()
+
+    @classmethod
+    def shared(cls) -> "RecordStore":
+        """
+        get the store shared by the whole process, it is opened on the first call
+        :return: the store
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+            atexit.register(cls._shared.close)
+        return cls._shared
+
+    def migrate(self) -> None:
+        """
+        add the metric columns to a games table created before them, and move the best times of the old
+        one-row-per-level records table into the games table
+        :return: None
+        """
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(games)")}
+        for name, kind in METRIC_COLUMNS:
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE games ADD COLUMN {name} {kind}")
+        old = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'records'").fetchone()
+        if old is not None:
+            self.conn.execute("INSERT INTO games (level, time, played_at) SELECT level, time, 0 FROM records")
+            self.conn.execute("DROP TABLE records")
+
+    def add(self, level, elapsed_time, metrics=None) -> None:
+        """
+        record a finished game, the game is written in the background
+        :param level: the level
+        :param elapsed_time: the time of the game in seconds
+        :param metrics: the metrics of the board, from board_metrics, the 3BV per second is computed from them
+        :return: None
+        """
+        row = (level, int(elapsed_time), time.time())
+        if metrics is None:
+            self.queue.put(row + (None,) * len(METRIC_COLUMNS))
+        else:
+            self.queue.put(row + (metrics["bbbv"], metrics["openings"], metrics["isolated"], metrics["islands"],
+                                  bbbv_per_second(metrics["bbbv"], elapsed_time)))
+
+    def write_loop(self) -> None:
+        """
+        write the queued games, everything queued meanwhile is written in the same transaction
+        :return: None
+        """
+        while True:
+            rows = [self.queue.get()]
+            while not self.queue.empty():
+                rows.append(self.queue.get_nowait())
+            games = [row for row in rows if row is not None]
+            if games:
+                with self.lock:
+                    with self.conn:
+                        self.conn.executemany(INSERT_GAME, games)
+                        self.conn.executemany(COUNT_GAME, [game[:2] for game in games])
+            for _ in rows:
+                self.queue.task_done()
+            if None in rows:
+                return None
+
+    def flush(self) -> None:
+        """
+        wait until every queued game is written
+        :return: None
+        """
+        self.queue.join()
+
+    def close(self) -> None:
+        """
+        write the queued games and close the database
+        :return: None
+        """
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        with self.lock:
+            self.conn.close()
+
+    def query(self, sql, *params) -> list:
+        """
+        run a read query
+        :param sql: one of the statements of this module
+        :param params: the parameters of the statement
+        :return: the rows
+        """
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def best(self, level):
+        """
+        get the best time of a level
+        :param level: the level
+        :return: the best time in seconds, or None if no game was recorded
+        """
+        return self.query(SELECT_BEST, level)[0][0]
+
+    def top(self, level, n=10) -> list:
+        """
+        get the leaderboard of a level
+        :param level: the level
+        :param n: the number of games
+        :return: the list of (time, played_at) of the n fastest games
+        """
+        return self.query(SELECT_TOP, level, n)
+
+    def best_efficiency(self, level):
+        """
+        get the most efficient game of a level
+        :param level: the level
+        :return: (3BV per second, 3BV, time) of the game, or None if no game with metrics was recorded
+        """
+        rows = self.query(SELECT_BEST_EFFICIENCY, level)
+        return rows[0] if rows else None
+
+    def top_efficiency(self, level, n=10) -> list:
+        """
+        get the leaderboard of a level by efficiency
+        :param level: the level
+        :param n: the number of games
+        :return: the list of (3BV per second, 3BV, time, played_at) of the n most efficient games
+        """
+        return self.query(SELECT_TOP_EFFICIENCY, level, n)
+
+    def count(self, level) -> int:
+        """
+        get the number of recorded games of a level
+        :param level: the level
+        :return: the number of games
+        """
+        return self.query(COUNT_GAMES, level)[0][0]
+
+    def percentile(self, level, elapsed_time) -> float:
+        """
+        get the percentage of recorded games of a level which were faster than a time
+        :param level: the level
+        :param elapsed_time: the time in seconds
+        :return: the percentage, 0 if no game was recorded
+        """
+        total = self.count(level)
+        return 100 * self.query(COUNT_FASTER, level, elapsed_time)[0][0] / total if total else 0.0
+
+    def time_at_percentile(self, level, percent):
+        """
+        get the time below which a percentage of the recorded games of a level are
+        :param level: the level
+        :param percent: the percentage, between 0 and 100
+        :return: the time in seconds, or None if no game was recorded
+        """
+        counts = self.query(SELECT_COUNTS, level)
+        rank = int(sum(games for _, games in counts) * percent / 100)
+        for elapsed_time, games in counts:
+            rank -= games
+            if rank < 0:
+                return elapsed_time
+        return counts[-1][0] if counts else None
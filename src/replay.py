@@ -0,0 +1,250 @@
+import os
+import queue
+import re
+import struct
+import threading
+import time
+
+import numpy as np
+
+from src.board import Board
+from src.topology import level_topology
+
+# the actions of the events
+REVEAL, FLAG = 0, 1
+
+# file header: magic, version, width, height, number of mines, start time, length of the level name
+MAGIC = b"MSRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBIIIdH")
+
+# the folder the games are recorded in
+REPLAY_FOLDER = "replays"
+
+
+def encode_varint(value, out) -> None:
+    """
+    append an unsigned integer to a bytearray, 7 bits per byte, the high bit tells that more bytes follow
+    :param value: the integer
+    :param out: the bytearray
+    :return: None
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(data) -> np.ndarray:
+    """
+    decode a whole buffer of varints at once
+    :param data: the bytes, made of complete varints only
+    :return: the decoded integers
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(raw.size) - np.repeat(starts, ends - starts + 1)
+    values = (raw & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(values, starts)
+
+
+def replay_path(level, folder=REPLAY_FOLDER) -> str:
+    """
+    get a new replay file name for a level
+    :param level: the name of the level
+    :param folder: the folder of the replays
+    :return: the path of the file
+    """
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    return os.path.join(folder, f"{re.sub(r'[^0-9A-Za-z]+', '_', level)}-{stamp}-{int(now * 1000) % 1000:03}.msr")
+
+
+class ReplayWriter:
+    def __init__(self, path) -> None:
+        """
+        record a game as a compact event log
+        the events are queued and written by a background thread, so recording never waits for the disk
+        nothing is written if the game never starts
+        :param path: the path of the replay file
+        """
+        self.path = path
+        self.queue: queue.Queue = queue.Queue()
+        self.last = time.perf_counter()
+        self.thread = threading.Thread(target=self.write_loop, name="replay-writer", daemon=True)
+        self.thread.start()
+
+    def start(self, board: Board, level) -> None:
+        """
+        write the header, once the mines are placed
+        :param board: the board of the game
+        :param level: the name of the level
+        :return: None
+        """
+        self.queue.put(("start", board.width, board.height, board.num_of_mines, level, np.packbits(board.mines)))
+
+    def record(self, i, j, action) -> None:
+        """
+        record an event
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param action: REVEAL or FLAG
+        :return: None
+        """
+        now = time.perf_counter()
+        self.queue.put(("event", i, j, action, int((now - self.last) * 1000)))
+        self.last = now
+
+    def close(self, wait=False) -> None:
+        """
+        write the remaining events and close the file
+        :param wait: wait until the file is closed, otherwise it is closed in the background
+        :return: None
+        """
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+
+    def write_loop(self) -> None:
+        """
+        encode the queued items: events are kept until the header is written, then appended as
+        varint((zigzag(cell - previous cell) << 1) | action) followed by varint(milliseconds since the previous event)
+        :return: None
+        """
+        file, height, previous, pending = None, 0, 0, []
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return None
+                if item[0] == "start":
+                    _, width, height, num_of_mines, level, mines = item
+                    name = level.encode()
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    file = open(self.path, "wb")
+                    file.write(HEADER.pack(MAGIC, VERSION, width, height, num_of_mines, time.time(), len(name)))
+                    file.write(name)
+                    file.write(mines.tobytes())
+                else:
+                    pending.append(item)
+                if file is None:
+                    continue
+                out = bytearray()
+                for _, i, j, action, delay in pending:
+                    cell = i * height + j
+                    delta = cell - previous
+                    encode_varint((((delta << 1) ^ (delta >> 63)) << 1) | action, out)
+                    encode_varint(delay, out)
+                    previous = cell
+                pending.clear()
+                file.write(out)
+                file.flush()
+        finally:
+            if file is not None:
+                file.close()
+
+
+class Replay:
+    def __init__(self, width, height, num_of_mines, level, started_at, mines, cells, actions, times) -> None:
+        """
+        a decoded replay
+        :param width: the width of the board
+        :param height: the height of the board
+        :param num_of_mines: the number of mines
+        :param level: the name of the level
+        :param started_at: the wall clock time of the first click
+        :param mines: the boolean grid of mines
+        :param cells: the flat index i * height + j of every event
+        :param actions: the action of every event
+        :param times: the time of every event in milliseconds, from when the game was shown
+        """
+        self.width = width
+        self.height = height
+        self.num_of_mines = num_of_mines
+        self.level = level
+        self.started_at = started_at
+        self.mines = mines
+        self.cells = cells
+        self.actions = actions
+        self.times = times
+
+    def events(self):
+        """
+        iterate over the events
+        :return: a generator of (i, j, action, time of the event in milliseconds)
+        """
+        for cell, action, at in zip(self.cells.tolist(), self.actions.tolist(), self.times.tolist()):
+            yield cell // self.height, cell % self.height, action, at
+
+    def final_board(self, upto=None) -> Board:
+        """
+        jump to the state of the board after the events, without any delay
+        :param upto: the number of events to play, all of them if not given
+        :return: the board
+        """
+        board = Board(self.width, self.height, self.num_of_mines, level_topology(self.level))
+        board.place_mines(self.mines)
+        for i, j, action, _ in list(self.events())[:upto]:
+            if action == REVEAL:
+                board.reveal(i, j)
+            else:
+                board.toggle_flag(i, j)
+            if board.lost:
+                break
+        return board
+
+
+def read_replay(path, header_only=False) -> Replay:
+    """
+    read a replay file
+    :param path: the path of the file
+    :param header_only: skip the mines and the events, to scan many files quickly
+    :return: the replay
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, width, height, num_of_mines, started_at, name_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a replay file")
+    offset = HEADER.size + name_length
+    level = data[HEADER.size:offset].decode()
+    if header_only:
+        return Replay(width, height, num_of_mines, level, started_at, None, None, None, None)
+    size = (width * height + 7) // 8
+    mines = np.unpackbits(np.frombuffer(data, np.uint8, size, offset), count=width * height)
+    values = decode_varints(data[offset + size:])
+    keys, delays = values[0:values.size - values.size % 2:2], values[1::2]
+    zigzag = keys >> 1
+    cells = np.cumsum((zigzag >> 1) ^ -(zigzag & 1))
+    return Replay(width, height, num_of_mines, level, started_at, mines.reshape(width, height).astype(bool),
+                  cells, (keys & 1).astype(np.uint8), np.cumsum(delays))
+
+
+def summarize(path) -> dict:
+    """
+    summarize a replay: its level, its number of events, its duration and whether it was won
+    :param path: the path of the file
+    :return: the summary
+    """
+    replay = read_replay(path)
+    board = replay.final_board()
+    return {"path": path, "level": replay.level, "started_at": replay.started_at, "events": int(replay.cells.size),
+            "seconds": float(replay.times[-1] - replay.times[0]) / 1000 if replay.times.size else 0.0,
+            "won": board.won}
+
+
+def scan_replays(folder=REPLAY_FOLDER, workers=None):
+    """
+    summarize every replay of a folder, the files are spread over a process pool
+    :param folder: the folder of the replays
+    :param workers: the number of processes, every core if not given
+    :return: a generator of summaries, in no particular order
+    """
+    from multiprocessing import Pool
+
+    paths = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".msr")]
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(summarize, paths, chunksize=64)
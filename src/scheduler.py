@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+
+from src.profiler import PROFILER
+
+# the milliseconds given to the queued updates per frame, and between the start of two frames
+FRAME_BUDGET = 8
+FRAME_INTERVAL = 16
+
+# the number of updates run between two looks at the clock
+CHECK_EVERY = 64
+
+
+class UIScheduler:
+    def __init__(self, widget, budget=FRAME_BUDGET, interval=FRAME_INTERVAL) -> None:
+        """
+        run bulk widget updates in slices on the Tk event loop, so that the clicks and the timer are handled between
+        two slices; each slice runs updates until its budget is spent
+        the updates are keyed by what they change: an update of a cell which is still queued is merged into the
+        queued one, so a cell is drawn once per slice whatever the number of updates it got
+        an update can name a histogram of the profiler, which gets the time its updates took in every slice
+        :param widget: the widget whose after method schedules the slices
+        :param budget: the milliseconds of updates per slice
+        :param interval: the milliseconds between the start of two slices
+        """
+        self.widget = widget
+        self.budget: float = budget / 1000
+        self.interval: int = interval
+        # key -> (function, positional arguments, keyword options, histogram), run in the order of their first
+        # submission
+        self.pending: OrderedDict = OrderedDict()
+        self.job = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def submit(self, key, function, *args, profile=None, **options) -> None:
+        """
+        queue an update, the options of a queued update of the same key and function are merged, the later win
+        :param key: what the update changes, for example the (i, j) of a cell
+        :param function: the function doing the update
+        :param args: its positional arguments
+        :param profile: the histogram of the profiler which gets the time of the update, None to not time it
+        :param options: its keyword arguments
+        :return: None
+        """
+        queued = self.pending.get(key)
+        if queued is not None and queued[0] == function and queued[1] == args:
+            queued[2].update(options)
+            options = queued[2]
+        self.pending[key] = (function, args, options, profile)
+        if self.job is None:
+            self.job = self.widget.after_idle(self.run)  # the first slice runs as soon as the window is idle
+
+    def update_cell(self, view, i, j, profile=None, **options) -> None:
+        """
+        queue a change of how a cell looks
+        :param view: the board view
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param profile: the histogram of the profiler which gets the time of the change, None to not time it
+        :param options: the options of the cell, such as text and bg
+        :return: None
+        """
+        self.submit((i, j), view.update_cell, i, j, profile=profile, **options)
+
+    def update_now(self, view, i, j, **options) -> None:
+        """
+        change how a cell looks at once, after the update of the cell still queued, so that it can not undo this one
+        :param view: the board view
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param options: the options of the cell, such as text and bg
+        :return: None
+        """
+        queued = self.pending.pop((i, j), None)
+        if queued is not None:
+            options = {**queued[2], **options}
+        view.update_cell(i, j, **options)
+
+    def run(self) -> None:
+        """
+        run the queued updates for at most a budget, and schedule the next slice if some are left
+        :return: None
+        """
+        self.job = None
+        deadline = time.perf_counter() + self.budget
+        done = 0
+        spent: dict = {}
+        while self.pending:
+            self.run_update(self.pending.popitem(last=False)[1], spent)
+            done += 1
+            if done % CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+                break
+        PROFILER.observe("scheduler.slice", done, "updates")
+        for profile, seconds in spent.items():
+            PROFILER.observe(profile, seconds * 1000)
+        if self.pending:
+            self.job = self.widget.after(self.interval, self.run)
+
+    def flush(self) -> None:
+        """
+        run every queued update now
+        :return: None
+        """
+        self.cancel_job()
+        spent: dict = {}
+        while self.pending:
+            self.run_update(self.pending.popitem(last=False)[1], spent)
+        for profile, seconds in spent.items():
+            PROFILER.observe(profile, seconds * 1000)
+
+    @staticmethod
+    def run_update(update, spent) -> None:
+        """
+        run a queued update, and add its time to the seconds spent on its histogram while the profiler is enabled
+        :param update: (function, positional arguments, keyword options, histogram)
+        :param spent: the seconds spent on every histogram, updated in place
+        :return: None
+        """
+        function, args, options, profile = update
+        if profile is None or not PROFILER.enabled:
+            function(*args, **options)
+            return None
+        start = time.perf_counter()
+        function(*args, **options)
+        spent[profile] = spent.get(profile, 0.0) + time.perf_counter() - start
+
+    def cancel(self) -> None:
+        """
+        drop the queued updates, for example when the cells are reset for a new game
+        :return: None
+        """
+        self.pending.clear()
+        self.cancel_job()
+
+    def cancel_job(self) -> None:
+        """
+        stop the scheduled slice
+        :return: None
+        """
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
@@ -1,34 +1,58 @@
 import tkinter as tk
+import tkinter.simpledialog
 from src.baseInterface import BaseInterface
 from src.Minesweeper8UIdesign import MineSweeper
+from src.boardPool import POOL
+from src.endlessMineSweeper import EndlessMineSweeper
+from src.levels import LEVELS
+from src.topology import TOPOLOGIES, level_name
 
 
 class SelectLevel(BaseInterface):
-    def __init__(self):
+    def __init__(self, root=None):
         """
-        initialize the main window
+        initialize the level selection screen
+        :param root: the main window, created if not given
         """
-        super().__init__()
+        super().__init__(root)
 
-        tk.Label(self.root, text="Select the level",
+        tk.Label(self.screen, text="Select the level",
                  height=5, font=("Lucida Handwriting", 20), bg="light blue").pack(fill=tk.BOTH, expand=1)
 
-        self.frame: tk.Frame = super().create_frame(self.root, 3, 2)
+        self.frame: tk.Frame = super().create_frame(self.screen, 5, 2)
 
         self.buttons = [
             tk.Button(self.frame, text="Beginner", font=("Lucida Handwriting", 15), command=self.beginner),
             tk.Button(self.frame, text="Intermediate", font=("Lucida Handwriting", 15), command=self.intermediate),
-            tk.Button(self.frame, text="Expert", font=("Lucida Handwriting", 15), command=self.expert)
+            tk.Button(self.frame, text="Expert", font=("Lucida Handwriting", 15), command=self.expert),
+            tk.Button(self.frame, text="Custom", font=("Lucida Handwriting", 15), command=self.custom),
+            tk.Button(self.frame, text="Endless", font=("Lucida Handwriting", 15), command=self.endless)
         ]
 
         self.labels = [
-            tk.Label(self.frame, text="8*8, 10 mines", height=3, font="bold"),
-            tk.Label(self.frame, text="16*16, 40 mines", height=3, font="bold"),
-            tk.Label(self.frame, text="24*24, 99 mines", height=3, font="bold")
+            *(tk.Label(self.frame, text=f"{width}*{height}, {num_of_mines} mines", height=3, font="bold")
+              for width, height, num_of_mines in LEVELS.values()),
+            tk.Label(self.frame, text="up to 1000*1000", height=3, font="bold"),
+            tk.Label(self.frame, text="no border", height=3, font="bold")
         ]
 
         self.place_buttons_labels()
 
+        # no-guess boards are prepared in the background as soon as the option is chosen
+        self.no_guess = tk.BooleanVar(self.root, value=False)
+        tk.Checkbutton(self.screen, text="No guess boards", variable=self.no_guess, font=("Lucida Handwriting", 12),
+                       command=self.prepare_no_guess).pack(pady=5)
+
+        # a practice game lets the player undo a mine hit, it is not recorded
+        self.practice = tk.BooleanVar(self.root, value=False)
+        tk.Checkbutton(self.screen, text="Practice", variable=self.practice,
+                       font=("Lucida Handwriting", 12)).pack(pady=5)
+
+        # the neighbors of a cell: the 8 cells around it, the same on a board wrapping around its edges, the 6 cells
+        # of a hexagonal board, or the cells a knight reaches
+        self.topology = tk.StringVar(self.root, value="square")
+        tk.OptionMenu(self.screen, self.topology, *TOPOLOGIES).pack(pady=5)
+
         self.root.update()
         super().center_window(self.root)
 
@@ -37,34 +61,79 @@ class SelectLevel(BaseInterface):
         start the beginner level game
         :return: None
         """
-        self.root.destroy()
-        MineSweeper(8, 8, 10, "beginner", self.call).root.mainloop()
+        self.play(*LEVELS["beginner"], "beginner")
 
     def intermediate(self) -> None:
         """
         start the intermediate level game
         :return: None
         """
-        self.root.destroy()
-        MineSweeper(16, 16, 40, "intermediate", self.call).root.mainloop()
+        self.play(*LEVELS["intermediate"], "intermediate")
 
     def expert(self) -> None:
         """
         start the expert level game
         :return: None
         """
-        self.root.destroy()
-        MineSweeper(24, 24, 99, "expert", self.call).root.mainloop()
+        self.play(*LEVELS["expert"], "expert")
+
+    def custom(self) -> None:
+        """
+        ask for the size of the board and the number of mines, then start the game
+        :return: None
+        """
+        ask = tkinter.simpledialog.askinteger
+        width = ask("Custom", "Width of the board", parent=self.root, minvalue=2, maxvalue=1000)
+        if width is None:
+            return None
+        height = ask("Custom", "Height of the board", parent=self.root, minvalue=2, maxvalue=1000)
+        if height is None:
+            return None
+        num_of_mines = ask("Custom", "Number of mines", parent=self.root, minvalue=1, maxvalue=width * height - 1)
+        if num_of_mines is None:
+            return None
+        self.play(width, height, num_of_mines, f"custom {width}*{height} {num_of_mines}")
+
+    def play(self, width, height, num_of_mines, level) -> None:
+        """
+        start a game with the chosen options, a game on another topology than the square one has its own records
+        :param width: the width of the board
+        :param height: the height of the board
+        :param num_of_mines: the number of mines
+        :param level: the name of the level
+        :return: None
+        """
+        no_guess, practice = self.no_guess.get(), self.practice.get()
+        topology = TOPOLOGIES[self.topology.get()]
+        self.close()
+        MineSweeper(width, height, num_of_mines, level_name(level, topology), self.call, root=self.root,
+                    no_guess=no_guess, practice=practice, topology=topology)
+
+    def endless(self) -> None:
+        """
+        start an endless game
+        :return: None
+        """
+        self.close()
+        EndlessMineSweeper(self.call, root=self.root)
+
+    def prepare_no_guess(self) -> None:
+        """
+        start filling the pool of no-guess boards of the preset levels
+        :return: None
+        """
+        if self.no_guess.get():
+            POOL.start(LEVELS.values())
 
     def place_buttons_labels(self) -> None:
         """
         place the buttons and labels
         :return: None
         """
-        for i in range(3):
+        for i in range(len(self.buttons)):
             self.buttons[i].grid(row=0, column=i, sticky=tk.NSEW)  # sticky=tk.NSEW makes the buttons expand
             self.labels[i].grid(row=1, column=i, sticky=tk.NSEW)
 
     @staticmethod
-    def call():
-        SelectLevel().root.mainloop()  # can't use self.root.mainloop() here as self.root is destroyed
+    def call(root):
+        SelectLevel(root)  # the main window is kept, only the screen changes
@@ -0,0 +1,155 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from src.board import Board
+from src.topology import level_topology
+
+# file header: magic, version, width, height, number of mines, elapsed time, length of the level name
+# the header is followed by the level name and the mine, revealed and flag bitmaps, one bit per cell
+MAGIC = b"MSSV"
+VERSION = 1
+HEADER = struct.Struct("<4sBIIIdH")
+
+# the file the unfinished game is saved in
+SAVE_PATH = "savegame.mss"
+
+
+class Snapshot:
+    def __init__(self, level, elapsed_time, board: Board) -> None:
+        """
+        a saved game
+        :param level: the name of the level
+        :param elapsed_time: the time played before the game was saved, in seconds
+        :param board: the restored board
+        """
+        self.width = board.width
+        self.height = board.height
+        self.num_of_mines = board.num_of_mines
+        self.level = level
+        self.elapsed_time = elapsed_time
+        self.board = board
+
+
+def pack_snapshot(board: Board, level, elapsed_time) -> bytes:
+    """
+    serialize a game, a 1000*1000 board takes about 375 KB
+    :param board: the board of the game
+    :param level: the name of the level
+    :param elapsed_time: the time played, in seconds
+    :return: the bytes of the snapshot
+    """
+    name = level.encode()
+    header = HEADER.pack(MAGIC, VERSION, board.width, board.height, board.num_of_mines, elapsed_time, len(name))
+    return b"".join((header, name, np.packbits(board.mines).tobytes(), np.packbits(board.revealed).tobytes(),
+                     np.packbits(board.flagged).tobytes()))
+
+
+def save_snapshot(data, path=SAVE_PATH) -> None:
+    """
+    write a snapshot, the previous file is replaced at once so that a crash never leaves a half written save
+    :param data: the bytes of the snapshot
+    :param path: the path of the file
+    :return: None
+    """
+    with open(path + ".tmp", "wb") as file:
+        file.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def unpack_snapshot(data, name="the snapshot") -> Snapshot:
+    """
+    restore a game from the bytes of a snapshot, the bitmaps are unpacked straight from the buffer
+    :param data: the bytes of the snapshot, or any buffer such as a memory mapped file
+    :param name: the name of the snapshot in the error messages
+    :return: the snapshot
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"{name} is not a saved game")
+    magic, version, width, height, num_of_mines, elapsed_time, name_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{name} is not a saved game")
+    offset = HEADER.size + name_length
+    level = bytes(data[HEADER.size:offset]).decode()
+    n = width * height
+    size = (n + 7) // 8
+    if len(data) != offset + 3 * size:
+        raise ValueError(f"{name} is truncated")
+    bitmaps = np.frombuffer(data, np.uint8, 3 * size, offset).reshape(3, size)
+    board = Board(width, height, num_of_mines, level_topology(level))
+    board.place_mines(np.unpackbits(bitmaps[0], count=n).reshape(width, height).view(bool))
+    board.restore(np.unpackbits(bitmaps[1], count=n).reshape(width, height).view(bool),
+                  np.unpackbits(bitmaps[2], count=n).reshape(width, height).view(bool))
+    return Snapshot(level, elapsed_time, board)
+
+
+def load_snapshot(path=SAVE_PATH) -> Snapshot:
+    """
+    load a snapshot, the bitmaps are read straight from the memory mapped file and unpacked into the board
+    :param path: the path of the file
+    :return: the snapshot
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path} is not a saved game")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # the arrays pointing into the mapping are gone once unpack_snapshot returns, so it can be closed
+            return unpack_snapshot(data, path)
+
+
+class SnapshotWriter:
+    def __init__(self, path=SAVE_PATH) -> None:
+        """
+        save snapshots in the background, so that saving never delays the game or its timer
+        :param path: the path of the file
+        """
+        self.path = path
+        self.queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self.write_loop, name="snapshot-writer", daemon=True)
+        self.thread.start()
+
+    def save(self, data) -> None:
+        """
+        save a snapshot
+        :param data: the bytes of the snapshot, from pack_snapshot
+        :return: None
+        """
+        self.queue.put(data)
+
+    def delete(self) -> None:
+        """
+        delete the saved game, once the queued snapshots are handled
+        :return: None
+        """
+        self.queue.put(b"")
+
+    def close(self, wait=False) -> None:
+        """
+        write the queued snapshots and stop the writer
+        :param wait: wait until the last snapshot is written
+        :return: None
+        """
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+
+    def write_loop(self) -> None:
+        """
+        write the queued snapshots, only the latest one is written when several are waiting
+        :return: None
+        """
+        while True:
+            items = [self.queue.get()]
+            while not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            latest = [item for item in items if item is not None]
+            if latest and latest[-1]:
+                save_snapshot(latest[-1], self.path)
+            elif latest and os.path.exists(self.path):
+                os.remove(self.path)
+            if None in items:
+                return None
@@ -0,0 +1,311 @@
+import time
+
+import numpy as np
+
+from src.board import Board
+
+# the state of a cell as seen by the solver
+UNKNOWN, REVEALED, MINE = 0, 1, 2
+
+
+class Solver:
+    def __init__(self, board: Board, seed=None) -> None:
+        """
+        initialize the solver of a board, it only looks at what a player could see
+        :param board: the board to play
+        :param seed: the seed of the first click when the mines are not placed yet
+        """
+        self.board = board
+        self.seed = seed
+        w, h = board.width, board.height
+        # the neighbor lists come from the table of the topology, shared by every board of the same size
+        self.neighbors = board.neighbors.lists()
+        self.counts = None
+
+        # what the solver knows
+        self.state = bytearray(w * h)
+        self.known_mines = 0
+        self.safe_left = w * h - board.num_of_mines
+
+        # one constraint per revealed number with unknown neighbors: the unknown cells and how many of them are mines
+        self.unknown: dict = {}
+        self.need: dict = {}
+
+        # the constraints to check again, and the deductions not played yet
+        self.touched: set = set()
+        self.safe: set = set()
+        self.found_mines: list = []
+
+        # what the solver did: the clicked cells, the guesses, the size of every reveal and the time of every phase
+        self.moves = 0
+        self.guesses = 0
+        self.cascades: list = []
+        self.timings = dict.fromkeys(("generate", "reveal", "observe", "deduce", "guess"), 0.0)
+
+        if board.placed:
+            self.counts = board.counts.reshape(-1).tolist()
+            self.observe(np.flatnonzero(board.revealed).tolist())
+
+    def observe(self, cells) -> None:
+        """
+        learn the numbers of newly revealed cells and update the constraints around them
+        :param cells: the flat indices of the newly revealed cells
+        :return: None
+        """
+        state, unknown, need, touched, counts = self.state, self.unknown, self.need, self.touched, self.counts
+        neighbors, safe = self.neighbors, self.safe
+        numbers = []
+        for c in cells:
+            if state[c] == REVEALED:
+                continue
+            state[c] = REVEALED
+            self.safe_left -= 1
+            safe.discard(c)
+            if counts[c]:
+                numbers.append(c)
+            for v in neighbors[c]:
+                if v in unknown:
+                    unknown[v].discard(c)
+                    touched.add(v)
+        for c in numbers:
+            covered = [v for v in neighbors[c] if state[v] != REVEALED]
+            cells_around = {v for v in covered if state[v] == UNKNOWN}
+            if cells_around:
+                unknown[c] = cells_around
+                need[c] = counts[c] - len(covered) + len(cells_around)
+                touched.add(c)
+
+    def mark_mine(self, c) -> None:
+        """
+        remember that the cell c is a mine
+        :param c: the flat index of the cell
+        :return: None
+        """
+        if self.state[c] != UNKNOWN:
+            return None
+        self.state[c] = MINE
+        self.known_mines += 1
+        self.found_mines.append(c)
+        for v in self.neighbors[c]:
+            if v in self.unknown:
+                self.unknown[v].discard(c)
+                self.need[v] -= 1
+                self.touched.add(v)
+
+    def deduce(self) -> bool:
+        """
+        check the touched constraints, the deductions are collected so that they can be played in one batch
+        single cell rule: a number whose mines are all known has only safe cells left, and a number with as many
+        unknown cells as missing mines has only mines left
+        pairwise rule: for two numbers sharing cells, if the difference of their missing mines equals the number of
+        cells only the larger one sees, those cells are mines and the cells only the smaller one sees are safe
+        the pairwise rule is only tried when the single cell rule finds no safe cell
+        :return: True if new safe cells or mines were found
+        """
+        unknown, need, touched = self.unknown, self.need, self.touched
+        found = False
+        while touched:
+            stale = []
+            while touched:
+                c = touched.pop()
+                cells = unknown.get(c)
+                if cells is None:
+                    continue
+                if not cells:
+                    del unknown[c], need[c]
+                elif need[c] == 0:
+                    self.safe.update(cells)
+                elif need[c] == len(cells):
+                    for v in list(cells):
+                        self.mark_mine(v)
+                    found = True
+                else:
+                    stale.append(c)
+            if self.safe:
+                # play the easy deductions first, the other constraints are checked again next time
+                touched.update(stale)
+                break
+            for c in stale:
+                found = self.compare(c) or found
+        self.safe = {v for v in self.safe if self.state[v] == UNKNOWN}
+        return found or bool(self.safe)
+
+    def compare(self, c) -> bool:
+        """
+        apply the pairwise rule between the constraint of c and every other constraint sharing an unknown cell
+        :param c: the flat index of the revealed number
+        :return: True if new safe cells or mines were found
+        """
+        unknown, need = self.unknown, self.need
+        cells = unknown.get(c)
+        if not cells:
+            return False
+        r = need[c]
+        for d in {d for v in cells for d in self.neighbors[v] if d != c and d in unknown}:
+            other = unknown[d]
+            only_c, only_d = cells - other, other - cells
+            diff = need[d] - r
+            if diff == len(only_d) and (only_d or only_c):
+                new_mines, new_safe = only_d, only_c
+            elif -diff == len(only_c) and (only_c or only_d):
+                new_mines, new_safe = only_c, only_d
+            else:
+                continue
+            if new_mines or not new_safe <= self.safe:
+                self.safe.update(new_safe)
+                for v in list(new_mines):
+                    self.mark_mine(v)
+                self.touched.add(c)
+                return True
+        return False
+
+    def guess(self) -> int:
+        """
+        choose the unknown cell with the lowest estimated chance of being a mine
+        a frontier cell is as risky as its riskiest number, any other cell as risky as the remaining mine density
+        :return: the flat index of the cell
+        """
+        risk = {}
+        for c, cells in self.unknown.items():
+            if cells:
+                p = self.need[c] / len(cells)
+                for v in cells:
+                    if risk.get(v, -1.0) < p:
+                        risk[v] = p
+        best = min(risk, key=risk.get) if risk else None
+        outside = self.state.count(UNKNOWN) - len(risk)
+        if outside:
+            remaining = self.board.num_of_mines - self.known_mines - sum(risk.values())
+            if best is None or max(0.0, remaining) / outside < risk[best]:
+                return next(c for c, state in enumerate(self.state) if state == UNKNOWN and c not in risk)
+        return best
+
+    def next_move(self) -> tuple:
+        """
+        get the next move without playing it: a deduced mine to flag, a deduced safe cell, or the safest guess
+        :return: ("flag" or "reveal", i, j, is_guess)
+        """
+        h = self.board.height
+        if self.counts is None:
+            return "reveal", self.board.width // 2, h // 2, False
+        if not self.found_mines and not self.safe:
+            self.deduce()
+        if self.found_mines:
+            c = self.found_mines[-1]
+            return "flag", c // h, c % h, False
+        if self.safe:
+            c = next(iter(self.safe))
+            return "reveal", c // h, c % h, False
+        c = self.guess()
+        return "reveal", c // h, c % h, True
+
+    def play(self, action, i, j) -> bool:
+        """
+        play a move returned by next_move
+        :param action: "flag" or "reveal"
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: False if a mine was hit
+        """
+        c = i * self.board.height + j
+        if action == "flag":
+            if c in self.found_mines:
+                self.found_mines.remove(c)
+            if not self.board.flagged[i, j]:
+                self.board.toggle_flag(i, j)
+            return True
+        if self.counts is None:
+            self.first_click(i, j)
+            return not self.board.lost
+        return self.open([c])
+
+    def open(self, cells) -> bool:
+        """
+        reveal cells on the board and learn what they show
+        :param cells: the flat indices of the cells
+        :return: False if a mine was hit
+        """
+        h = self.board.height
+        start = time.perf_counter()
+        cells = np.fromiter(cells, dtype=np.intp)
+        xs, ys = self.board.reveal_many(cells // h, cells % h)
+        revealed = time.perf_counter()
+        self.timings["reveal"] += revealed - start
+        self.moves += cells.size
+        self.cascades.append(xs.size)
+        if self.board.lost:
+            return False
+        self.observe((xs * h + ys).tolist())
+        self.timings["observe"] += time.perf_counter() - revealed
+        return True
+
+    def first_click(self, i, j, safe_zone=False) -> None:
+        """
+        place the mines, if it was not done yet, and reveal the first cell
+        :param i: the x coordinate of the first click
+        :param j: the y coordinate of the first click
+        :param safe_zone: keep the first click and its neighbors free of mines
+        :return: None
+        """
+        if not self.board.placed:
+            start = time.perf_counter()
+            self.board.generate_mines(i, j, self.seed, safe_zone)
+            self.timings["generate"] += time.perf_counter() - start
+        self.counts = self.board.counts.reshape(-1).tolist()
+        self.open([i * self.board.height + j])
+
+    def solve(self, i_first_click=None, j_first_click=None, safe_zone=False, allow_guess=True) -> bool:
+        """
+        play the board to the end
+        :param i_first_click: the x coordinate of the first click, the center if not given
+        :param j_first_click: the y coordinate of the first click, the center if not given
+        :param safe_zone: keep the first click and its neighbors free of mines
+        :param allow_guess: guess when nothing can be deduced, otherwise give up
+        :return: True if every safe cell was revealed
+        """
+        if self.counts is None:
+            i = self.board.width // 2 if i_first_click is None else i_first_click
+            j = self.board.height // 2 if j_first_click is None else j_first_click
+            self.first_click(i, j, safe_zone)
+        timings = self.timings
+        while self.safe_left > 0 and not self.board.lost:
+            start = time.perf_counter()
+            self.deduce()
+            timings["deduce"] += time.perf_counter() - start
+            if self.safe:
+                safe, self.safe = self.safe, set()
+                self.open(safe)
+                continue
+            if not allow_guess:
+                return False
+            self.guesses += 1
+            safe_left = self.safe_left
+            start = time.perf_counter()
+            guess = self.guess()
+            timings["guess"] += time.perf_counter() - start
+            if self.open([guess]) and self.safe_left == safe_left:
+                return False  # the guess is flagged on the board, nothing can be revealed any more
+        for c in self.found_mines:
+            if not self.board.flagged.flat[c]:
+                self.board.toggle_flag(c // self.board.height, c % self.board.height)
+        self.found_mines.clear()
+        return not self.board.lost
+
+
+def play_games(width, height, num_of_mines, games, seed=None, safe_zone=False):
+    """
+    solve many random boards one after the other, BatchSolver plays them many times faster for long runs
+    :param width: the width of the boards
+    :param height: the height of the boards
+    :param num_of_mines: the number of mines
+    :param games: the number of games
+    :param seed: the seed of the whole run, every game gets its own seed from it
+    :param safe_zone: keep the first click and its neighbors free of mines
+    :return: a generator of (won, guesses, revealed safe cells, seconds) for every game
+    """
+    for game_seed in np.random.SeedSequence(seed).spawn(games):
+        start = time.perf_counter()
+        solver = Solver(Board(width, height, num_of_mines), game_seed)
+        won = solver.solve(safe_zone=safe_zone)
+        revealed = width * height - num_of_mines - solver.safe_left
+        yield won, solver.guesses, revealed, time.perf_counter() - start
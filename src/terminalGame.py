@@ -0,0 +1,472 @@
+"""
+play in a terminal with curses, without Tk: the same levels, topologies, records and replays as the window
+
+    python main.py --terminal
+    python main.py --terminal --level expert --topology hex
+
+arrows or hjkl move the cursor, space or enter reveals, f flags, n starts a new game, r shows the records and q goes
+back; a left click reveals and a right click flags where the terminal reports the mouse
+"""
+import curses
+import time
+
+import numpy as np
+import numpy.random  # numpy loads it on first use, the first click would wait for it
+
+from src.board import Board
+from src.levels import LEVELS
+from src.metrics import bbbv_per_second, board_metrics
+from src.records import RecordStore
+from src.replay import FLAG, REVEAL, ReplayWriter, replay_path
+from src.topology import HEX, SQUARE, TOPOLOGIES, level_name
+
+# the codes of the cells: the counts, then covered, flagged, mine and wrong flag; the cursor adds CURSOR to the code
+COVERED, FLAGGED, MINE, WRONG_FLAG = 9, 10, 11, 12
+GLYPHS = " 12345678#F*X"
+CURSOR = 16
+
+# the first line is the status, the board starts below it and the last line is the help
+BOARD_TOP = 2
+HELP = "arrows/hjkl move  space reveal  f flag  n new game  r records  q back"
+
+# the milliseconds to wait for a key before the timer is drawn again
+TICK = 250
+
+MOVES = {curses.KEY_UP: (-1, 0), curses.KEY_DOWN: (1, 0), curses.KEY_LEFT: (0, -1), curses.KEY_RIGHT: (0, 1),
+         ord("k"): (-1, 0), ord("j"): (1, 0), ord("h"): (0, -1), ord("l"): (0, 1)}
+REVEAL_KEYS = (ord(" "), ord("\n"), curses.KEY_ENTER)
+NUMBER_COLORS = {1: curses.COLOR_BLUE, 2: curses.COLOR_GREEN, 3: curses.COLOR_RED, 4: curses.COLOR_MAGENTA,
+                 5: curses.COLOR_YELLOW, 6: curses.COLOR_CYAN, 7: curses.COLOR_WHITE, 8: curses.COLOR_WHITE,
+                 FLAGGED: curses.COLOR_RED, MINE: curses.COLOR_RED, WRONG_FLAG: curses.COLOR_YELLOW}
+
+
+def init_styles() -> list:
+    """
+    create the color pairs of the cells, once curses is started
+    :return: the attribute of every cell code, plain text without colors
+    """
+    styles = [0] * len(GLYPHS)
+    if not curses.has_colors():
+        return styles
+    curses.start_color()
+    try:
+        curses.use_default_colors()
+        background = -1
+    except curses.error:
+        background = curses.COLOR_BLACK
+    for code, color in NUMBER_COLORS.items():
+        curses.init_pair(code, color, background)
+        styles[code] = curses.color_pair(code) | (curses.A_BOLD if code >= FLAGGED else 0)
+    return styles
+
+
+class TerminalGame:
+    def __init__(self, screen, width: int, height: int, num_of_mines: int, level: str, topology=SQUARE,
+                 styles=None, seed=None) -> None:
+        """
+        a game drawn in a curses window, row i of the board being the cells (i, j) as in the window of Tk
+        only the cells whose character changed since the last frame are written to the terminal
+        :param screen: the curses window
+        :param width: the width of the board
+        :param height: the height of the board
+        :param num_of_mines: the number of mines
+        :param level: the name of the level, used for the records and the replays
+        :param topology: the neighbors of the cells
+        :param styles: the attribute of every cell code, plain text if not given
+        :param seed: the seed of the mine positions, random if not given
+        """
+        self.screen = screen
+        self.width: int = width
+        self.height: int = height
+        self.num_of_mines: int = num_of_mines
+        self.level = level
+        self.topology = topology
+        self.styles = styles or [0] * len(GLYPHS)
+        self.seed = seed
+        # the odd rows of a hexagonal board are shifted by half a cell, that is one character
+        self.shifted = topology is HEX
+        self.cursor = [width // 2, height // 2]
+        self.origin = [0, 0]
+        self.recorder = None
+        self.screen.timeout(TICK)
+        self.new_game()
+
+    def new_game(self) -> None:
+        """
+        reset the game state and create a new board, the cells on the screen are drawn again by the next frame
+        :return: None
+        """
+        self.stop_recording()
+        self.board = Board(self.width, self.height, self.num_of_mines, self.topology)
+        self.first_click_done = False
+        self.over = False
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self.message = ""
+        self.recorder = ReplayWriter(replay_path(self.level))
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        forget what the screen shows, after a resize or when every cell moves: the next frame draws everything
+        :return: None
+        """
+        self.screen.erase()
+        self.drawn = None
+        self.status = None
+
+    def viewport(self) -> tuple:
+        """
+        get the number of rows and columns of cells which fit in the window
+        :return: (rows, columns)
+        """
+        lines, chars = self.screen.getmaxyx()
+        return max(1, lines - BOARD_TOP - 1), max(1, (chars - 1 - self.shifted) // 2)
+
+    def scroll(self, rows, columns) -> None:
+        """
+        move the visible part of the board so that the cursor stays in it
+        :param rows: the number of visible rows
+        :param columns: the number of visible columns
+        :return: None
+        """
+        previous = list(self.origin)
+        for axis, size, visible in ((0, self.width, rows), (1, self.height, columns)):
+            start = min(self.origin[axis], self.cursor[axis])
+            start = max(start, self.cursor[axis] - visible + 1)
+            self.origin[axis] = max(0, min(start, size - visible))
+        if self.shifted and (previous[0] - self.origin[0]) % 2:
+            self.invalidate()  # every row changes its shift
+
+    def codes(self, i0, i1, j0, j1) -> np.ndarray:
+        """
+        get the code of the cells of a part of the board
+        :param i0: the first row
+        :param i1: the row after the last one
+        :param j0: the first column
+        :param j1: the column after the last one
+        :return: the grid of codes
+        """
+        revealed = self.board.revealed[i0:i1, j0:j1]
+        flagged = self.board.flagged[i0:i1, j0:j1]
+        codes = np.where(revealed, self.board.counts[i0:i1, j0:j1], COVERED).astype(np.int8)
+        codes[flagged] = FLAGGED
+        mines = self.board.mines[i0:i1, j0:j1]
+        if self.over:
+            codes[mines & ~flagged] = MINE
+            codes[flagged & ~mines] = WRONG_FLAG
+        return codes
+
+    def render(self) -> int:
+        """
+        draw a frame: the status line and the cells whose character changed since the last frame
+        :return: the number of cells written to the terminal
+        """
+        rows, columns = self.viewport()
+        self.scroll(rows, columns)
+        if self.drawn is None or self.drawn.shape != (rows, columns):
+            self.drawn = np.full((rows, columns), -1, dtype=np.int8)
+            self.screen.addstr(self.screen.getmaxyx()[0] - 1, 0, HELP[:self.screen.getmaxyx()[1] - 1])
+        i0, j0 = self.origin
+        view = self.codes(i0, min(i0 + rows, self.width), j0, min(j0 + columns, self.height))
+        view[self.cursor[0] - i0, self.cursor[1] - j0] |= CURSOR
+        drawn = self.drawn[:view.shape[0], :view.shape[1]]
+        rs, cs = np.nonzero(view != drawn)
+        for r, c, code in zip(rs.tolist(), cs.tolist(), view[rs, cs].tolist()):
+            style = self.styles[code & ~CURSOR] | (curses.A_REVERSE if code & CURSOR else 0)
+            self.screen.addstr(BOARD_TOP + r, 2 * c + (self.shifted and (i0 + r) % 2), GLYPHS[code & ~CURSOR], style)
+        drawn[...] = view
+        self.draw_status()
+        self.screen.refresh()
+        return rs.size
+
+    def draw_status(self) -> None:
+        """
+        draw the status line when its text changed
+        :return: None
+        """
+        if self.first_click_done:
+            seconds = int((self.end_time if self.over else time.time()) - self.start_time)
+        else:
+            seconds = 0
+        status = f"{self.level}  {self.num_of_mines} mines  {self.board.flags_count} flags  {seconds} s  {self.message}"
+        status = status[:self.screen.getmaxyx()[1] - 1]
+        if status != self.status:
+            self.screen.addstr(0, 0, status)
+            self.screen.clrtoeol()
+            self.status = status
+
+    def cell_at(self, y, x):
+        """
+        get the cell drawn at a position of the window
+        :param y: the line
+        :param x: the column
+        :return: (i, j), or None if no cell is drawn there
+        """
+        i = self.origin[0] + y - BOARD_TOP
+        if y < BOARD_TOP or y - BOARD_TOP >= self.viewport()[0] or i >= self.width:
+            return None
+        x -= self.shifted and i % 2
+        j = self.origin[1] + x // 2
+        if x < 0 or x // 2 >= self.viewport()[1] or j >= self.height:
+            return None
+        return i, j
+
+    def handle(self, key) -> bool:
+        """
+        play a key or a mouse event
+        :param key: the code returned by getch
+        :return: False to leave the game
+        """
+        if key == ord("q"):
+            return False
+        if key in MOVES:
+            di, dj = MOVES[key]
+            self.cursor[0] = max(0, min(self.cursor[0] + di, self.width - 1))
+            self.cursor[1] = max(0, min(self.cursor[1] + dj, self.height - 1))
+        elif key in REVEAL_KEYS:
+            self.reveal(*self.cursor)
+        elif key == ord("f"):
+            self.flag(*self.cursor)
+        elif key == ord("n"):
+            self.new_game()
+        elif key == ord("r"):
+            self.show_records()
+        elif key == curses.KEY_RESIZE:
+            self.invalidate()
+        elif key == curses.KEY_MOUSE:
+            try:
+                _, x, y, _, state = curses.getmouse()
+            except curses.error:
+                return True
+            self.click(y, x, state)
+        return True
+
+    def click(self, y, x, state) -> None:
+        """
+        play a mouse click: the left button reveals and the right button flags
+        :param y: the line of the click
+        :param x: the column of the click
+        :param state: the button state reported by curses
+        :return: None
+        """
+        cell = self.cell_at(y, x)
+        if cell is None:
+            return None
+        self.cursor = list(cell)
+        if state & (curses.BUTTON1_CLICKED | curses.BUTTON1_PRESSED):
+            self.reveal(*cell)
+        elif state & (curses.BUTTON3_CLICKED | curses.BUTTON3_PRESSED):
+            self.flag(*cell)
+
+    def reveal(self, i, j) -> None:
+        """
+        reveal a cell, the mines are placed on the first one
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: None
+        """
+        if self.over:
+            return None
+        if not self.first_click_done:
+            self.first_click_done = True
+            self.board.generate_mines(i, j, self.seed)
+            self.recorder.start(self.board, self.level)
+            self.start_time = time.time()
+        self.recorder.record(i, j, REVEAL)
+        self.board.reveal(i, j)
+        if self.board.lost:
+            self.end("Game Over")
+        else:
+            self.check_win()
+
+    def flag(self, i, j) -> None:
+        """
+        place or remove the flag of a cell
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :return: None
+        """
+        if self.over or self.board.revealed[i, j]:
+            return None
+        self.recorder.record(i, j, FLAG)
+        self.board.toggle_flag(i, j)
+        self.check_win()
+
+    def check_win(self) -> None:
+        """
+        end the game once it is won, and keep it in the records
+        :return: None
+        """
+        if not self.board.won:
+            return None
+        self.end("You Win")
+        elapsed_time = self.end_time - self.start_time
+        metrics = board_metrics(self.board.mines, self.topology)
+        records = RecordStore.shared()
+        records.flush()  # the best time includes the wins still queued
+        best = records.best(self.level)
+        records.add(self.level, elapsed_time, metrics)
+        if best is None or int(elapsed_time) < best:
+            self.message += f", new record: {int(elapsed_time)} s, " \
+                            f"{bbbv_per_second(metrics['bbbv'], elapsed_time):.2f} 3BV/s"
+
+    def end(self, message) -> None:
+        """
+        stop the game, the mines are shown by the next frame
+        :param message: the text of the status line
+        :return: None
+        """
+        self.over = True
+        self.end_time = time.time()
+        self.message = message
+        self.stop_recording()
+
+    def show_records(self) -> None:
+        """
+        show the best time, the median time and the number of games of the level in the status line
+        :return: None
+        """
+        records = RecordStore.shared()
+        records.flush()
+        best = records.best(self.level)
+        if best is None:
+            self.message = "No record yet"
+        else:
+            self.message = f"record {best} s, median {records.time_at_percentile(self.level, 50)} s, " \
+                           f"{records.count(self.level)} games"
+
+    def stop_recording(self) -> None:
+        """
+        finish the replay file of the current game, nothing is written for a game which never started
+        :return: None
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def run(self) -> None:
+        """
+        draw and play until the player leaves, the timer is drawn again whenever no key comes for a tick
+        :return: None
+        """
+        try:
+            while True:
+                self.render()
+                key = self.screen.getch()
+                if key != -1 and not self.handle(key):
+                    return None
+        finally:
+            self.stop_recording()
+
+
+class TerminalMenu:
+    def __init__(self, screen) -> None:
+        """
+        the level selection of the terminal: the preset levels, a custom board and the topology
+        :param screen: the curses window
+        """
+        self.screen = screen
+        self.choices = [*LEVELS, "custom"]
+        self.selected = 0
+        self.topology = SQUARE.name
+
+    def draw(self) -> None:
+        """
+        draw the menu
+        :return: None
+        """
+        self.screen.erase()
+        self.screen.addstr(0, 0, "Minesweeper", curses.A_BOLD)
+        for row, name in enumerate(self.choices):
+            size = "width, height and mines asked" if name == "custom" else "{}*{}, {} mines".format(*LEVELS[name])
+            self.screen.addstr(2 + row, 0, f"{name:14}{size}", curses.A_REVERSE if row == self.selected else 0)
+        self.screen.addstr(3 + len(self.choices), 0, f"topology: {self.topology} (t to change)")
+        self.screen.addstr(5 + len(self.choices), 0, "up/down choose  enter play  q quit")
+        self.screen.refresh()
+
+    def ask_number(self, prompt, low, high):
+        """
+        ask for a number on the last line of the menu
+        :param prompt: the question
+        :param low: the smallest accepted value
+        :param high: the largest accepted value
+        :return: the number, or None if the answer is not a number in range
+        """
+        row = 7 + len(self.choices)
+        self.screen.move(row, 0)
+        self.screen.clrtoeol()
+        self.screen.addstr(row, 0, f"{prompt} ({low}-{high}): ")
+        curses.echo()
+        self.screen.timeout(-1)
+        try:
+            answer = self.screen.getstr().decode(errors="ignore").strip()
+        finally:
+            curses.noecho()
+        return int(answer) if answer.isdigit() and low <= int(answer) <= high else None
+
+    def choose(self):
+        """
+        let the player pick a level
+        :return: (width, height, number of mines, level name, topology), or None to quit
+        """
+        self.screen.timeout(-1)
+        while True:
+            self.draw()
+            key = self.screen.getch()
+            if key == ord("q"):
+                return None
+            if key in (curses.KEY_UP, ord("k")):
+                self.selected = (self.selected - 1) % len(self.choices)
+            elif key in (curses.KEY_DOWN, ord("j")):
+                self.selected = (self.selected + 1) % len(self.choices)
+            elif key == ord("t"):
+                names = list(TOPOLOGIES)
+                self.topology = names[(names.index(self.topology) + 1) % len(names)]
+            elif key in REVEAL_KEYS:
+                topology = TOPOLOGIES[self.topology]
+                name = self.choices[self.selected]
+                if name != "custom":
+                    return (*LEVELS[name], level_name(name, topology), topology)
+                width = self.ask_number("Width of the board", 2, 1000)
+                height = width and self.ask_number("Height of the board", 2, 1000)
+                num_of_mines = height and self.ask_number("Number of mines", 1, width * height - 1)
+                if num_of_mines:
+                    return width, height, num_of_mines, level_name(f"custom {width}*{height} {num_of_mines}",
+                                                                   topology), topology
+
+
+def play(screen, level=None, topology=SQUARE) -> None:
+    """
+    run the terminal frontend in a curses window, from the menu unless a level is given
+    :param screen: the window given by curses.wrapper
+    :param level: the name of a preset level to play at once
+    :param topology: the topology of that level
+    :return: None
+    """
+    curses.curs_set(0)
+    screen.keypad(True)
+    curses.mousemask(curses.BUTTON1_CLICKED | curses.BUTTON1_PRESSED | curses.BUTTON3_CLICKED |
+                     curses.BUTTON3_PRESSED)
+    curses.mouseinterval(0)  # report a click at once, without waiting for a double click
+    styles = init_styles()
+    while True:
+        if level is None:
+            choice = TerminalMenu(screen).choose()
+            if choice is None:
+                return None
+        else:
+            choice = (*LEVELS[level], level_name(level, topology), topology)
+        TerminalGame(screen, *choice[:4], topology=choice[4], styles=styles).run()
+        if level is not None:
+            return None
+
+
+def main(level=None, topology=SQUARE) -> None:
+    """
+    start the terminal frontend
+    :param level: the name of a preset level to play at once, the menu is shown if not given
+    :param topology: the topology of that level
+    :return: None
+    """
+    curses.wrapper(play, level, topology)
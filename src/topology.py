@@ -0,0 +1,260 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# the number of board sizes whose tables a topology keeps, the least recently used one is dropped first
+CACHED_SIZES = 4
+
+
+class NeighborTable:
+    def __init__(self, indptr, indices) -> None:
+        """
+        the neighbors of every cell of a board in compressed rows: the neighbors of the cell c = i * height + j are
+        indices[indptr[c]:indptr[c + 1]], in increasing order
+        :param indptr: the start of the row of every cell, and the end of the last row
+        :param indices: the flat indices of the neighbors of every cell, row after row
+        """
+        self.indptr: np.ndarray = indptr
+        self.indices: np.ndarray = indices
+        self.size: int = indptr.size - 1
+        self.degrees: np.ndarray = np.diff(indptr)
+        self._lists = None
+
+    def neighbors(self, cell) -> np.ndarray:
+        """
+        get the neighbors of a cell
+        :param cell: the flat index of the cell
+        :return: the flat indices of its neighbors
+        """
+        return self.indices[self.indptr[cell]:self.indptr[cell + 1]]
+
+    def lists(self) -> list:
+        """
+        get the neighbors of every cell as tuples of ints, for the loops written in plain python
+        :return: the list of neighbor tuples, built once per table
+        """
+        if self._lists is None:
+            indices = self.indices.tolist()
+            bounds = self.indptr.tolist()
+            self._lists = [tuple(indices[start:end]) for start, end in zip(bounds, bounds[1:])]
+        return self._lists
+
+    def gather(self, cells) -> np.ndarray:
+        """
+        get the neighbors of several cells at once, without a loop over the cells
+        :param cells: the flat indices of the cells
+        :return: the flat indices of their neighbors, one row after another, with the repeats
+        """
+        starts = self.indptr[cells]
+        degrees = self.indptr[np.asarray(cells) + 1] - starts
+        ends = np.cumsum(degrees)
+        positions = np.arange(ends[-1] if ends.size else 0) + np.repeat(starts - ends + degrees, degrees)
+        return self.indices[positions]
+
+    def sums(self, values) -> np.ndarray:
+        """
+        sum some values over the neighbors of every cell, for example the mines around every cell
+        :param values: the values of the cells, of shape (..., size)
+        :return: the sums, of the same shape
+        """
+        around = np.cumsum(np.asarray(values)[..., self.indices], axis=-1, dtype=np.int32)
+        around = np.concatenate([np.zeros((*around.shape[:-1], 1), dtype=np.int32), around], axis=-1)
+        return around[..., self.indptr[1:]] - around[..., self.indptr[:-1]]
+
+
+class Topology:
+    def __init__(self, name, offsets, odd_offsets=None, wrap=False) -> None:
+        """
+        the rule which decides the neighbors of a cell, compiled once per board size into a NeighborTable
+        :param name: the name of the topology
+        :param offsets: the (di, dj) offsets from a cell to its neighbors
+        :param odd_offsets: the offsets of the cells of the odd rows (i odd), when they differ
+        :param wrap: the board wraps around its edges, otherwise the neighbors outside of the board are dropped
+        """
+        self.name: str = name
+        self.offsets: tuple = tuple(offsets)
+        self.odd_offsets: tuple = self.offsets if odd_offsets is None else tuple(odd_offsets)
+        self.wrap: bool = wrap
+        # the same offsets everywhere, cut by the edges: the table is a stencil which can be applied with shifts
+        self.uniform: bool = odd_offsets is None and not wrap
+        self.reach: int = max(max(abs(di), abs(dj)) for di, dj in self.offsets + self.odd_offsets)
+        self._tables: OrderedDict = OrderedDict()
+        self._padded: OrderedDict = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"Topology({self.name!r})"
+
+    def table(self, w, h) -> NeighborTable:
+        """
+        get the neighbor table of a board size, it is computed once and shared by every board of that size, as long
+        as the size is among the last CACHED_SIZES ones
+        :param w: the width of the board
+        :param h: the height of the board
+        :return: the neighbor table
+        """
+        return self.cached(self._tables, (w, h), self.compile, w, h)
+
+    @staticmethod
+    def cached(cache, key, build, *args):
+        """
+        get a value of a bounded cache, built on a miss
+        :param cache: the cache, in the order of the last use
+        :param key: the key of the value
+        :param build: called with args to build the value
+        :return: the value
+        """
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = build(*args)
+            if len(cache) > CACHED_SIZES:
+                cache.popitem(last=False)
+        return cache[key]
+
+    def compile(self, w, h) -> NeighborTable:
+        """
+        compute the neighbors of every cell of a board
+        :param w: the width of the board
+        :param h: the height of the board
+        :return: the neighbor table
+        """
+        matrix = self.matrix(w, h)
+        if self.wrap:
+            # on a small wrapped board several offsets can reach the same cell, or the cell itself
+            matrix.sort(axis=1)
+            matrix[matrix == np.arange(w * h)[:, None]] = -1
+            matrix[:, 1:][matrix[:, 1:] == matrix[:, :-1]] = -1
+        keep = matrix >= 0
+        indptr = np.zeros(w * h + 1, dtype=np.int32)
+        np.cumsum(keep.sum(axis=1), out=indptr[1:])
+        return NeighborTable(indptr, matrix[keep].astype(np.int32))
+
+    def cell_neighbors(self, i, j, w, h) -> np.ndarray:
+        """
+        get the neighbors of a single cell straight from the offsets, without compiling the table of the board
+        :param i: the x coordinate
+        :param j: the y coordinate
+        :param w: the width of the board
+        :param h: the height of the board
+        :return: the flat indices of its neighbors, in increasing order as in the table
+        """
+        offsets = np.array(self.odd_offsets if i % 2 else self.offsets)
+        x, y = i + offsets[:, 0], j + offsets[:, 1]
+        if self.wrap:
+            x, y = x % w, y % h
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        # at most a few cells: a set is cheaper than np.unique, which imports its helpers on its first call
+        cells = set((x[inside] * h + y[inside]).tolist()) - {i * h + j}
+        return np.array(sorted(cells), dtype=np.intp)
+
+    def matrix(self, w, h) -> np.ndarray:
+        """
+        apply every offset to all the cells at once
+        :param w: the width of the board
+        :param h: the height of the board
+        :return: the flat index of the neighbor of every cell by every offset, -1 outside of the board, in
+                 increasing order along each row unless the board wraps
+        """
+        i, j = np.divmod(np.arange(w * h, dtype=np.int32), h)
+        odd = (i % 2).astype(bool)
+        # one offset per row while filling, so that every write is contiguous
+        matrix = np.empty((len(self.offsets), w * h), dtype=np.int32)
+        for k, ((di, dj), (odd_di, odd_dj)) in enumerate(zip(self.offsets, self.odd_offsets)):
+            if (di, dj) == (odd_di, odd_dj):
+                x, y = i + di, j + dj
+            else:
+                x, y = i + np.where(odd, odd_di, di), j + np.where(odd, odd_dj, dj)
+            if self.wrap:
+                x, y = x % w, y % h
+            np.multiply(x, h, out=matrix[k])
+            matrix[k] += y
+            matrix[k][(x < 0) | (x >= w) | (y < 0) | (y >= h)] = -1
+        return np.ascontiguousarray(matrix.T)
+
+    def padded_table(self, w, h, pad) -> np.ndarray:
+        """
+        get the neighbors of every cell in the flat indices of grids stored with a border of pad cells, as one row
+        of the same length per cell: the missing neighbors point at the first border cell
+        :param w: the width of the board
+        :param h: the height of the board
+        :param pad: the width of the border
+        :return: the table of shape ((w + 2 * pad) * (h + 2 * pad), number of offsets), shared by every board of
+                 that size among the last CACHED_SIZES ones
+        """
+        return self.cached(self._padded, (w, h, pad), self.compile_padded, w, h, pad)
+
+    def compile_padded(self, w, h, pad) -> np.ndarray:
+        """
+        compute the padded table of a board size, see padded_table
+        :param w: the width of the board
+        :param h: the height of the board
+        :param pad: the width of the border
+        :return: the table
+        """
+        stride = h + 2 * pad
+        to_padded = ((np.arange(w)[:, None] + pad) * stride + np.arange(h) + pad).reshape(-1)
+        matrix = self.matrix(w, h)
+        padded = np.zeros(((w + 2 * pad) * stride, len(self.offsets)), dtype=np.intp)
+        # a neighbor reached twice on a small wrapped board is only revealed once by the flood fill anyway
+        padded[to_padded] = np.where(matrix >= 0, to_padded[matrix], 0)
+        return padded
+
+    def stencil(self, stride) -> np.ndarray:
+        """
+        get the offsets of the neighbors in flat grids stored with a border at least as wide as the reach
+        :param stride: the length of a row of the bordered grids
+        :return: the flat offsets, only for a uniform topology
+        """
+        return np.array([di * stride + dj for di, dj in self.offsets], dtype=np.intp)
+
+    def counts(self, mines) -> np.ndarray:
+        """
+        count the mines around every cell (the cell itself excluded)
+        :param mines: the boolean grid of mines, or a stack of grids of shape (..., width, height)
+        :return: the grid of adjacency counts, of the same shape
+        """
+        *batch, w, h = mines.shape
+        if not self.uniform:
+            return self.table(w, h).sums(mines.reshape(*batch, w * h)).astype(np.int8).reshape(mines.shape)
+        # a uniform topology adds shifted views of the bordered grid, without reading the table
+        r = self.reach
+        padded = np.zeros((*batch, w + 2 * r, h + 2 * r), dtype=np.int8)
+        padded[..., r:r + w, r:r + h] = mines
+        counts = np.zeros((*batch, w, h), dtype=np.int8)
+        for di, dj in self.offsets:
+            counts += padded[..., r + di:r + di + w, r + dj:r + dj + h]
+        return counts
+
+
+KING = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+# the rows are shifted by half a cell to the right on every odd row, the six neighbors touch a side of the hexagon
+HEX_EVEN = ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0))
+HEX_ODD = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1))
+
+SQUARE = Topology("square", KING)
+TORUS = Topology("torus", KING, wrap=True)
+HEX = Topology("hex", HEX_EVEN, HEX_ODD)
+KNIGHT = Topology("knight", ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)))
+
+TOPOLOGIES = {topology.name: topology for topology in (SQUARE, TORUS, HEX, KNIGHT)}
+
+
+def level_name(level, topology) -> str:
+    """
+    get the name a level is recorded under, a game on another topology than the square one has its own records
+    :param level: the name of the level
+    :param topology: the topology of the game
+    :return: the name of the level followed by the topology, or the name alone for the square topology
+    """
+    return level if topology is SQUARE else f"{level} {topology.name}"
+
+
+def level_topology(level) -> Topology:
+    """
+    get the topology of a recorded level name, so that saves and replays are played back on the right board
+    :param level: the name of the level
+    :return: the topology named at the end of the level, the square one if none is
+    """
+    name = level.rsplit(" ", 1)[-1]
+    return TOPOLOGIES[name] if name in TOPOLOGIES and name != SQUARE.name else SQUARE
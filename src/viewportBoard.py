@@ -0,0 +1,108 @@
+import tkinter as tk
+
+from src.buttons import drawable_color
+
+
+class ViewportBoard:
+    def __init__(self, frame, rows, columns, cell_size=24):
+        """
+        draw a window of an endless board on a canvas, only the cells of the window have canvas items
+        the items are created once and recolored when the window moves
+        :param frame: the frame to place the canvas in
+        :param rows: the number of rows of the window
+        :param columns: the number of columns of the window
+        :param cell_size: the size of a cell in pixels
+        """
+        self.frame = frame
+        self.rows: int = rows
+        self.columns: int = columns
+        self.cell_size: int = cell_size
+        self.disabled = False
+        self.colors: dict = {}
+
+        # the board coordinates of the top left cell of the window
+        self.i0: int = 0
+        self.j0: int = 0
+
+        self.canvas = tk.Canvas(frame, width=columns * cell_size, height=rows * cell_size, highlightthickness=0,
+                                bg="light blue")
+        self.canvas.grid(row=0, column=0, sticky=tk.NSEW)
+        self.font = ("Helvetica", -max(6, cell_size * 3 // 5), "bold")
+        self.items = [[self.create_cell(i, j) for j in range(columns)] for i in range(rows)]
+        self.looks = [[("", "light blue") for _ in range(columns)] for _ in range(rows)]
+
+    def create_cell(self, i, j) -> tuple:
+        """
+        create the items of a cell of the window
+        :param i: the row in the window
+        :param j: the column in the window
+        :return: the rectangle and the text items
+        """
+        size = self.cell_size
+        x, y = j * size, i * size
+        rect = self.canvas.create_rectangle(x, y, x + size, y + size, fill="light blue", outline="gray60")
+        label = self.canvas.create_text(x + size // 2, y + size // 2, text="", font=self.font)
+        return rect, label
+
+    def bind_cells(self, on_left, on_right, on_move) -> None:
+        """
+        bind the click events and the arrow keys
+        :param on_left: called with the board coordinates (i, j) on a left click
+        :param on_right: called with the board coordinates (i, j) on a right click
+        :param on_move: called with (di, dj) when an arrow key moves the window
+        :return: None
+        """
+        self.canvas.bind("<Button-1>", lambda event: self.dispatch(event, on_left))
+        self.canvas.bind("<Button-3>", lambda event: self.dispatch(event, on_right))
+        step = max(1, min(self.rows, self.columns) // 4)
+        for key, move in (("<Up>", (-step, 0)), ("<Down>", (step, 0)), ("<Left>", (0, -step)),
+                          ("<Right>", (0, step))):
+            self.canvas.bind(key, lambda event, di=move[0], dj=move[1]: on_move(di, dj))
+        self.canvas.focus_set()
+
+    def dispatch(self, event, handler) -> None:
+        """
+        call the handler with the board coordinates of the cell under the mouse
+        :param event: the click event
+        :param handler: the click handler
+        :return: None
+        """
+        self.canvas.focus_set()
+        if self.disabled:
+            return None
+        i, j = event.y // self.cell_size, event.x // self.cell_size
+        if 0 <= i < self.rows and 0 <= j < self.columns:
+            handler(self.i0 + i, self.j0 + j)
+
+    def move(self, di, dj) -> None:
+        """
+        move the window, the cells must be drawn again afterwards
+        :param di: the number of rows to move by
+        :param dj: the number of columns to move by
+        :return: None
+        """
+        self.i0 += di
+        self.j0 += dj
+
+    def update_cell(self, i, j, text="", bg="light blue") -> None:
+        """
+        change how the cell (i, j) looks, the cells outside of the window are ignored
+        :param i: the x coordinate on the board
+        :param j: the y coordinate on the board
+        :param text: the text of the cell
+        :param bg: the color of the cell
+        :return: None
+        """
+        i, j = i - self.i0, j - self.j0
+        if 0 <= i < self.rows and 0 <= j < self.columns and self.looks[i][j] != (text, bg):
+            self.looks[i][j] = (text, bg)
+            rect, label = self.items[i][j]
+            self.canvas.itemconfig(rect, fill=drawable_color(self.canvas, bg, self.colors))
+            self.canvas.itemconfig(label, text=text)
+
+    def disable_all(self) -> None:
+        """
+        ignore every click from now on, the window can still be moved
+        :return: None
+        """
+        self.disabled = True
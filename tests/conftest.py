@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.board import Board
+
+
+@pytest.fixture
+def make_board():
+    """
+    build a board from rows of characters, "*" being a mine, row i of the text being the cells (i, j)
+    :return: the function building the board
+    """
+    def make(*rows) -> Board:
+        mines = np.array([[char == "*" for char in row] for row in rows], dtype=bool)
+        board = Board(*mines.shape, int(mines.sum()))
+        board.place_mines(mines)
+        return board
+    return make
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    run in a temporary folder, with a records store of its own
+    :return: the folder
+    """
+    from src.records import RecordStore
+    monkeypatch.chdir(tmp_path)
+    store = RecordStore(str(tmp_path / "records.db"))
+    monkeypatch.setattr(RecordStore, "_shared", store)
+    yield tmp_path
+    store.close()
+
+
+@pytest.fixture
+def tk_root():
+    """
+    open a Tk main window, the test is skipped where there is no display (run it under xvfb-run to include it)
+    :return: the main window
+    """
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        pytest.skip(f"no display: {error}")
+    root.withdraw()
+    yield root
+    root.destroy()
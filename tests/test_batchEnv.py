@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.batchEnv import COVERED, FLAGGED, MINE, BatchEnv
+from src.board import Board
+from src.topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES.values(), ids=TOPOLOGIES)
+@pytest.mark.parametrize("safe_zone", [False, True])
+def test_batch_follows_the_board_rules(safe_zone, topology):
+    width, height, num_of_mines, n = 9, 7, 12, 32
+    env = BatchEnv(n, width, height, num_of_mines, seed=0, safe_zone=safe_zone, auto_reset=False,
+                   topology=topology)
+    rng = np.random.default_rng(1)
+    boards = [None] * n
+    for _ in range(60):
+        actions = rng.integers(width * height, size=n) + width * height * (rng.random(n) < 0.2)
+        playing = ~env.over
+        observations, rewards, dones = env.step(actions)
+        for b in np.flatnonzero(playing):
+            cell, flag = int(actions[b]) % (width * height), actions[b] >= width * height
+            i, j = divmod(cell, height)
+            if boards[b] is None and env.placed[b]:
+                # the mines are placed on the first reveal: play it on a board with the same mines
+                assert not env.mines[b, i, j]
+                if safe_zone:
+                    assert not env.mines[b].reshape(-1)[topology.cell_neighbors(i, j, width, height)].any()
+                boards[b] = Board(width, height, num_of_mines, topology)
+                boards[b].place_mines(env.mines[b].copy())
+                boards[b].restore(np.zeros((width, height), dtype=bool), env.flagged[b].copy())
+                boards[b].reveal(i, j)
+            elif boards[b] is not None:
+                if flag:
+                    boards[b].toggle_flag(i, j)
+                else:
+                    boards[b].reveal(i, j)
+            board = boards[b]
+            if board is None:
+                continue
+            assert (board.revealed == env.revealed[b]).all() and (board.flagged == env.flagged[b]).all()
+            expected = np.where(board.flagged, FLAGGED, COVERED)
+            expected[board.revealed] = np.where(board.mines, MINE, board.counts)[board.revealed]
+            assert (observations[b] == expected).all()
+            assert dones[b] == (board.lost or board.won) and env.safe_left[b] == board.safe_left
+
+
+def test_rewards_of_a_won_game_sum_to_one():
+    env = BatchEnv(2, 8, 8, 10, seed=3)
+    total = env.step(np.array([0, 27]))[1].copy()
+    mines = [np.flatnonzero(env.mines[b]) for b in range(2)]
+    for k in range(10):
+        _, rewards, dones = env.step(np.array([64 + mines[0][k], 64 + mines[1][k]]))
+        total += rewards
+    assert dones.all() and np.allclose(total, 1.0)
+    assert not env.placed.any() and (env.observations == COVERED).all(), "the ended boards start again"
+
+
+def test_mine_hit_and_bad_actions():
+    env = BatchEnv(1, 4, 4, 3, seed=0, auto_reset=False)
+    env.step(np.array([0]))
+    mine = int(np.flatnonzero(env.mines[0])[0])
+    _, rewards, dones = env.step(np.array([mine]))
+    assert dones[0] and rewards[0] == -1.0 and env.lost[0]
+    _, rewards, dones = env.step(np.array([0]))
+    assert not dones[0] and rewards[0] == 0.0, "an ended board ignores the actions"
+    with pytest.raises(ValueError):
+        env.step(np.array([32]))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.batchSolver import BatchSolver
+from src.board import Board
+from src.solver import Solver
+from src.topology import TOPOLOGIES
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES.values(), ids=TOPOLOGIES)
+def test_deductions_match_the_solver(topology, monkeypatch):
+    width, height, num_of_mines, n = 16, 12, 30, 40
+    solver = BatchSolver(width, height, num_of_mines, num_envs=n, seed=2, safe_zone=True, topology=topology)
+    pad = solver._pad
+    # what every board knows when it first has to guess
+    stuck = {}
+    guess = solver.guess
+
+    def remember(boards):
+        for b in boards.tolist():
+            stuck.setdefault(b, (solver.revealed[b].copy(), solver.known.reshape(n, width + 2 * pad, -1)[b].copy()))
+        return guess(boards)
+    monkeypatch.setattr(solver, "guess", remember)
+    solver.start(np.arange(n))
+    mines = solver.mines.copy()
+    playing = np.ones(n, dtype=bool)
+    while playing.any():
+        solver.play_round(playing)
+        playing &= ~(solver.lost | (solver.safe_left == 0))
+    for b in range(n):
+        board = Board(width, height, num_of_mines, topology)
+        board.place_mines(mines[b])
+        reference = Solver(board)
+        reference.first_click(width // 2, height // 2)
+        reference.solve(allow_guess=False)
+        if b in stuck:
+            revealed, known = stuck[b]
+            assert not (known[pad:pad + width, pad:pad + height] & ~board.mines).any(), "only mines are known"
+        else:
+            assert not solver.lost[b]
+            revealed = solver.revealed[b]
+        assert (revealed == board.revealed).all()
+
+
+def test_games_are_seeded():
+    first = list(BatchSolver(9, 9, 10, num_envs=16, seed=5, safe_zone=True).play(50))
+    assert len(first) == 50
+    assert first == list(BatchSolver(9, 9, 10, num_envs=16, seed=5, safe_zone=True).play(50))
+    assert all(won or guesses for won, guesses, *_ in first), "a lost game needs a guess"
+    assert sum(game[0] for game in first) > 25
+
+
+@pytest.mark.parametrize("width, height, num_of_mines", [(3, 3, 0), (1, 1, 0), (5, 5, 16)])
+def test_games_won_by_the_first_click(width, height, num_of_mines):
+    # no mine, or the safe zone of the first click is all the safe cells
+    games = list(BatchSolver(width, height, num_of_mines, num_envs=2, seed=0, safe_zone=True).play(5))
+    safe = width * height - num_of_mines
+    assert games == [(True, 0, 1, 1, safe, safe)] * 5
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from src.board import Board
+
+
+def test_seeded_mines_are_pinned():
+    board = Board(8, 8, 10)
+    board.generate_mines(3, 3, seed=42)
+    assert board.mine_cells() == ((0, 4), (0, 5), (1, 4), (3, 1), (4, 5), (5, 3), (6, 3), (7, 2), (7, 5), (7, 7))
+
+
+def test_seeded_safe_zone_is_pinned():
+    board = Board(8, 8, 10)
+    board.generate_mines(0, 0, seed=7, safe_zone=True)
+    assert board.mine_cells() == ((0, 5), (2, 1), (2, 6), (4, 3), (4, 4), (5, 0), (5, 7), (6, 3), (6, 4), (7, 1))
+
+
+def test_too_many_mines():
+    with pytest.raises(ValueError):
+        Board(3, 3, 9).generate_mines(0, 0)
+
+
+def test_counts(make_board):
+    board = make_board("*..",
+                       "...",
+                       ".**")
+    assert board.counts.tolist() == [[0, 1, 0],
+                                     [2, 3, 2],
+                                     [1, 1, 1]]
+    assert board.count_mines(1, 1) == 3
+    assert board.is_mine(2, 2) and not board.is_mine(1, 1)
+
+
+def test_reveal_cascade_stops_at_numbers(make_board):
+    board = make_board("....",
+                       "....",
+                       "...*")
+    xs, ys = board.reveal(0, 0)
+    assert sorted(zip(xs.tolist(), ys.tolist())) == [(i, j) for i in range(3) for j in range(4) if (i, j) != (2, 3)]
+    assert board.safe_left == 0 and board.won
+
+
+def test_reveal_number_reveals_one_cell(make_board):
+    board = make_board("*..",
+                       "...",
+                       "...")
+    xs, ys = board.reveal(0, 1)
+    assert (xs.tolist(), ys.tolist()) == ([0], [1])
+    assert board.reveal(0, 1)[0].size == 0, "a revealed cell is not revealed twice"
+
+
+def test_reveal_skips_flags(make_board):
+    board = make_board("....",
+                       "....",
+                       "...*")
+    board.toggle_flag(0, 3)
+    xs, _ = board.reveal(0, 0)
+    assert xs.size == 10 and not board.revealed[0, 3]
+    assert board.reveal(0, 3)[0].size == 0, "a flagged cell is not revealed"
+
+
+def test_mine_loses(make_board):
+    board = make_board("*.",
+                       "..")
+    xs, ys = board.reveal(0, 0)
+    assert board.lost and not board.won
+    assert (xs.tolist(), ys.tolist()) == ([0], [0])
+
+
+def test_reveal_many_with_a_mine_reveals_only_the_mine(make_board):
+    board = make_board("*...",
+                       "....",
+                       "...*")
+    safe_left = board.safe_left
+    xs, ys = board.reveal_many([0, 0, 2], [0, 2, 1])
+    assert board.lost and (xs.tolist(), ys.tolist()) == ([0], [0])
+    assert board.revealed.sum() == 1 and board.safe_left == safe_left
+
+
+def test_win_by_flags(make_board):
+    board = make_board("*.",
+                       ".*")
+    board.toggle_flag(0, 0)
+    assert not board.won
+    board.toggle_flag(0, 1)
+    board.toggle_flag(1, 1)
+    assert not board.won, "a wrong flag blocks the win"
+    board.toggle_flag(0, 1)
+    assert board.won and board.flags_count == 2 and board.correct_flags == 2
+
+
+def test_flag_on_revealed_cell(make_board):
+    board = make_board("*.",
+                       "..")
+    board.reveal(1, 1)
+    assert board.toggle_flag(1, 1) is False and board.flags_count == 0
+
+
+def test_set_revealed_undoes_a_reveal(make_board):
+    board = make_board("....",
+                       "....",
+                       "...*")
+    xs, ys = board.reveal(0, 0)
+    board.set_revealed(xs, ys, False)
+    assert not board.revealed.any() and board.safe_left == 11
+    board.set_revealed(np.array([2]), np.array([3]), True)
+    assert board.lost
+    board.set_revealed(np.array([2]), np.array([3]), False)
+    assert not board.lost
+
+
+def test_restore(make_board):
+    board = make_board("*..",
+                       "...",
+                       "..*")
+    revealed = np.zeros((3, 3), dtype=bool)
+    revealed[0, 2] = True
+    flagged = np.zeros((3, 3), dtype=bool)
+    flagged[0, 0] = True
+    board.restore(revealed, flagged)
+    assert board.safe_left == 6 and board.flags_count == 1 and board.correct_flags == 1 and not board.lost
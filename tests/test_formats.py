@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.board import Board
+from src.replay import FLAG, REVEAL, ReplayWriter, read_replay, summarize
+from src.snapshot import SnapshotWriter, load_snapshot, pack_snapshot, save_snapshot, unpack_snapshot
+
+
+def played_board(seed) -> Board:
+    board = Board(30, 16, 99)
+    board.generate_mines(15, 8, seed=seed, safe_zone=True)
+    board.reveal(15, 8)
+    board.toggle_flag(*map(int, np.argwhere(board.mines)[0]))
+    return board
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_snapshot_roundtrip(tmp_path, seed):
+    board = played_board(seed)
+    path = str(tmp_path / "game.mss")
+    save_snapshot(pack_snapshot(board, "expert", 12.5), path)
+    snapshot = load_snapshot(path)
+    assert (snapshot.level, snapshot.elapsed_time) == ("expert", 12.5)
+    restored = snapshot.board
+    for grid in ("mines", "counts", "revealed", "flagged"):
+        assert (getattr(restored, grid) == getattr(board, grid)).all()
+    assert (restored.safe_left, restored.flags_count, restored.correct_flags) == \
+           (board.safe_left, board.flags_count, board.correct_flags)
+
+
+def test_snapshot_errors(tmp_path):
+    data = pack_snapshot(played_board(0), "expert", 1.0)
+    with pytest.raises(ValueError):
+        unpack_snapshot(data[:-1])
+    with pytest.raises(ValueError):
+        unpack_snapshot(b"MSRP" + data[4:])
+    path = tmp_path / "empty.mss"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+def test_snapshot_writer_keeps_the_latest(tmp_path):
+    path = str(tmp_path / "game.mss")
+    writer = SnapshotWriter(path)
+    for elapsed_time in range(5):
+        writer.save(pack_snapshot(played_board(0), "expert", float(elapsed_time)))
+    writer.close(wait=True)
+    assert load_snapshot(path).elapsed_time == 4.0
+    writer = SnapshotWriter(path)
+    writer.delete()
+    writer.close(wait=True)
+    assert not (tmp_path / "game.mss").exists()
+
+
+def test_replay_roundtrip(tmp_path):
+    board = Board(16, 16, 40)
+    board.generate_mines(8, 8, seed=3)
+    path = str(tmp_path / "game.msr")
+    writer = ReplayWriter(path)
+    writer.start(board, "intermediate")
+    moves = [(8, 8, REVEAL), (0, 0, FLAG), (15, 15, REVEAL), (0, 0, FLAG)]
+    for i, j, action in moves:
+        writer.record(i, j, action)
+        if action == REVEAL:
+            board.reveal(i, j)
+        else:
+            board.toggle_flag(i, j)
+    writer.close(wait=True)
+    replay = read_replay(path)
+    assert replay.level == "intermediate" and (replay.mines == board.mines).all()
+    assert [event[:3] for event in replay.events()] == moves
+    assert (replay.final_board().revealed == board.revealed).all()
+    assert summarize(path)["events"] == 4
@@ -0,0 +1,201 @@
+"""
+the game window: the headless parts are called on a bare object, the rest needs a display
+"""
+import glob
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+tkinter = pytest.importorskip("tkinter")
+
+from src.board import Board  # noqa: E402
+from src.boardPool import BoardPool  # noqa: E402
+from src.buttons import FALLBACK_COLOR, drawable_color  # noqa: E402
+from src.Minesweeper8UIdesign import MineSweeper  # noqa: E402
+from src.profiler import PROFILER  # noqa: E402
+from src.replay import read_replay  # noqa: E402
+from src.snapshot import SAVE_PATH, pack_snapshot, save_snapshot  # noqa: E402
+
+
+def bare_game(width, height, num_of_mines, seed=None, safe_zone=False):
+    return SimpleNamespace(board=Board(width, height, num_of_mines), replay=None, no_guess=False, seed=seed,
+                           safe_zone=safe_zone, num_of_mines=num_of_mines)
+
+
+def test_random_mines_is_seeded():
+    game = bare_game(8, 8, 10, seed=42)
+    mines = MineSweeper.random_mines(game, 3, 3, 8, 8)
+    assert mines == ((0, 4), (0, 5), (1, 4), (3, 1), (4, 5), (5, 3), (6, 3), (7, 2), (7, 5), (7, 7))
+    assert MineSweeper.random_mines(bare_game(8, 8, 10, seed=42), 3, 3, 8, 8) == mines
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_mines_avoids_the_first_click(seed):
+    game = bare_game(5, 5, 24, seed=seed)
+    mines = MineSweeper.random_mines(game, seed % 5, seed // 5 % 5, 5, 5)
+    assert len(mines) == 24 and (seed % 5, seed // 5 % 5) not in mines
+
+
+def test_count_mines():
+    game = bare_game(8, 8, 10, seed=42)
+    MineSweeper.random_mines(game, 3, 3, 8, 8)
+    assert [MineSweeper.count_mines(game, 1, j, 8, 8) for j in range(8)] == [0, 0, 0, 2, 2, 3, 1, 0]
+
+
+def test_unknown_colors_are_drawn_gray():
+    checked = []
+
+    def winfo_rgb(name):
+        checked.append(name)
+        if name.startswith("System"):
+            raise tkinter.TclError(f"unknown color name \"{name}\"")
+        return 0, 0, 0
+    widget, known = SimpleNamespace(winfo_rgb=winfo_rgb), {}
+    assert drawable_color(widget, "SystemButtonFace", known) == FALLBACK_COLOR
+    assert drawable_color(widget, "light blue", known) == "light blue"
+    assert drawable_color(widget, "SystemButtonFace", known) == FALLBACK_COLOR and len(checked) == 2
+
+@pytest.fixture
+def game(tk_root, workdir, monkeypatch):
+    shown = []
+    monkeypatch.setattr("tkinter.messagebox.showinfo", lambda title, message: shown.append((title, message)))
+    game = MineSweeper(8, 8, 10, "beginner", lambda root: None, root=tk_root, seed=42)
+    game.shown = shown
+    yield game
+    game.cancel_timer()
+    game.stop_recording(wait=True)
+    game.saver.close(wait=True)
+    game.screen.after_cancel(game.autosave_job)
+
+
+def play_to_win(game):
+    while not game.over:
+        x, y = map(int, np.argwhere(~game.board.mines & ~game.board.revealed)[0])
+        game.reveal(x, y, game.width, game.height, game.view, game.game_label)
+
+
+def test_reveal_cascade(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    assert game.first_click_done and game.board.revealed.sum() == 9
+    assert game.view.buttons[3][3].cget("state") == "disabled"
+    assert game.view.buttons[7][0].cget("state") == "normal"
+
+
+def test_mine_ends_the_game(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    game.reveal(0, 4, 8, 8, game.view, game.game_label)
+    assert game.over and game.game_label.cget("text") == "Game Over"
+
+
+def test_win_is_recorded(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    play_to_win(game)
+    assert game.game_label.cget("text") == "You Win"
+    game.records.flush()
+    assert game.records.count("beginner") == 1 and game.records.best_efficiency("beginner") is not None
+    assert game.shown and game.shown[0][0] == "New Record"
+
+
+def test_shown_answer_is_not_recorded(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    game.show_hide_answer()
+    play_to_win(game)
+    game.records.flush()
+    assert game.records.count("beginner") == 0
+
+
+def test_undo_redo(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    game.place_remove_flag(0, 4, game.game_label)
+    game.undo()
+    assert not game.board.flagged.any()
+    game.undo()
+    assert not game.board.revealed.any() and game.view.buttons[3][3].cget("state") == "normal"
+    game.redo()
+    assert game.board.revealed.sum() == 9
+    play_to_win(game)
+    game.records.flush()
+    assert game.records.count("beginner") == 0, "a game with an undo is not recorded"
+
+
+def test_game_over_is_drawn_a_slice_at_a_time(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    game.show_hide_answer()
+    game.show_hide_answer()
+    assert len(game.scheduler) == 10, "the hidden answer is merged into the shown one"
+    game.reveal(0, 4, 8, 8, game.view, game.game_label)
+    assert game.over and game.view.buttons[7][0].cget("state") == "normal"
+    game.scheduler.flush()
+    assert game.view.buttons[7][0].cget("state") == "disabled" and game.view.buttons[0][5].cget("text") == "*"
+    game.restart()
+    assert not game.scheduler.pending and game.view.buttons[0][5].cget("text") == ""
+
+
+def test_profile_times_the_slices(game, monkeypatch):
+    monkeypatch.setattr(PROFILER, "histograms", {})
+    game.toggle_profile()
+    assert PROFILER.enabled
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    game.reveal(0, 4, 8, 8, game.view, game.game_label)
+    assert "change_mine_color" not in PROFILER.histograms, "nothing is drawn before the first slice"
+    game.scheduler.run()
+    assert PROFILER.histograms["change_mine_color"].count == 1
+    assert PROFILER.histograms["turn_off_buttons"].count == 1
+    game.toggle_profile()
+    assert not PROFILER.enabled
+
+
+def test_rechoose_stops_the_profiler(tk_root, workdir):
+    game = MineSweeper(8, 8, 10, "beginner", lambda root: None, root=tk_root, seed=42)
+    game.toggle_profile()
+    game.rechoose()
+    assert not PROFILER.enabled and game.profile_job is None
+    assert not game.saver.thread.is_alive(), "the last snapshot is written before the next screen saves"
+
+
+def test_no_guess_fallback_tells_when_it_gives_up(tk_root, workdir, monkeypatch):
+    pool = BoardPool("pool")
+    assert pool.take(8, 8, 10, 3, 3) is None and not os.path.exists("pool"), "a stopped pool is not read"
+    monkeypatch.setattr("src.Minesweeper8UIdesign.generate_no_guess", lambda *args: None)
+    game = MineSweeper(8, 8, 10, "beginner", lambda root: None, root=tk_root, no_guess=True)
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    assert game.board.placed and game.game_label.cget("text") == "May need a guess"
+    close_game(game)
+
+
+def close_game(game):
+    game.cancel_timer()
+    game.cancel_replay()
+    game.stop_recording(wait=True)
+    game.saver.close(wait=True)
+    game.screen.after_cancel(game.autosave_job)
+
+
+def test_replay_keeps_the_save(game):
+    game.reveal(3, 3, 8, 8, game.view, game.game_label)
+    play_to_win(game)
+    game.stop_recording(wait=True)
+    (path,) = glob.glob(os.path.join("replays", "*.msr"))
+    save_snapshot(pack_snapshot(Board(16, 16, 40), "intermediate", 5.0))
+    replayed = MineSweeper(8, 8, 10, "beginner", lambda root: None, root=game.root, replay=read_replay(path))
+    replayed.skip_to_end()
+    assert replayed.over
+    replayed.restart()
+    close_game(replayed)
+    assert os.path.exists(SAVE_PATH), "the save of another game is kept"
+
+
+def test_practice_keeps_the_save(game):
+    save_snapshot(pack_snapshot(Board(16, 16, 40), "intermediate", 5.0))
+    practice = MineSweeper(8, 8, 10, "beginner", lambda root: None, root=game.root, seed=42, practice=True)
+    practice.reveal(3, 3, 8, 8, practice.view, practice.game_label)
+    play_to_win(practice)
+    practice.restart()
+    practice.reveal(3, 3, 8, 8, practice.view, practice.game_label)
+    practice.reveal(0, 4, 8, 8, practice.view, practice.game_label)
+    assert practice.board.lost
+    practice.restart()
+    close_game(practice)
+    assert os.path.exists(SAVE_PATH), "the save of another game is kept"
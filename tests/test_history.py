@@ -0,0 +1,15 @@
+from src.history import History
+from src.replay import FLAG, REVEAL
+
+
+def test_history_undo_redo():
+    history = History(5)
+    history.push(REVEAL, [0, 1], [2, 3])
+    history.push(FLAG, [4], [4])
+    kind, xs, ys = history.undo()
+    assert kind == FLAG and list(xs) == [4] and list(ys) == [4]
+    assert history.redo()[0] == FLAG and history.redo() is None
+    history.undo()
+    history.push(REVEAL, [1], [1])
+    assert history.redo() is None, "a new move drops the undone moves"
+    assert [history.undo()[0], history.undo()[0], history.undo()] == [REVEAL, REVEAL, None]
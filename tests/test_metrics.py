@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.board import Board
+from src.metrics import board_metrics, count_components, level_metrics
+from src.topology import TOPOLOGIES
+
+
+def reference_components(mask) -> int:
+    w, h = mask.shape
+    seen, groups = set(), 0
+    for start in zip(*np.nonzero(mask)):
+        if start in seen:
+            continue
+        groups += 1
+        stack = [start]
+        seen.add(start)
+        while stack:
+            x, y = stack.pop()
+            for a in range(max(0, x - 1), min(w, x + 2)):
+                for b in range(max(0, y - 1), min(h, y + 2)):
+                    if mask[a, b] and (a, b) not in seen:
+                        seen.add((a, b))
+                        stack.append((a, b))
+    return groups
+
+
+def test_known_board():
+    mines = np.array([[c == "*" for c in row] for row in ("*....",
+                                                          ".....",
+                                                          "....*",
+                                                          "*....")])
+    # one opening down the middle; (1, 0) and (2, 0) form an island out of its reach, and (3, 4) another one
+    assert board_metrics(mines) == {"bbbv": 4, "openings": 1, "isolated": 3, "islands": 2}
+
+
+def test_empty_and_full_boards():
+    assert board_metrics(np.zeros((6, 4), dtype=bool)) == {"bbbv": 1, "openings": 1, "isolated": 0, "islands": 0}
+    full = np.ones((3, 3), dtype=bool)
+    full[1, 1] = False
+    assert board_metrics(full) == {"bbbv": 1, "openings": 0, "isolated": 1, "islands": 1}
+
+
+@pytest.mark.parametrize("density", [0.2, 0.5, 0.8])
+def test_components_match_reference(density):
+    masks = np.random.default_rng(int(density * 10)).random((40, 13, 11)) < density
+    assert count_components(masks).tolist() == [reference_components(mask) for mask in masks]
+
+
+def test_stack_matches_single_boards():
+    mines = np.random.default_rng(0).random((30, 16, 16)) < 0.16
+    stacked = board_metrics(mines)
+    for index in range(len(mines)):
+        single = board_metrics(mines[index])
+        assert single == {name: int(values[index]) for name, values in stacked.items()}
+    assert (stacked["bbbv"] == stacked["openings"] + stacked["isolated"]).all()
+
+
+def test_level_metrics_does_not_depend_on_the_workers():
+    assert all((a == b).all() for a, b in zip(level_metrics(8, 8, 10, 5000, seed=1).values(),
+                                              level_metrics(8, 8, 10, 5000, seed=1, workers=2).values()))
+
+
+def reference_metrics(mines, topology) -> dict:
+    # click every empty cell left, then count the numbers which no opening revealed
+    board = Board(*mines.shape, int(mines.sum()), topology)
+    board.place_mines(mines)
+    empty = ~mines & (board.counts == 0)
+    openings = 0
+    for i, j in np.argwhere(empty).tolist():
+        if not board.revealed[i, j]:
+            board.reveal(i, j)
+            openings += 1
+    isolated = ~mines & ~board.revealed
+    neighbors = board.neighbors.lists()
+    seen, islands = set(), 0
+    for start in np.flatnonzero(isolated).tolist():
+        if start in seen:
+            continue
+        islands += 1
+        stack = [start]
+        seen.add(start)
+        while stack:
+            for cell in neighbors[stack.pop()]:
+                if isolated.flat[cell] and cell not in seen:
+                    seen.add(cell)
+                    stack.append(cell)
+    return {"bbbv": openings + int(isolated.sum()), "openings": openings, "isolated": int(isolated.sum()),
+            "islands": islands}
+
+
+@pytest.mark.parametrize("name", list(TOPOLOGIES))
+def test_metrics_follow_the_topology(name):
+    topology = TOPOLOGIES[name]
+    mines = np.random.default_rng(3).random((20, 13, 11)) < 0.15
+    stacked = board_metrics(mines, topology)
+    for index in range(len(mines)):
+        expected = reference_metrics(mines[index], topology)
+        assert {metric: int(values[index]) for metric, values in stacked.items()} == expected
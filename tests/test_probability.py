@@ -0,0 +1,89 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from src.board import Board
+from src.probability import (MISSING, Cancelled, ComponentPool, ProbabilityCache, component_signature,
+                              enumerate_component, frontier_constraints, mine_probabilities, split_components)
+
+
+def brute_force(board) -> np.ndarray:
+    """
+    average the mines over every placement which agrees with the revealed numbers
+    """
+    covered = list(zip(*np.nonzero(~board.revealed)))
+    totals, count = np.zeros((board.width, board.height)), 0
+    for placement in combinations(covered, board.num_of_mines):
+        mines = np.zeros((board.width, board.height), dtype=bool)
+        mines[tuple(zip(*placement))] = True
+        counts = Board.neighbor_counts(mines)
+        if (counts[board.revealed] == board.counts[board.revealed]).all():
+            totals += mines
+            count += 1
+    probabilities = totals / count
+    probabilities[board.revealed] = np.nan
+    return probabilities
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_exact_on_small_boards(seed):
+    board = Board(5, 4, 4)
+    board.generate_mines(2, 2, seed=seed)
+    board.reveal(2, 2)
+    rng = np.random.default_rng(seed)
+    for _ in range(2):
+        safe = np.argwhere(~board.mines & ~board.revealed)
+        if len(safe):
+            board.reveal(*map(int, safe[rng.integers(len(safe))]))
+    expected = brute_force(board)
+    cache = ProbabilityCache()
+    got = mine_probabilities(board.revealed, board.counts, board.num_of_mines, cache)
+    assert np.allclose(got, expected, equal_nan=True)
+    again = mine_probabilities(board.revealed, board.counts, board.num_of_mines, cache)
+    assert np.allclose(again, got, equal_nan=True)
+
+
+def test_components_of_the_same_shape_are_enumerated_once():
+    board = Board(12, 5, 2)
+    board.place_mines([(0, 0), (11, 4)])
+    board.reveal(6, 2)
+    cache = ProbabilityCache()
+    probabilities = mine_probabilities(board.revealed, board.counts, 2, cache)
+    assert len(cache.entries) == 1, "both corners have the same signature"
+    assert probabilities[0, 0] == probabilities[11, 4] == 1.0
+    signature, cells = component_signature(split_components(frontier_constraints(board.revealed, board.counts))[0])
+    assert cache.lookup(signature) is not MISSING and cells[0] in (0, 11 * 5 + 3)
+
+
+def test_long_frontier_is_exact():
+    # a row of numbers over a long covered row: far too many placements to search one by one
+    width = 120
+    mines = np.zeros((width, 2), dtype=bool)
+    mines[1::3, 1] = True
+    board = Board(width, 2, int(mines.sum()))
+    board.place_mines(mines)
+    board.reveal_many(np.arange(width), np.zeros(width, dtype=int))
+    (component,) = split_components(frontier_constraints(board.revealed, board.counts))
+    result = enumerate_component(component)
+    assert result is not None and len(result[0]) == width
+    probabilities = mine_probabilities(board.revealed, board.counts, board.num_of_mines)[:, 1]
+    # every number sees exactly one mine, so the chances under it add up to one
+    windows = probabilities[:-2] + probabilities[1:-1] + probabilities[2:]
+    assert np.allclose(windows[::3], 1.0) and np.allclose(probabilities, mines[:, 1])
+
+
+def test_worker_pool_and_cancel():
+    board = Board(16, 16, 40)
+    board.generate_mines(8, 8, seed=3, safe_zone=True)
+    board.reveal(8, 8)
+    expected = mine_probabilities(board.revealed, board.counts, 40)
+    pool = ComponentPool(workers=1, min_cells=1)
+    try:
+        cache = ProbabilityCache()
+        got = mine_probabilities(board.revealed, board.counts, 40, cache, pool=pool)
+        assert np.allclose(got, expected, equal_nan=True) and cache.entries
+    finally:
+        pool.stop()
+    with pytest.raises(Cancelled):
+        mine_probabilities(board.revealed, board.counts, 40, cancelled=lambda: True)
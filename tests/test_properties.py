@@ -0,0 +1,99 @@
+"""
+properties checked on many seeded random boards, against plain reference implementations
+"""
+from collections import deque
+
+import numpy as np
+import pytest
+
+from src.board import Board
+
+SHAPES = [(1, 1, 0), (2, 3, 1), (8, 8, 10), (16, 16, 40), (30, 16, 99), (24, 24, 99), (40, 7, 200), (9, 9, 80)]
+
+
+def reference_counts(mines) -> np.ndarray:
+    w, h = mines.shape
+    return np.array([[sum(mines[x, y] for x in range(max(0, i - 1), min(w, i + 2))
+                          for y in range(max(0, j - 1), min(h, j + 2)) if (x, y) != (i, j))
+                      for j in range(h)] for i in range(w)])
+
+
+def reference_cascade(board, i, j) -> set:
+    w, h = board.width, board.height
+    seen, queue = {(i, j)}, deque([(i, j)])
+    while queue:
+        x, y = queue.popleft()
+        if board.counts[x, y] != 0:
+            continue
+        for a in range(max(0, x - 1), min(w, x + 2)):
+            for b in range(max(0, y - 1), min(h, y + 2)):
+                if (a, b) not in seen and not board.revealed[a, b] and not board.flagged[a, b]:
+                    seen.add((a, b))
+                    queue.append((a, b))
+    return seen
+
+
+@pytest.mark.parametrize("width, height, num_of_mines", SHAPES)
+@pytest.mark.parametrize("seed", range(5))
+def test_first_click_is_never_a_mine(width, height, num_of_mines, seed):
+    rng = np.random.default_rng(seed)
+    for safe_zone in (False, True):
+        i, j = int(rng.integers(width)), int(rng.integers(height))
+        board = Board(width, height, num_of_mines)
+        board.generate_mines(i, j, seed=seed, safe_zone=safe_zone)
+        assert not board.mines[i, j]
+        assert board.mines.sum() == num_of_mines == len(board.mine_cells())
+        zone = board.mines[max(0, i - 1):i + 2, max(0, j - 1):j + 2]
+        if safe_zone and width * height - zone.size >= num_of_mines:
+            assert not zone.any()
+
+
+@pytest.mark.parametrize("width, height, num_of_mines", SHAPES)
+@pytest.mark.parametrize("seed", range(5))
+def test_counts_match_reference(width, height, num_of_mines, seed):
+    board = Board(width, height, num_of_mines)
+    board.generate_mines(0, 0, seed=seed)
+    assert (board.counts == reference_counts(board.mines)).all()
+
+
+@pytest.mark.parametrize("density", [0.01, 0.1, 0.2])
+@pytest.mark.parametrize("seed", range(10))
+def test_cascade_matches_reference(density, seed):
+    rng = np.random.default_rng(seed)
+    mines = rng.random((20, 17)) < density
+    board = Board(20, 17, int(mines.sum()))
+    board.place_mines(mines)
+    for x, y in rng.integers((20, 17), size=(5, 2)):  # a few flags the flood fill must go around
+        if not mines[x, y]:
+            board.toggle_flag(int(x), int(y))
+    safe_left = board.safe_left
+    for _ in range(10):
+        i, j = int(rng.integers(20)), int(rng.integers(17))
+        if mines[i, j] or board.revealed[i, j] or board.flagged[i, j]:
+            continue
+        expected = reference_cascade(board, i, j)
+        xs, ys = board.reveal(i, j)
+        cells = list(zip(xs.tolist(), ys.tolist()))
+        assert len(cells) == len(set(cells)), "no cell is revealed twice"
+        assert set(cells) == expected
+        safe_left -= len(cells)
+        assert board.safe_left == safe_left == int((~board.mines & ~board.revealed).sum())
+        assert not (board.revealed & board.mines).any() and not (board.revealed & board.flagged).any()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_counters_follow_random_moves(seed):
+    rng = np.random.default_rng(seed)
+    board = Board(12, 9, 20)
+    board.generate_mines(6, 4, seed=seed, safe_zone=True)
+    board.reveal(6, 4)
+    for _ in range(200):
+        i, j = int(rng.integers(12)), int(rng.integers(9))
+        if rng.random() < 0.5:
+            board.toggle_flag(i, j)
+        elif not board.mines[i, j]:
+            board.reveal(i, j)
+        assert board.flags_count == int(board.flagged.sum())
+        assert board.correct_flags == int((board.flagged & board.mines).sum())
+        assert board.safe_left == int((~board.mines & ~board.revealed).sum())
+        assert board.won == (board.safe_left == 0 or board.correct_flags == board.flags_count == 20)
@@ -0,0 +1,64 @@
+import sqlite3
+
+import numpy as np
+
+from src.metrics import board_metrics
+from src.records import RecordStore
+
+
+def test_best_top_and_percentiles(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"))
+    assert store.best("expert") is None and store.count("expert") == 0 and store.percentile("expert", 10) == 0.0
+    for elapsed_time in (50.7, 30.2, 90, 30, 70):
+        store.add("expert", elapsed_time)
+    store.add("beginner", 5)
+    store.flush()
+    assert store.best("expert") == 30
+    assert [elapsed_time for elapsed_time, _ in store.top("expert", 3)] == [30, 30, 50]
+    assert store.count("expert") == 5 and store.count("beginner") == 1
+    assert store.percentile("expert", 70) == 60.0
+    assert store.time_at_percentile("expert", 50) == 50
+    store.close()
+
+
+def test_games_survive_reopening(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"))
+    store.add("beginner", 12)
+    store.close()
+    store = RecordStore(str(tmp_path / "records.db"))
+    assert store.best("beginner") == 12 and store.count("beginner") == 1
+    store.close()
+
+
+def test_efficiency_ranking(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"))
+    mines = np.zeros((8, 8), dtype=bool)
+    mines[0, 0] = mines[7, 7] = True
+    metrics = board_metrics(mines)
+    store.add("beginner", 10, metrics)
+    store.add("beginner", 4, metrics)
+    store.add("beginner", 2)  # a game without metrics is ranked by time only
+    store.flush()
+    assert store.best_efficiency("beginner") == (metrics["bbbv"] / 4, metrics["bbbv"], 4)
+    assert [row[2] for row in store.top_efficiency("beginner")] == [4, 10]
+    assert store.best("beginner") == 2
+    store.close()
+
+
+def test_migrate_old_tables(tmp_path):
+    path = str(tmp_path / "records.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE records (level TEXT PRIMARY KEY, time INTEGER)")
+    conn.execute("INSERT INTO records VALUES ('expert', 120)")
+    conn.execute("CREATE TABLE games (id INTEGER PRIMARY KEY, level TEXT NOT NULL, time INTEGER NOT NULL, "
+                 "played_at REAL NOT NULL)")
+    conn.execute("INSERT INTO games (level, time, played_at) VALUES ('beginner', 9, 0)")
+    conn.commit()
+    conn.close()
+    store = RecordStore(path)
+    assert store.best("expert") == 120 and store.best("beginner") == 9
+    assert store.count("expert") == 1, "the counts are filled from the migrated games"
+    store.add("beginner", 8, board_metrics(np.zeros((8, 8), dtype=bool)))
+    store.flush()
+    assert store.best_efficiency("beginner") == (1 / 8, 1, 8)
+    store.close()
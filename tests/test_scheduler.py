@@ -0,0 +1,87 @@
+from src.profiler import Profiler
+from src.scheduler import CHECK_EVERY, UIScheduler
+
+
+class FakeWidget:
+    def __init__(self) -> None:
+        """
+        keep the scheduled callbacks instead of running them, the test runs them as the event loop would
+        """
+        self.jobs: dict = {}
+        self.count = 0
+
+    def after(self, delay, function, *args):
+        self.count += 1
+        self.jobs[self.count] = function
+        return self.count
+
+    def after_idle(self, function, *args):
+        return self.after(0, function)
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def step(self) -> int:
+        jobs, self.jobs = self.jobs, {}
+        for function in jobs.values():
+            function()
+        return len(jobs)
+
+
+class FakeView:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def update_cell(self, i, j, **options):
+        self.calls.append((i, j, options))
+
+
+def test_updates_of_a_cell_are_merged():
+    widget, view = FakeWidget(), FakeView()
+    scheduler = UIScheduler(widget)
+    scheduler.update_cell(view, 1, 2, text="*", bg="red")
+    scheduler.update_cell(view, 3, 4, text="*")
+    scheduler.update_cell(view, 1, 2, text="")
+    assert len(scheduler) == 2 and len(widget.jobs) == 1 and not view.calls
+    widget.step()
+    assert view.calls == [(1, 2, {"text": "", "bg": "red"}), (3, 4, {"text": "*"})]
+    assert not widget.jobs
+
+
+def test_slices_keep_to_the_budget():
+    widget, view = FakeWidget(), FakeView()
+    scheduler = UIScheduler(widget, budget=0)
+    for k in range(3 * CHECK_EVERY + 1):
+        scheduler.update_cell(view, k, 0, text=str(k))
+    slices = 0
+    while widget.step():
+        slices += 1
+    assert slices == 4 and len(view.calls) == 3 * CHECK_EVERY + 1
+    assert [call[0] for call in view.calls] == list(range(3 * CHECK_EVERY + 1)), "in the order they were queued"
+
+
+def test_update_now_and_cancel():
+    widget, view = FakeWidget(), FakeView()
+    scheduler = UIScheduler(widget)
+    scheduler.update_cell(view, 0, 0, text="*", bg="red")
+    scheduler.update_now(view, 0, 0, text="F")
+    assert view.calls == [(0, 0, {"text": "F", "bg": "red"})] and not scheduler.pending
+    scheduler.submit("row", view.update_cell, 5, 5, state="disabled")
+    scheduler.cancel()
+    assert not widget.jobs and not scheduler.pending
+    widget.step()
+    assert len(view.calls) == 1
+
+
+def test_profiled_updates_are_timed_per_slice(monkeypatch):
+    profiler = Profiler(enabled=True)
+    monkeypatch.setattr("src.scheduler.PROFILER", profiler)
+    widget, view = FakeWidget(), FakeView()
+    scheduler = UIScheduler(widget, budget=0)
+    for k in range(CHECK_EVERY + 1):
+        scheduler.update_cell(view, k, 0, "mines", text="*")
+    scheduler.update_cell(view, 0, 1, text="1")
+    while widget.step():
+        pass
+    assert profiler.histograms["mines"].count == 2 and profiler.histograms["scheduler.slice"].count == 2
+    assert view.calls[0] == (0, 0, {"text": "*"})
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+from server import GameServer
+
+
+def call(server, **request) -> dict:
+    return json.loads(server.dispatch(json.dumps(request)))
+
+
+def sweep(server) -> None:
+    async def run():
+        task = asyncio.create_task(server.evict_loop())
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def server(tmp_path):
+    return GameServer(str(tmp_path / "sessions"), idle_timeout=0.0, sweep_interval=0.0)
+
+
+def test_play_a_session(server):
+    new = call(server, op="new", level="beginner", seed=1, safe_zone=True, id=7)
+    assert new["ok"] and new["id"] == 7 and (new["width"], new["height"], new["mines"]) == (8, 8, 10)
+    sid = new["session"]
+    revealed = call(server, op="reveal", session=sid, i=4, j=4)
+    assert revealed["ok"] and len(revealed["cells"]) >= 9 and not revealed["lost"]
+    assert call(server, op="flag", session=sid, i=0, j=0)["flagged"] in (True, False)
+    state = call(server, op="state", session=sid)
+    assert len(state["rows"]) == 8 and all(len(row) == 8 for row in state["rows"])
+    assert call(server, op="close", session=sid)["ok"]
+    assert call(server, op="state", session=sid) == {"ok": False, "error": f"unknown session {sid}"}
+
+
+def test_errors(server):
+    assert not call(server, op="nope")["ok"]
+    assert not call(server, op="new", width=2, height=2, mines=4)["ok"]
+    sid = call(server, op="new", level="beginner")["session"]
+    assert "outside" in call(server, op="reveal", session=sid, i=8, j=0)["error"]
+    assert not json.loads(server.dispatch(b"not json"))["ok"]
+
+
+def test_idle_sessions_are_evicted_and_restored(server):
+    played = call(server, op="new", level="expert", seed=2)["session"]
+    call(server, op="reveal", session=played, i=10, j=10)
+    parked = call(server, op="new", level="beginner")["session"]
+    call(server, op="flag", session=parked, i=1, j=1)
+    before = call(server, op="state", session=played)
+
+    sweep(server)
+    assert call(server, op="stats") == {"ok": True, "active": 0, "evicted": 2}
+    assert call(server, op="state", session=played) == before
+    assert call(server, op="state", session=parked)["rows"][1][1] == "F"
+
+
+def test_failed_eviction_keeps_the_session(server, monkeypatch, caplog):
+    sid = call(server, op="new", level="beginner", seed=3)["session"]
+    call(server, op="reveal", session=sid, i=4, j=4)
+    before = call(server, op="state", session=sid)
+
+    def fail(data, path):
+        raise OSError(28, "No space left on device", path)
+    monkeypatch.setattr("server.save_snapshot", fail)
+
+    async def run():
+        task = asyncio.create_task(server.evict_loop())
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+        assert not task.done(), "the eviction loop survives the error"
+        task.cancel()
+
+    asyncio.run(run())
+    assert "No space left on device" in caplog.text
+    assert call(server, op="state", session=sid) == before
+    assert call(server, op="stats") == {"ok": True, "active": 1, "evicted": 0}
+    monkeypatch.undo()
+    sweep(server)
+    assert call(server, op="stats") == {"ok": True, "active": 0, "evicted": 1}, "the eviction goes on"
+
+def test_unreadable_snapshot_is_an_error(server, monkeypatch):
+    sid = call(server, op="new", level="beginner", seed=3)["session"]
+    call(server, op="reveal", session=sid, i=4, j=4)
+    before = call(server, op="state", session=sid)
+    sweep(server)
+
+    def fail(path):
+        raise PermissionError(13, "Permission denied", path)
+    monkeypatch.setattr("server.os.remove", fail)
+    answer = call(server, op="state", session=sid, id=1)
+    assert not answer["ok"] and answer["id"] == 1 and "Permission denied" in answer["error"]
+    monkeypatch.undo()
+    assert call(server, op="state", session=sid) == before, "the session can still be restored"
+
+
+def test_topology_survives_eviction(server):
+    new = call(server, op="new", level="beginner", topology="hex", seed=4, safe_zone=True)
+    assert new["level"] == "beginner hex"
+    call(server, op="reveal", session=new["session"], i=4, j=4)
+    before = call(server, op="state", session=new["session"])
+    sweep(server)
+    assert call(server, op="stats")["evicted"] == 1
+    assert call(server, op="state", session=new["session"]) == before
+    assert "unknown topology" in call(server, op="new", level="beginner", topology="cube")["error"]
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from simulate import main, parse_args
+from src.board import Board
+from src.solver import Solver, play_games
+
+
+def test_games_are_seeded():
+    first = [game[:3] for game in play_games(16, 16, 40, 10, seed=5)]
+    assert first == [game[:3] for game in play_games(16, 16, 40, 10, seed=5)]
+    assert all(won or guesses for won, guesses, _ in first), "a lost game needs a guess"
+
+
+def test_deductions_without_guess():
+    board = Board(4, 4, 1)
+    board.place_mines([(3, 3)])
+    solver = Solver(board, seed=0)
+    solver.first_click(0, 0)
+    assert solver.solve(allow_guess=False)
+    assert solver.guesses == 0 and board.safe_left == 0 and not board.lost
+
+
+@pytest.mark.parametrize("size", [("0", "5", "3"), ("5", "-1", "3"), ("5", "5", "25"), ("5", "5", "-1")])
+def test_simulate_rejects_impossible_boards(size):
+    width, height, mines = size
+    with pytest.raises(SystemExit):
+        parse_args(["custom", "--width", width, "--height", height, "--mines", mines])
+    assert parse_args(["custom", "--width", "5", "--height", "5", "--mines", "24"]).mines == 24
+
+
+
+@pytest.mark.parametrize("mines", ["0", "3"])
+def test_simulate_summary(tmp_path, mines):
+    output = tmp_path / "results.jsonl"
+    main(["custom", "--width", "3", "--height", "3", "--mines", mines, "-n", "2", "-j", "1", "-o", str(output)])
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    summary = lines[-1]
+    assert [line["type"] for line in lines] == ["chunk", "summary"]
+    assert summary["games"] == 2 and summary["mines"] == int(mines) and 0 <= summary["win_rate"] <= 1
+    if mines == "0":
+        assert summary["win_rate"] == 1 and summary["moves_per_game"] == 1
@@ -0,0 +1,119 @@
+import curses
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.records import RecordStore
+from src.terminalGame import BOARD_TOP, GLYPHS, TerminalGame
+from src.topology import HEX
+
+
+class FakeScreen:
+    def __init__(self, lines=20, chars=60) -> None:
+        """
+        a curses window kept in memory, counting the cells written
+        :param lines: the number of lines
+        :param chars: the number of columns
+        """
+        self.size = (lines, chars)
+        self.chars: dict = {}
+        self.writes = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr=0):
+        assert 0 <= y < self.size[0] and 0 <= x and x + len(text) <= self.size[1]
+        self.writes += 1
+        for k, char in enumerate(text):
+            self.chars[(y, x + k)] = char
+
+    def erase(self):
+        self.chars.clear()
+
+    def clrtoeol(self):
+        pass
+
+    def refresh(self):
+        pass
+
+    def timeout(self, delay):
+        pass
+
+
+def test_no_tkinter_import():
+    code = "import sys, main, src.terminalGame; sys.exit(any(name.startswith('tkinter') for name in sys.modules))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+
+def test_only_changed_cells_are_drawn(workdir):
+    game = TerminalGame(FakeScreen(), 8, 8, 10, "beginner", seed=1)
+    assert game.render() == 64
+    assert game.render() == 0
+    assert game.handle(curses.KEY_RIGHT) and game.render() == 2, "the old and the new cursor cell"
+    game.handle(ord(" "))
+    revealed = int(game.board.revealed.sum())
+    assert game.render() == revealed
+    i, j = game.cursor
+    assert game.screen.chars[(BOARD_TOP + i, 2 * j)] == GLYPHS[game.board.counts[i, j]]
+    assert not game.handle(ord("q"))
+
+
+def test_scrolling_follows_the_cursor(workdir):
+    game = TerminalGame(FakeScreen(12, 30), 100, 100, 1000, "custom 100*100 1000", seed=2)
+    game.render()
+    rows, columns = game.viewport()
+    assert game.origin[0] <= game.cursor[0] < game.origin[0] + rows
+    for _ in range(60):
+        game.handle(curses.KEY_DOWN)
+        game.render()
+    assert game.cursor[0] == 99 and game.origin[0] == 100 - rows
+    assert game.cell_at(BOARD_TOP + rows - 1, 2 * (game.cursor[1] - game.origin[1])) == tuple(game.cursor)
+
+
+def test_mouse_on_a_hexagonal_board(workdir):
+    game = TerminalGame(FakeScreen(), 8, 8, 10, "beginner hex", topology=HEX, seed=3)
+    game.render()
+    assert game.cell_at(BOARD_TOP + 1, 0) is None, "the odd rows start one character later"
+    assert game.cell_at(BOARD_TOP + 1, 1) == (1, 0) and game.cell_at(BOARD_TOP, 1) == (0, 0)
+    game.click(BOARD_TOP + 3, 7, curses.BUTTON3_CLICKED)
+    assert not game.first_click_done and game.board.flagged[3, 3]
+    game.click(BOARD_TOP + 3, 7, curses.BUTTON3_CLICKED)
+    game.click(BOARD_TOP + 3, 7, curses.BUTTON1_CLICKED)
+    assert game.board.revealed[3, 3] and game.cursor == [3, 3]
+
+
+def test_won_game_is_recorded(workdir):
+    game = TerminalGame(FakeScreen(), 8, 8, 10, "beginner", seed=4)
+    game.reveal(0, 0)
+    for i, j in np.argwhere(~game.board.mines & ~game.board.revealed).tolist():
+        game.reveal(i, j)
+    assert game.over and game.message.startswith("You Win")
+    game.render()
+    assert sum(char == "*" for char in game.screen.chars.values()) == 10
+    game.show_records()
+    assert RecordStore.shared().count("beginner") == 1 and game.message.endswith("1 games")
+    assert game.render() == 0, "the status line only"
+
+
+def test_slower_win_right_after_a_record_is_not_one(workdir):
+    for slower in (False, True):
+        game = TerminalGame(FakeScreen(), 8, 8, 10, "beginner", seed=4)
+        game.reveal(0, 0)
+        game.start_time -= 100 * slower
+        for i, j in np.argwhere(~game.board.mines & ~game.board.revealed).tolist():
+            game.reveal(i, j)
+        assert ("new record" in game.message) != slower
+
+def test_lost_game_shows_the_mines(workdir):
+    game = TerminalGame(FakeScreen(), 8, 8, 10, "beginner", seed=5)
+    game.reveal(0, 0)
+    i, j = np.argwhere(game.board.mines)[0].tolist()
+    game.reveal(i, j)
+    assert game.over and game.message == "Game Over"
+    revealed = int(game.board.revealed.sum())
+    game.handle(ord(" "))
+    assert game.board.revealed.sum() == revealed
@@ -0,0 +1,173 @@
+"""
+the neighbor tables of every topology, and the board, the solver and the probabilities played on them
+"""
+from collections import deque
+
+import numpy as np
+import pytest
+
+from src.board import Board
+from src.endlessBoard import EndlessBoard
+from src.probability import mine_probabilities
+from src.snapshot import pack_snapshot, unpack_snapshot
+from src.solver import Solver
+from src.topology import CACHED_SIZES, HEX, KNIGHT, SQUARE, TOPOLOGIES, TORUS, level_name, level_topology
+
+
+def reference_neighbors(topology, w, h, i, j) -> set:
+    offsets = topology.odd_offsets if i % 2 else topology.offsets
+    cells = set()
+    for di, dj in offsets:
+        x, y = i + di, j + dj
+        if topology.wrap:
+            x, y = x % w, y % h
+        if 0 <= x < w and 0 <= y < h and (x, y) != (i, j):
+            cells.add(x * h + y)
+    return cells
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES.values(), ids=TOPOLOGIES)
+@pytest.mark.parametrize("w, h", [(1, 1), (1, 5), (2, 2), (3, 3), (5, 4), (9, 12)])
+def test_table(topology, w, h):
+    table = topology.table(w, h)
+    assert table is topology.table(w, h), "compiled once per size"
+    for c in range(w * h):
+        around = table.neighbors(c)
+        assert list(around) == sorted(reference_neighbors(topology, w, h, *divmod(c, h)))
+        assert list(topology.cell_neighbors(*divmod(c, h), w, h)) == list(around)
+        for v in around:
+            assert c in table.neighbors(v), "the neighbors are symmetric"
+    cells = np.arange(w * h)[::2]
+    assert list(table.gather(cells)) == [v for c in cells for v in table.lists()[c]]
+
+
+@pytest.mark.parametrize("topology", [SQUARE, KNIGHT], ids=["square", "knight"])
+def test_safe_zone_does_not_compile_the_table(topology):
+    board = Board(301, 299, 9000, topology)
+    board.generate_mines(150, 151, seed=0, safe_zone=True)
+    zone = [150 * 299 + 151, *topology.cell_neighbors(150, 151, 301, 299)]
+    assert not board.mines.reshape(-1)[zone].any()
+    assert (301, 299) not in topology._tables
+
+
+def test_tables_of_few_sizes_are_kept():
+    first = TORUS.table(4, 4)
+    for size in range(5, 5 + CACHED_SIZES):
+        TORUS.table(size, size)
+    assert len(TORUS._tables) == CACHED_SIZES and TORUS.table(4, 4) is not first
+    assert TORUS.table(4, 4) is TORUS.table(4, 4)
+
+
+def test_degrees():
+    assert list(SQUARE.table(3, 3).degrees) == [3, 5, 3, 5, 8, 5, 3, 5, 3]
+    assert set(TORUS.table(4, 5).degrees) == {8}
+    assert HEX.table(5, 5).degrees[2 * 5 + 2] == 6 and KNIGHT.table(5, 5).degrees[0] == 2
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES.values(), ids=TOPOLOGIES)
+def test_counts(topology):
+    mines = np.random.default_rng(0).random((4, 7, 6)) < 0.3
+    counts = topology.counts(mines)
+    for b in range(4):
+        for c in range(42):
+            i, j = divmod(c, 6)
+            assert counts[b, i, j] == sum(mines[b].reshape(-1)[list(reference_neighbors(topology, 7, 6, i, j))])
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES.values(), ids=TOPOLOGIES)
+@pytest.mark.parametrize("seed", range(4))
+def test_cascade(topology, seed):
+    rng = np.random.default_rng(seed)
+    board = Board(13, 11, 12, topology)
+    board.generate_mines(6, 5, seed=seed, safe_zone=True)
+    assert not board.mines[6, 5] and not board.mines.reshape(-1)[board.neighbors.neighbors(6 * 11 + 5)].any()
+    for x, y in rng.integers((13, 11), size=(5, 2)):
+        if not board.mines[x, y]:
+            board.toggle_flag(x, y)
+    while not board.won:
+        safe = np.argwhere(~board.mines & ~board.revealed & ~board.flagged)
+        if not len(safe):
+            break
+        i, j = map(int, safe[rng.integers(len(safe))])
+        expected, queue = {i * 11 + j}, deque([i * 11 + j])
+        while queue:
+            c = queue.popleft()
+            if board.counts.reshape(-1)[c] == 0:
+                for v in board.neighbors.lists()[c]:
+                    if v not in expected and not board.revealed.reshape(-1)[v] and not board.flagged.reshape(-1)[v]:
+                        expected.add(v)
+                        queue.append(v)
+        safe_left = board.safe_left
+        xs, ys = board.reveal(i, j)
+        assert set((xs * 11 + ys).tolist()) == expected and board.safe_left == safe_left - len(expected)
+
+
+@pytest.mark.parametrize("topology", [TORUS, HEX, KNIGHT], ids=["torus", "hex", "knight"])
+def test_solver_and_probabilities(topology):
+    wins = 0
+    for seed in range(10):
+        board = Board(9, 9, 10, topology)
+        solver = Solver(board, seed)
+        wins += solver.solve(safe_zone=True)
+        assert board.won or board.lost
+        if board.lost:
+            continue
+        # every deduced mine is a mine, and the probabilities agree with the revealed numbers
+        assert not (board.flagged & ~board.mines).any()
+    assert wins
+    board = Board(9, 9, 10, topology)
+    board.generate_mines(4, 4, seed=1, safe_zone=True)
+    board.reveal(4, 4)
+    probabilities = mine_probabilities(board.revealed, board.counts, 10, topology=topology)
+    assert np.isnan(probabilities[board.revealed]).all()
+    sure = probabilities == 1.0
+    assert board.mines[sure].all() and not board.mines[probabilities == 0.0].any()
+    assert abs(np.nansum(probabilities) - 10) < 1e-6
+
+
+def test_level_names_keep_the_topology():
+    assert level_name("expert", SQUARE) == "expert" and level_topology("expert") is SQUARE
+    assert level_topology(level_name("custom 9*9 10", HEX)) is HEX
+    board = Board(6, 7, 8, TORUS)
+    board.generate_mines(0, 0, seed=3)
+    board.reveal(0, 0)
+    restored = unpack_snapshot(pack_snapshot(board, level_name("custom", TORUS), 1.0)).board
+    assert restored.topology is TORUS and (restored.counts == board.counts).all()
+
+
+@pytest.mark.parametrize("topology", [SQUARE, KNIGHT], ids=["square", "knight"])
+def test_endless_board(topology):
+    board = EndlessBoard(seed=4, chunk_size=5, topology=topology)
+    xs, ys = board.start()
+    # the counts and the cascade agree with a single board cut around the revealed area
+    i0, j0 = int(xs.min()) - 12, int(ys.min()) - 12
+    w, h = int(xs.max()) - i0 + 13, int(ys.max()) - j0 + 13
+    revealed, _, counts, mines = board.window(i0, j0, w, h, with_mines=True)
+    assert (counts[revealed] == topology.counts(mines)[revealed]).all()
+    reference = Board(w, h, int(mines.sum()), topology)
+    reference.place_mines(mines)
+    reference.reveal(int(xs[0]) - i0, int(ys[0]) - j0)
+    assert (reference.revealed == revealed).all() and len(board.chunks) + len(board.resolved) > 1
+    with pytest.raises(ValueError):
+        EndlessBoard(topology=HEX)
+    with pytest.raises(ValueError):
+        EndlessBoard(topology=TORUS)
+
+
+def test_endless_window_keeps_the_resolved_chunks():
+    board = EndlessBoard(seed=4, chunk_size=5)
+    board.start()
+    assert board.resolved and set(board.resolved) <= set(board.views)
+    i, j = (coordinate * 5 for coordinate in next(iter(board.resolved)))
+    first = board.window(i - 10, j - 10, 25, 25)
+    board.views.clear()
+    assert all((a == b).all() for a, b in zip(first[:3], board.window(i - 10, j - 10, 25, 25)[:3])), \
+        "the kept grids are those of the chunk built again"
+    built = []
+    board.build = lambda cx, cy: built.append((cx, cy))
+    assert all((a == b).all() for a, b in zip(first[:3], board.window(i - 10, j - 10, 25, 25)[:3]))
+    assert not built, "a resolved chunk is built once per draw at most"
+    del board.build
+    x, y = np.argwhere(board.mines_of(i // 5, j // 5))[0].tolist()
+    board.toggle_flag(i + x, j + y)
+    assert board.window(i + x, j + y, 1, 1)[1][0, 0], "a flag on a resolved chunk is drawn"